@@ -0,0 +1,378 @@
+"""
+Endpoint latency benchmarks: invokes lambda_function.lambda_handler in-process
+against the database in the DB_* environment variables and records, per
+route, latency percentiles, time spent in Postgres round trips, rows fetched
+and response bytes, plus the process's peak RSS over the whole run.
+
+    python -m benchmarks.synthetic_data --rows 100k --end 2026-01-01 --truncate
+    python -m benchmarks.endpoints [--repeat 100] [--route team-overview] [--output results.json]
+    python -m benchmarks.endpoints --update-baseline
+
+Results are compared against benchmarks/baseline.json, which keeps one set
+of measurements per dataset (keyed by the number of rows in call_sim_scoring,
+with a -cold suffix for --cold-caches runs) and the tolerance allowed on each
+metric. The exit status is 1 if any route regressed beyond its tolerance.
+Baselines are only comparable on the same machine and dataset; refresh them
+with --update-baseline after a deliberate change.
+
+Every route in ROUTE_HANDLERS is covered, plus the callsim status and delete
+paths and the NDJSON variants of the streaming listings. Requests are warm,
+as on a reused Lambda instance: the connection pool, prepared statements,
+the benchmark cache and the data version are primed by the warmup runs.
+--cold-caches empties the industry benchmark response cache before every
+request, to time the queries behind it. Peak RSS is a process high-water
+mark, so it is recorded and compared per dataset, and only for runs of every
+route; run a single --route to see what one route alone peaks at.
+
+benchmarks/baseline.json is committed with a default run on the dataset from
+python -m benchmarks.synthetic_data --rows 10k --seed 7 --end 2026-01-01,
+recorded with the stdlib JSON encoder (as deployed) and dummy AWS
+credentials. Its timings describe the machine in its environment.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from pg8000.core import CoreConnection
+
+import lambda_function
+from handlers.benchmarks_handler import BENCHMARK_CACHE
+from handlers.db_connection import db_connection
+from utils import responses
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+
+# Route-specific query parameters; everything else is scoped to one user
+TEAM_ROUTES = ('team-overview', 'industry-benchmarks')
+PRODUCT_ROUTES = ('industry-benchmarks',)
+STREAMING_ROUTES = ('simulation-run', 'simulation-overview', 'simulation-insights')
+
+# Relative tolerance per metric, plus an absolute allowance for timings so
+# sub-millisecond routes do not fail on scheduler noise. peakRssKb applies to
+# the dataset as a whole.
+DEFAULT_TOLERANCES = {
+    "p50Ms": 0.15,
+    "p95Ms": 0.25,
+    "p99Ms": 0.40,
+    "dbMs": 0.25,
+    "queries": 0.0,
+    "rows": 0.0,
+    "bytes": 0.02,
+    "peakRssKb": 0.20
+}
+TIMING_SLACK_MS = 1.0
+
+# Routes whose response is a random record, so its size is not compared
+RANDOM_RESPONSE_ROUTES = ('GET call-sim-sample-data',)
+
+DISCARD = open(os.devnull, 'w')
+
+
+class RoundTrips:
+    """
+    Times every statement pg8000 sends, whichever cursor or prepared
+    statement sent it, and counts the rows that came back
+    """
+
+    METHODS = ('execute_simple', 'execute_unnamed', 'execute_named')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.originals = {}
+
+    def install(self):
+        for name in self.METHODS:
+            original = getattr(CoreConnection, name)
+            self.originals[name] = original
+            setattr(CoreConnection, name, self.timed(original))
+
+    def uninstall(self):
+        for name, original in self.originals.items():
+            setattr(CoreConnection, name, original)
+
+    def timed(self, method):
+        def run(connection, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                context = method(connection, *args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+                self.queries += 1
+            self.rows += len(context.rows or ())
+            return context
+        return run
+
+    def reset(self):
+        self.seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+
+
+def dataset_fixtures():
+    """
+    Picks the busiest team, user and product, a simulation to look up and a
+    practice run the delete route can mark deleted (and the harness restores)
+    """
+    with db_connection() as connection:
+        if not connection:
+            raise SystemExit("Cannot connect to the database; check the DB_* environment variables")
+        cursor = connection.cursor()
+        fixtures = {}
+        cursor.execute("SELECT COUNT(*) FROM call_sim_scoring")
+        fixtures["rows"] = cursor.fetchone()[0]
+        for name, column in (("team", "team_id"), ("user", "user_id"), ("product", "product_id")):
+            cursor.execute(
+                f"SELECT {column} FROM call_sim_scoring WHERE {column} IS NOT NULL "
+                f"GROUP BY {column} ORDER BY COUNT(*) DESC, {column} LIMIT 1"
+            )
+            row = cursor.fetchone()
+            fixtures[name] = str(row[0]) if row else None
+        cursor.execute(
+            "SELECT id, simulation_id FROM call_sim_scoring "
+            "WHERE mode = 'PRACTICE' AND NOT COALESCE(is_deleted, false) ORDER BY id LIMIT 1"
+        )
+        row = cursor.fetchone()
+        fixtures["id"], fixtures["simulationId"] = (row[0], row[1]) if row else (None, None)
+        cursor.execute("SELECT version()")
+        fixtures["postgres"] = cursor.fetchone()[0].split(',')[0]
+    return fixtures
+
+
+def restore_deleted(assessment_id):
+    with db_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("UPDATE call_sim_scoring SET is_deleted = false WHERE id = %s", [assessment_id])
+        connection.commit()
+
+
+def benchmark_cases(fixtures):
+    """
+    (name, method, path, query parameters) for every route
+    """
+    cases = []
+    for route in lambda_function.ROUTE_HANDLERS:
+        method, path = route.split(':', 1)
+        section = path.split('/')[0]
+        if path == 'presignedPutUrl':
+            query = {
+                "filename": "benchmark.webm", "simulationId": "benchmark", "productId": "benchmark",
+                "materialId": "benchmark", "userId": "benchmark", "teamId": "benchmark", "language": "en",
+                "character": "benchmark", "specialty": "benchmark", "adoptionContinuum": "naive",
+                "temperament": "benchmark", "situation": "benchmark", "agent": "benchmark", "disc": "D",
+                "mode": "PRACTICE", "recordVideo": "false"
+            }
+        elif section in TEAM_ROUTES:
+            query = {"team": fixtures["team"]}
+            if section in PRODUCT_ROUTES:
+                query["product"] = fixtures["product"]
+        elif section.startswith('simulation-'):
+            query = {"userId": fixtures["user"]}
+        else:
+            query = {}
+        cases.append((f"{method} {path}", method, path, query))
+        if path in STREAMING_ROUTES:
+            cases.append((f"{method} {path} ndjson", method, path, {**query, "stream": "1"}))
+
+    cases.append(("GET simulation-run/<id>", 'GET', f"simulation-run/{fixtures['id']}", {}))
+    cases.append(("GET team-members/<id>", 'GET', 'team-members/1', {}))
+    for section in ('strengths', 'improvements', 'training', 'development', 'strategies'):
+        cases.append((f"GET insights-recommendations/{section}", 'GET', f"insights-recommendations/{section}", {}))
+    cases.append(("GET callsim/<simulationId>/status", 'GET', f"callsim/{fixtures['simulationId']}/status", {}))
+    cases.append(("DELETE callsim/id/<id>", 'DELETE', f"callsim/id/{fixtures['id']}", {}))
+    return cases
+
+
+def percentile(cut_points, p):
+    return cut_points[p - 1] if cut_points else None
+
+
+def run_case(round_trips, method, path, query, repeat, warmup, cold_caches=False):
+    event = {"path": f"/{path}", "httpMethod": method, "queryStringParameters": query or None, "headers": {}}
+    latencies = []
+    db_times = []
+    status = None
+    size = 0
+    for iteration in range(warmup + repeat):
+        if cold_caches:
+            BENCHMARK_CACHE.clear()
+        round_trips.reset()
+        # The EMF metrics line would interleave with the report
+        with contextlib.redirect_stdout(DISCARD):
+            start = time.perf_counter()
+            response = lambda_function.lambda_handler(event, None)
+            elapsed = time.perf_counter() - start
+        if iteration >= warmup:
+            latencies.append(elapsed * 1000)
+            db_times.append(round_trips.seconds * 1000)
+        status = response["statusCode"]
+        size = len((response.get("body") or "").encode('utf-8'))
+
+    cut_points = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        "status": status,
+        "p50Ms": round(percentile(cut_points, 50), 3),
+        "p95Ms": round(percentile(cut_points, 95), 3),
+        "p99Ms": round(percentile(cut_points, 99), 3),
+        "dbMs": round(statistics.median(db_times), 3),
+        # Counts of the last request; warm requests repeat the same statements
+        "queries": round_trips.queries,
+        "rows": round_trips.rows,
+        "bytes": size
+    }
+
+
+def compare(results, baseline, tolerances):
+    """
+    Lists (route, metric, baseline value, new value) for every metric worse
+    than its baseline by more than its tolerance
+    """
+    regressions = []
+    for name, metrics in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for metric, tolerance in tolerances.items():
+            old, new = expected.get(metric), metrics.get(metric)
+            if old is None or new is None or (metric == 'bytes' and name in RANDOM_RESPONSE_ROUTES):
+                continue
+            allowed = old * (1 + tolerance)
+            if metric.endswith('Ms'):
+                allowed += TIMING_SLACK_MS
+            if new > allowed:
+                regressions.append((name, metric, old, new))
+        if expected.get("status") != metrics.get("status"):
+            regressions.append((name, "status", expected.get("status"), metrics.get("status")))
+    return regressions
+
+
+def load_baseline(path):
+    if not path.exists():
+        return {"tolerances": DEFAULT_TOLERANCES, "datasets": {}}
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.endpoints')
+    parser.add_argument('--repeat', type=int, default=100, help='timed requests per route')
+    parser.add_argument('--warmup', type=int, default=3, help='untimed requests per route first')
+    parser.add_argument('--cold-caches', action='store_true', help='empty the benchmark response cache before each request')
+    parser.add_argument('--route', action='append', help='only routes whose name contains this (repeatable)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--output', type=Path, help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    fixtures = dataset_fixtures()
+    cases = benchmark_cases(fixtures)
+    if args.route:
+        cases = [case for case in cases if any(route in case[0] for route in args.route)]
+    # Cold-cache runs time different work, so they keep their own baseline
+    dataset = f"{fixtures['rows']}-cold" if args.cold_caches else str(fixtures["rows"])
+    print(f"{len(cases)} routes on {fixtures['rows']} rows ({fixtures['postgres']}), "
+          f"{args.repeat} requests each after {args.warmup} warmup", file=sys.stderr)
+
+    # Log lines are still formatted, as in production, but not written out
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(DISCARD)
+    # Signing a presigned URL is local, but needs a bucket name and AWS
+    # credentials (any will do) in the environment
+    os.environ.setdefault('BUCKET_NAME', 'benchmark')
+
+    baseline = load_baseline(args.baseline)
+    expected = None if args.update_baseline else baseline["datasets"].get(dataset)
+    tolerances = {**DEFAULT_TOLERANCES, **baseline.get("tolerances", {})}
+
+    round_trips = RoundTrips()
+    round_trips.install()
+    results = {}
+
+    def measure(name, method, path, query):
+        try:
+            results[name] = run_case(round_trips, method, path, query, args.repeat, args.warmup, args.cold_caches)
+        except Exception as e:
+            # e.g. the presigned URL route without AWS credentials
+            print(f"{name}: {type(e).__name__}: {e}", file=sys.stderr)
+            return
+        metrics = results[name]
+        print(f"{name:<48} {metrics['status']:>3} p50 {metrics['p50Ms']:9.2f} p95 {metrics['p95Ms']:9.2f} "
+              f"p99 {metrics['p99Ms']:9.2f} ms  db {metrics['dbMs']:8.2f} ms {metrics['queries']:>3}q "
+              f"{metrics['rows']:>8} rows {metrics['bytes']:>9} B")
+
+    try:
+        for case in cases:
+            measure(*case)
+        # A route that looks regressed is measured once more, and only
+        # reported if it still is, so a burst of noise on a busy machine
+        # does not fail the run
+        if expected is not None:
+            suspects = {name for name, *_ in compare(results, expected["routes"], tolerances)}
+            if suspects:
+                print(f"Measuring {len(suspects)} routes again", file=sys.stderr)
+            for case in cases:
+                if case[0] in suspects:
+                    measure(*case)
+    finally:
+        round_trips.uninstall()
+        if fixtures["id"] is not None:
+            restore_deleted(fixtures["id"])
+
+    # Only a run of every route measures the dataset's peak
+    peak_rss_kb = None if args.route else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if peak_rss_kb is not None:
+        print(f"peak RSS {peak_rss_kb} KB", file=sys.stderr)
+
+    environment = {
+        "machine": f"{platform.machine()}, {os.cpu_count()} CPUs",
+        "python": platform.python_version(),
+        "postgres": fixtures["postgres"],
+        "jsonEncoder": 'orjson' if responses.orjson is not None else 'stdlib',
+        "repeat": args.repeat,
+        "coldCaches": args.cold_caches,
+        "recordedAt": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({
+                "dataset": dataset, "environment": environment, "peakRssKb": peak_rss_kb, "routes": results
+            }, output_file, indent=2)
+
+    if args.update_baseline:
+        stored = baseline["datasets"].setdefault(dataset, {"environment": environment, "routes": {}})
+        stored["environment"] = environment
+        stored["routes"].update(results)
+        if peak_rss_kb is not None:
+            stored["peakRssKb"] = peak_rss_kb
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        print(f"Baseline for dataset {dataset} written to {args.baseline}")
+        return 0
+
+    if expected is None:
+        print(f"No baseline for dataset {dataset} in {args.baseline}; record one with --update-baseline")
+        return 0
+    regressions = compare(results, expected["routes"], tolerances)
+    if peak_rss_kb is not None and expected.get("peakRssKb") is not None:
+        if peak_rss_kb > expected["peakRssKb"] * (1 + tolerances["peakRssKb"]):
+            regressions.append(("dataset", "peakRssKb", expected["peakRssKb"], peak_rss_kb))
+    for name, metric, old, new in regressions:
+        print(f"REGRESSION {name}: {metric} {old} -> {new}")
+    if not regressions:
+        print(f"No regressions against the baseline for dataset {dataset}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
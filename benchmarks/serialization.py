@@ -0,0 +1,103 @@
+"""
+Times building a simulation-run listing response the old way (a literal
+header dict and json.dumps with a datetime default) against
+utils.responses.json_response, on a synthetic page of runs.
+
+    python -m benchmarks.serialization [--runs 200] [--repeat 50]
+
+Install orjson to time its fast path; without it json_response uses the
+compact stdlib encoder.
+"""
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from utils import responses
+
+SKILLS = ['introduction', 'rapport', 'creatingInterest', 'probing', 'productKnowledge', 'strategy', 'closing']
+FEEDBACK_SKILLS = ['disc', 'traits', 'adoptionContinuum']
+
+FEEDBACK_SENTENCES = [
+    "The representative opened with a clear agenda and confirmed the time available.",
+    "Questions about the current treatment protocol uncovered two unmet needs.",
+    "Pacing slowed noticeably when the physician raised the reimbursement objection.",
+    "The closing summary tied the efficacy data back to the patient profile discussed.",
+    "More open-ended probing would have surfaced the formulary concern earlier.",
+]
+
+
+def synthetic_runs(count, seed=7):
+    """
+    A page of runs shaped like transform_simulation_run_data output, with a
+    created_at datetime and a Decimal score as the database can return them
+    """
+    generator = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    runs = []
+    for run_id in range(count):
+        metrics = {skill: {"score": generator.randint(20, 100)} for skill in SKILLS}
+        for skill in FEEDBACK_SKILLS:
+            metrics[skill] = {
+                "score": generator.randint(20, 100),
+                "feedback": " ".join(generator.choices(FEEDBACK_SENTENCES, k=generator.randint(3, 8)))
+            }
+        runs.append({
+            "id": run_id,
+            "mode": generator.choice(["PRACTICE", "TESTING"]),
+            "userId": f"user-{generator.randint(1, 500)}",
+            "date": (start + timedelta(hours=run_id)).strftime('%B %d, %Y'),
+            "createdAt": start + timedelta(hours=run_id),
+            "adoptionLevel": generator.choice(["Naive", "Aware", "Trialing", "Adopter", "Advocate"]),
+            "situation": generator.choice(["Pre-launch", "Launch", "Competitive"]),
+            "product": generator.choice(["prodA", "prodB", "prodC"]),
+            "specialty": generator.choice(["Cardiology", "Oncology", "Neurology"]),
+            "overallScore": Decimal(generator.randint(2000, 10000)) / 100,
+            "metrics": metrics
+        })
+    return {"simulationData": runs, "nextCursor": None}
+
+
+def legacy_default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+
+def legacy_response(body):
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "*",
+            "Access-Control-Allow-Methods": "*"
+        },
+        "body": json.dumps(body, default=legacy_default)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.serialization')
+    parser.add_argument('--runs', type=int, default=200, help='runs per page')
+    parser.add_argument('--repeat', type=int, default=50, help='responses built per timing')
+    args = parser.parse_args(argv)
+
+    body = synthetic_runs(args.runs)
+    encoder = 'orjson' if responses.orjson is not None else 'stdlib compact'
+    print(f"{args.runs} runs, {encoder} encoder")
+
+    results = {}
+    for name, build in (("legacy", legacy_response), ("json_response", lambda b: responses.json_response(200, b))):
+        seconds = min(timeit.repeat(lambda: build(body), number=args.repeat, repeat=5)) / args.repeat
+        size = len(build(body)["body"].encode('utf-8'))
+        results[name] = seconds
+        print(f"  {name:<14} {seconds * 1000:8.3f} ms/response  {size:>9} bytes")
+    print(f"  speedup        {results['legacy'] / results['json_response']:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,457 @@
+"""
+Fills a local Postgres with synthetic call_sim_scoring rows for load and
+performance testing.
+
+    python -m benchmarks.synthetic_data --rows 100k [--seed 7] [--end 2026-01-01]
+                                        [--create-table] [--truncate]
+
+Rows are shaped like production assessments (accuracy.scores.* with the DISC,
+traits and adoption continuum detailed_scores, fluency.scores, and the
+conversation analysis the sample data route reads) and are skewed the way real
+usage is: a few large teams and popular products, mostly practice runs, mostly
+completed assessments, more activity in recent months. The same --seed,
+--rows, --days and --end always produce the same rows, so measurements taken
+on different days or machines compare like with like.
+
+The row triggers from migrations 0002, 0006 and 0007 would run once per
+inserted row, which dominates a bulk load. Unless --keep-triggers is given
+all triggers are disabled for the load, and the rollups are rebuilt and the data
+version bumped before it commits, all in one transaction.
+
+--create-table creates the columns the handlers read on an empty database,
+for use before `python -m migrations`; the production table is managed
+outside this repository.
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate, permutations
+
+from handlers.db_connection import get_db_connection
+from utils.responses import encode_json
+
+COLUMNS = (
+    'simulation_id', 'product_id', 'material_id', 'user_id', 'team_id', 'language', 'character',
+    'specialty', 'adoption_continuum', 'temperament', 'situation', 'agent', 'disc', 'conversation_id',
+    'conversation_data', 'video_duration_in_seconds', 'transcript', 'speaker_key', 'fluency', 'accuracy',
+    'overall_score', 'mode', 'assessment_status', 'is_deleted', 'created_at', 'updated_at'
+)
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS call_sim_scoring (
+        id SERIAL PRIMARY KEY,
+        simulation_id TEXT,
+        product_id TEXT,
+        material_id TEXT,
+        user_id TEXT,
+        team_id INTEGER,
+        language TEXT,
+        character TEXT,
+        specialty TEXT,
+        adoption_continuum TEXT,
+        temperament TEXT,
+        situation TEXT,
+        agent TEXT,
+        disc TEXT,
+        conversation_id TEXT,
+        conversation_data JSONB,
+        video_duration_in_seconds INTEGER,
+        transcript TEXT,
+        speaker_key JSONB,
+        fluency JSONB,
+        accuracy JSONB,
+        overall_score DOUBLE PRECISION,
+        mode TEXT,
+        assessment_status TEXT,
+        is_deleted BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        updated_at TIMESTAMPTZ DEFAULT NOW()
+    )
+"""
+
+# Rebuilt after a load with the triggers disabled, if the migration that
+# defines them has been applied
+REBUILD_FUNCTIONS = ('rebuild_team_benchmark_stats', 'rebuild_team_overview_rollup', 'rebuild_team_trend_daily')
+
+# accuracy.scores keys with their offset from a rep's skill level, and the
+# conversation analysis criterion each one is judged against
+SKILLS = {
+    'introduction': (6, 'introduction'),
+    'rapport': (3, 'rapport'),
+    'creatingInterest': (-2, 'creating_interest'),
+    'probing': (-6, 'probing'),
+    'productKnowledge': (2, 'product_knowledge'),
+    'strategy': (-4, None),
+    'closing': (-8, None),
+}
+DISC_DETAILS = ('message_fit', 'pacing_and_tone', 'overall_influence', 'objection_handling', 'engagement_approach')
+TRAITS = ('clarity', 'confidence', 'empathy', 'engagement')
+ADOPTION_DETAILS = ('strategic_fit', 'conversion_momentum')
+
+# (value, weight) vocabularies. Specialties come in the mixed case real
+# uploads use, which the specialty filter has to fold.
+SPECIALTIES = (
+    ('cardiology', 22), ('Cardiology', 6), ('oncology', 18), ('Oncology', 4), ('endocrinology', 12),
+    ('neurology', 9), ('dermatology', 8), ('pulmonology', 7), ('rheumatology', 5), ('primary care', 5),
+    ('gastroenterology', 3), ('nephrology', 1),
+)
+SITUATIONS = (
+    ('appointment', 38), ('drop-in', 24), ('lunch & learn', 14), ('counter call', 12), ('virtual', 9),
+    ('conference', 3),
+)
+ADOPTION_LEVELS = (('naive', 30), ('aware', 28), ('trialing', 20), ('adopter', 15), ('advocate', 7))
+MODES = (('PRACTICE', 82), ('TESTING', 18))
+STATUSES = (('COMPLETED', 91), ('PENDING', 5), ('FAILED', 4))
+LANGUAGES = (('en', 88), ('es', 7), ('fr', 3), ('de', 2))
+TEMPERAMENTS = (('friendly', 30), ('skeptical', 25), ('busy', 25), ('analytical', 15), ('hostile', 5))
+DISC_STYLES = (('D', 26), ('I', 24), ('S', 28), ('C', 22))
+CHARACTERS = (
+    ('Dr. Alvarez', 1), ('Dr. Chen', 1), ('Dr. Okafor', 1), ('Dr. Patel', 1), ('Dr. Novak', 1),
+    ('Dr. Haddad', 1), ('Dr. Lindqvist', 1), ('Dr. Moreau', 1),
+)
+
+FEEDBACK = {
+    'strong': (
+        "Opened with a clear agenda and confirmed the time available.",
+        "Connected the clinical data directly to the patient types the physician described.",
+        "Handled the objection calmly and returned to the physician's priorities.",
+        "Used open questions that kept the physician talking about their practice.",
+        "Summarized agreed next steps and secured a specific follow-up.",
+    ),
+    'weak': (
+        "Moved to product claims before establishing the physician's current approach.",
+        "Several questions were closed and did not uncover unmet needs.",
+        "The reimbursement concern was acknowledged but never resolved.",
+        "Pacing was rushed once the physician signalled limited time.",
+        "The call ended without a clear commitment or next step.",
+    ),
+}
+# Every ordering of one to three sentences, so feedback is a single draw
+FEEDBACK_TEXT = {
+    grade: [" ".join(sentences) for length in (1, 2, 3) for sentences in permutations(pool, length)]
+    for grade, pool in FEEDBACK.items()
+}
+DIALOGUE = {
+    'user': (
+        "Thanks for making time today, I know clinic mornings are busy.",
+        "How are you currently managing patients who don't respond to first-line therapy?",
+        "What matters most to you when you choose a treatment for these patients?",
+        "The phase three data showed a meaningful reduction in hospitalizations.",
+        "Would it help if I left the dosing guide and the patient support information?",
+        "Could we look at two or three patients where this might be a fit?",
+        "I understand the coverage concern; our access team can help with prior authorizations.",
+    ),
+    'agent': (
+        "I have about five minutes, so let's keep this short.",
+        "Most of them stay on what they're on unless there's a real problem.",
+        "Honestly my main concern is the cost for patients without good coverage.",
+        "I've heard about it, but I haven't seen a reason to switch anyone yet.",
+        "How does that compare with what I'm already prescribing?",
+        "That's interesting. Send me the data and I'll take a look.",
+        "I might try it with one or two newly diagnosed patients.",
+    ),
+}
+
+
+def parse_count(value):
+    """
+    Row count from an argument like 10000, 100k or 10m
+    """
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:].lower(), 1)
+    return int(float(value.rstrip('kKmM')) * multiplier)
+
+
+def zipf_weights(count, exponent=1.1):
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+def chooser(values, weights):
+    """
+    Weighted choice over values, with the cumulative weights computed once
+    rather than on every draw
+    """
+    values = list(values)
+    cum_weights = list(accumulate(weights))
+    return lambda generator: generator.choices(values, cum_weights=cum_weights)[0]
+
+
+def vocabulary_chooser(vocabulary):
+    values, weights = zip(*vocabulary)
+    return chooser(values, weights)
+
+
+class Population:
+    """
+    The teams, products and users a dataset is drawn from, scaled to its size.
+    Team and product popularity follow Zipf's law, and each user belongs to
+    one team and has a skill level their scores cluster around.
+    """
+
+    def __init__(self, generator, rows):
+        team_count = max(4, min(500, rows // 20_000))
+        user_count = max(12, min(50_000, rows // 200))
+        product_count = 12
+
+        self.teams = list(range(101, 101 + team_count))
+        products = [f"prod-{index:03d}" for index in range(1, product_count + 1)]
+        self.product = chooser(products, zipf_weights(product_count))
+        self.materials = {product: [f"{product}-mat-{index}" for index in range(1, 4)] for product in products}
+
+        team_weights = zipf_weights(team_count, 0.9)
+        self.users = [f"user-{index:05d}" for index in range(1, user_count + 1)]
+        self.user_teams = generator.choices(self.teams, team_weights, k=user_count)
+        self.user_skill = [min(92, max(35, generator.gauss(68, 11))) for _ in range(user_count)]
+        # A few reps practice far more than the rest
+        self.user = chooser(range(user_count), [generator.paretovariate(1.6) for _ in range(user_count)])
+        self.agents = [f"agent-{generator.getrandbits(48):012x}" for _ in range(6)]
+
+
+def score(generator, mean, spread=10):
+    return max(0, min(100, round(generator.gauss(mean, spread))))
+
+
+def feedback(generator, value):
+    return generator.choice(FEEDBACK_TEXT['strong' if value >= 70 else 'weak'])
+
+
+def detailed(generator, names, mean):
+    return {name: {"score": score(generator, mean, 12)} for name in names}
+
+
+def accuracy_scores(generator, skill):
+    scores = {}
+    for name, (offset, _) in SKILLS.items():
+        value = score(generator, skill + offset)
+        scores[name] = {"score": value, "feedback": feedback(generator, value)}
+
+    disc = detailed(generator, DISC_DETAILS, skill - 3)
+    traits = detailed(generator, TRAITS, skill + 2)
+    adoption = detailed(generator, ADOPTION_DETAILS, skill - 5)
+    for name, details in (('disc', disc), ('traits', {"traits": traits}), ('adoptionContinuum', adoption)):
+        parts = details.get('traits', details).values()
+        value = round(sum(part["score"] for part in parts) / len(parts))
+        scores[name] = {"score": value, "feedback": feedback(generator, value), "detailed_scores": details}
+
+    total = round(sum(scores[name]["score"] for name in SKILLS) / len(SKILLS))
+    scores["total"] = {"score": total, "feedback": feedback(generator, total)}
+    return scores
+
+
+def conversation(generator, scores, conversation_id, duration):
+    turns = []
+    for turn in range(generator.randint(8, 30)):
+        role = 'user' if turn % 2 == 0 else 'agent'
+        turns.append({
+            "role": role,
+            "message": generator.choice(DIALOGUE[role]),
+            "time_in_call_secs": duration * turn // 30
+        })
+
+    results = {}
+    for name, (_, criterion) in SKILLS.items():
+        if criterion is None:
+            continue
+        # Criteria pass more often the better the rep scored on that skill
+        passed = scores is not None and generator.random() * 100 < scores[name]["score"]
+        results[criterion] = {
+            "criteria_id": criterion,
+            "result": 'success' if passed else 'failure',
+            "rationale": feedback(generator, 100 if passed else 0)
+        }
+    return {
+        "conversation_id": conversation_id,
+        "status": 'done',
+        "transcript": turns,
+        "analysis": {
+            "evaluation_criteria_results": results,
+            "call_successful": 'success' if scores is not None and scores["total"]["score"] >= 60 else 'failure',
+            "transcript_summary": generator.choice(DIALOGUE['agent'])
+        }
+    }, "\n".join(f"{turn['role']}: {turn['message']}" for turn in turns)
+
+
+def synthetic_rows(seed, rows, end, days=730):
+    """
+    Yields rows as tuples in COLUMNS order, with JSON columns already encoded
+    """
+    generator = random.Random(seed)
+    population = Population(generator, rows)
+    end = datetime.combine(end, datetime.min.time(), tzinfo=timezone.utc)
+    status_of, mode_of, language_of, character_of, specialty_of, adoption_of, temperament_of, situation_of, disc_of = (
+        vocabulary_chooser(vocabulary) for vocabulary in (
+            STATUSES, MODES, LANGUAGES, CHARACTERS, SPECIALTIES, ADOPTION_LEVELS, TEMPERAMENTS, SITUATIONS, DISC_STYLES
+        )
+    )
+
+    for _ in range(rows):
+        user = population.user(generator)
+        product = population.product(generator)
+        status = status_of(generator)
+        mode = mode_of(generator)
+        # Reps score a little higher in practice, where they can retry
+        skill = population.user_skill[user] + (3 if mode == 'PRACTICE' else 0)
+
+        # Activity grows over time, and happens on weekdays in office hours
+        created_at = end - timedelta(days=int(days * generator.random() ** 1.5) + 1)
+        if created_at.weekday() >= 5 and generator.random() < 0.8:
+            created_at -= timedelta(days=created_at.weekday() - 4)
+        created_at += timedelta(seconds=generator.randint(8 * 3600, 18 * 3600))
+        duration = generator.randint(90, 900)
+
+        # Assessments that are still running or failed to score have no results
+        if status != 'COMPLETED':
+            scores = fluency = accuracy = overall_score = None
+        else:
+            scores = accuracy_scores(generator, skill)
+            fluency = encode_json({"scores": {
+                "wpm": round(generator.gauss(145, 18)),
+                "total": score(generator, skill + 4),
+                "pauses": generator.randint(0, 25),
+                "fillerWords": generator.randint(0, 40)
+            }})
+            accuracy = encode_json({"scores": scores})
+            overall_score = float(scores["total"]["score"])
+
+        conversation_id = f"conv_{generator.getrandbits(64):016x}"
+        conversation_data, transcript = conversation(generator, scores, conversation_id, duration)
+        yield (
+            str(uuid.UUID(int=generator.getrandbits(128), version=4)),
+            product,
+            generator.choice(population.materials[product]),
+            population.users[user],
+            population.user_teams[user],
+            language_of(generator),
+            character_of(generator),
+            specialty_of(generator),
+            adoption_of(generator),
+            temperament_of(generator),
+            situation_of(generator),
+            generator.choice(population.agents),
+            disc_of(generator),
+            conversation_id,
+            encode_json(conversation_data),
+            duration,
+            transcript,
+            '{"speaker_0":"user","speaker_1":"agent"}',
+            fluency,
+            accuracy,
+            overall_score,
+            mode,
+            status,
+            generator.random() < 0.01,
+            created_at,
+            created_at + timedelta(seconds=duration + generator.randint(30, 600))
+        )
+
+
+def copy_field(value):
+    """
+    A value in COPY text format
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return str(value)
+
+
+def copy_batches(rows, batch_size):
+    """
+    Groups rows into COPY text, batch_size rows at a time.
+    Yields (row count, text) pairs.
+    """
+    lines = []
+    for row in rows:
+        lines.append("\t".join(map(copy_field, row)))
+        if len(lines) == batch_size:
+            yield len(lines), "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield len(lines), "\n".join(lines) + "\n"
+
+
+def existing_functions(cursor, names):
+    cursor.execute("SELECT proname FROM pg_proc WHERE proname = ANY(%s)", (list(names),))
+    found = {row[0] for row in cursor.fetchall()}
+    return [name for name in names if name in found]
+
+
+def load(connection, rows, batch_size, keep_triggers=False):
+    """
+    COPYs rows into call_sim_scoring in a single transaction.
+    Returns the number of rows loaded.
+
+    The rows go out as one COPY fed batch by batch, so Postgres parses and
+    indexes a batch while the next one is generated.
+    """
+    cursor = connection.cursor()
+    copy = f"COPY call_sim_scoring ({', '.join(COLUMNS)}) FROM STDIN"
+    loaded = 0
+    started = time.monotonic()
+
+    def batches():
+        nonlocal loaded
+        for count, text in copy_batches(rows, batch_size):
+            yield text
+            loaded += count
+            print(f"  {loaded} rows, {loaded / (time.monotonic() - started):.0f} rows/s", file=sys.stderr)
+
+    try:
+        if not keep_triggers:
+            cursor.execute("ALTER TABLE call_sim_scoring DISABLE TRIGGER USER")
+        cursor.execute(copy, stream=batches())
+        if not keep_triggers:
+            cursor.execute("ALTER TABLE call_sim_scoring ENABLE TRIGGER USER")
+            for function in existing_functions(cursor, REBUILD_FUNCTIONS):
+                print(f"  {function}()", file=sys.stderr)
+                cursor.execute(f"SELECT {function}()")
+            cursor.execute("SELECT to_regclass('call_sim_scoring_data_version')")
+            if cursor.fetchone()[0] is not None:
+                cursor.execute("UPDATE call_sim_scoring_data_version SET version = version + 1")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.synthetic_data')
+    parser.add_argument('--rows', type=parse_count, default=parse_count('10k'), help='rows to generate: 10k, 100k, 1m, 10m')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--end', type=date.fromisoformat, default=date.today(),
+                        help='day the generated history ends (default today); pass it to reproduce a dataset')
+    parser.add_argument('--days', type=int, default=730, help='days of history before --end')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per COPY')
+    parser.add_argument('--create-table', action='store_true', help='create call_sim_scoring if it does not exist')
+    parser.add_argument('--truncate', action='store_true', help='empty call_sim_scoring first')
+    parser.add_argument('--keep-triggers', action='store_true', help='load through the row triggers')
+    args = parser.parse_args(argv)
+
+    connection = get_db_connection()
+    if not connection:
+        return 1
+
+    try:
+        cursor = connection.cursor()
+        if args.create_table:
+            cursor.execute(CREATE_TABLE)
+        if args.truncate:
+            cursor.execute("TRUNCATE call_sim_scoring RESTART IDENTITY")
+        connection.commit()
+
+        print(f"Generating {args.rows} rows, seed {args.seed}, ending {args.end.isoformat()}", file=sys.stderr)
+        started = time.monotonic()
+        loaded = load(connection, synthetic_rows(args.seed, args.rows, args.end, args.days),
+                      args.batch_size, args.keep_triggers)
+        print(f"Loaded {loaded} rows in {time.monotonic() - started:.1f}s")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
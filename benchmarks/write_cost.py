@@ -0,0 +1,127 @@
+"""
+Write cost of the triggers on call_sim_scoring: times single-row INSERT,
+UPDATE and DELETE statements, and one bulk INSERT, with no user triggers
+enabled, with each group of triggers alone, and with all of them.
+
+    python -m benchmarks.write_cost [--repeat 200] [--bulk 1000]
+
+Rows are copies of existing ones, so run it after
+python -m benchmarks.synthetic_data on a migrated database. Every
+configuration runs in a transaction that is rolled back, but toggling
+triggers takes an ACCESS EXCLUSIVE lock on call_sim_scoring for its duration:
+run it against a benchmark database, not a live one.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from handlers.db_connection import get_db_connection
+
+# Triggers enabled in each configuration, besides the TRUNCATE trigger
+TRIGGER_GROUPS = {
+    'none': (),
+    'data version (0010)': ('call_sim_scoring_version',),
+    'team_benchmark_stats (0002)': ('team_benchmark_stats_insert_delete', 'team_benchmark_stats_update'),
+    'team_overview_rollup (0006)': ('team_overview_rollup_insert_delete', 'team_overview_rollup_update'),
+    'team_trend_daily (0007)': ('team_trend_daily_insert_delete', 'team_trend_daily_update'),
+}
+TRIGGER_GROUPS['all'] = tuple(name for names in TRIGGER_GROUPS.values() for name in names)
+
+COPYABLE_COLUMNS_SQL = """
+    SELECT column_name FROM information_schema.columns
+    WHERE table_name = 'call_sim_scoring' AND column_name <> 'id' AND is_generated = 'NEVER'
+    ORDER BY ordinal_position
+"""
+
+# Changes a skill score, which every aggregate reads
+UPDATE_SQL = """
+    UPDATE call_sim_scoring
+    SET accuracy = jsonb_set(accuracy, '{scores,rapport,score}', to_jsonb(%s::float))
+    WHERE id = %s
+"""
+
+
+def timed(cursor, query, params=()):
+    started = time.perf_counter()
+    cursor.execute(query, params)
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(connection, triggers, source_ids, columns, bulk):
+    """
+    Returns per-statement latencies in milliseconds with only the given
+    triggers enabled, rolling back everything it wrote
+    """
+    cursor = connection.cursor()
+    insert = f"INSERT INTO call_sim_scoring ({columns}) SELECT {columns} FROM call_sim_scoring WHERE id = %s RETURNING id"
+    latencies = {"insert": [], "update": [], "delete": []}
+    try:
+        cursor.execute("ALTER TABLE call_sim_scoring DISABLE TRIGGER USER")
+        for name in ('call_sim_scoring_version_truncate', *triggers):
+            cursor.execute(f"ALTER TABLE call_sim_scoring ENABLE TRIGGER {name}")
+
+        generator = random.Random(7)
+        for source_id in source_ids:
+            started = time.perf_counter()
+            cursor.execute(insert, (source_id,))
+            row_id = cursor.fetchone()[0]
+            latencies["insert"].append((time.perf_counter() - started) * 1000)
+            latencies["update"].append(timed(cursor, UPDATE_SQL, (generator.uniform(40, 100), row_id)))
+            latencies["delete"].append(timed(cursor, "DELETE FROM call_sim_scoring WHERE id = %s", (row_id,)))
+
+        latencies["bulk insert"] = [timed(
+            cursor,
+            f"INSERT INTO call_sim_scoring ({columns}) SELECT {columns} FROM call_sim_scoring ORDER BY id LIMIT %s",
+            (bulk,)
+        )]
+    finally:
+        connection.rollback()
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.write_cost')
+    parser.add_argument('--repeat', type=int, default=200, help='single-row statements of each kind')
+    parser.add_argument('--bulk', type=int, default=1000, help='rows in the bulk INSERT')
+    args = parser.parse_args(argv)
+
+    connection = get_db_connection()
+    if not connection:
+        return 1
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute(COPYABLE_COLUMNS_SQL)
+        columns = ", ".join(row[0] for row in cursor.fetchall())
+        cursor.execute(
+            "SELECT id FROM call_sim_scoring WHERE accuracy IS NOT NULL AND team_id IS NOT NULL ORDER BY random() LIMIT %s",
+            (args.repeat,)
+        )
+        source_ids = [row[0] for row in cursor.fetchall()]
+        connection.rollback()
+        if not source_ids:
+            print("call_sim_scoring has no scored team rows to copy", file=sys.stderr)
+            return 1
+
+        # Warm the plan and buffer caches before the first timed configuration
+        measure(connection, TRIGGER_GROUPS['all'], source_ids[:10], columns, 10)
+
+        results = {
+            group: measure(connection, triggers, source_ids, columns, args.bulk)
+            for group, triggers in TRIGGER_GROUPS.items()
+        }
+    finally:
+        connection.close()
+
+    print(f"Median ms per statement over {len(source_ids)} rows; bulk insert of {args.bulk} rows")
+    kinds = list(results['none'])
+    print(f"{'triggers':30}" + "".join(f"{kind:>14}" for kind in kinds))
+    for group, latencies in results.items():
+        print(f"{group:30}" + "".join(f"{statistics.median(latencies[kind]):14.3f}" for kind in kinds))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
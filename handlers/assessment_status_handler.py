@@ -1,10 +1,6 @@
-import json
-from .db_connection import get_db_connection
-import logging
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from .db_connection import db_connection
+from utils.logger import logger
+from utils.responses import error_response, json_response
 
 def handle_assessment_status(event, context):
     # Get simulation ID from path
@@ -12,88 +8,36 @@ def handle_assessment_status(event, context):
     path = path.lstrip('/')
     path_parts = path.split('/')
     simulation_id = path_parts[1] if path_parts else None
-    logger.info(f"[handle_assessment_status] Simulation ID: {simulation_id}")
+    logger.info("[handle_assessment_status] Simulation ID: %s", simulation_id)
 
     # Validate that simulation_id is not empty
     if not simulation_id:
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Invalid simulation ID format"
-            })
-        }
+        return error_response(400, "Invalid simulation ID format")
 
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
 
-        cursor = connection.cursor()
+            cursor = connection.cursor()
         
-        # Query using simulation_id instead of id
-        query = "SELECT id, simulation_id, assessment_status FROM call_sim_scoring WHERE simulation_id = %s"
-        cursor.execute(query, [simulation_id])
+            # Query using simulation_id instead of id
+            query = "SELECT id, simulation_id, assessment_status FROM call_sim_scoring WHERE simulation_id = %s"
+            cursor.execute(query, [simulation_id])
         
-        # Fetch the result
-        result = cursor.fetchone()
+            # Fetch the result
+            result = cursor.fetchone()
         
-        if not result:
-            return {
-                "statusCode": 404,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Assessment not found"
-                })
-            }
+            if not result:
+                return error_response(404, "Assessment not found")
 
-        # Return the status data
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
+            # Return the status data
+            return json_response(200, {
                 "id": result[0],
                 "simulation_id": result[1],
                 "status": result[2]
             })
-        }
         
     except Exception as e:
-        logger.error(f"[handle_assessment_status] Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close() 
\ No newline at end of file
+        logger.error("[handle_assessment_status] Database error: %s", e)
+        return error_response(500, "Database error occurred")
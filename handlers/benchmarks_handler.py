@@ -1,90 +1,68 @@
-import json
-from .db_connection import get_db_connection
+import os
+from .data_version import known_data_version, refresh_data_version
+from .db_connection import db_connection
+from .filters import InvalidFilter, QuerySpec
+from utils.cache import TTLCache
+from utils.logger import logger
+from utils.responses import JSON_HEADERS, encode_json, error_response, text_response
+
+BENCHMARK_CACHE = TTLCache(
+    maxsize=int(os.environ.get('BENCHMARK_CACHE_SIZE', '256')),
+    ttl=float(os.environ.get('BENCHMARK_CACHE_TTL_SECONDS', '300'))
+)
+
+# Benchmarks are computed from team_benchmark_stats, which holds per team x
+# product x adoption_continuum x situation sums and counts of each skill score
+# (see migrations/0002_team_benchmark_stats.py). "Everyone except this team" is
+# then an aggregate over a few hundred rows rather than a scan of call_sim_scoring.
+SKILL_SUBJECTS = [
+    ('Introduction', 'intro'),
+    ('Rapport', 'rapport'),
+    ('Interest', 'interest'),
+    ('Probing', 'probing'),
+    ('Product', 'product'),
+]
+
+def stats_average(name):
+    """
+    SQL expression averaging a score from its summed statistics
+    """
+    return f"SUM({name}_sum) / NULLIF(SUM({name}_count), 0)"
 
 def calculate_skill_data(cursor, product_id=None, team_id=None):
     """
-    Calculate skill comparison data from call_sim_scoring table
+    Calculate skill comparison data from team_benchmark_stats
     """
-    # Base query to get team performance metrics with dynamic benchmarks
-    query = """
-        WITH all_scores AS (
+    averages = ",\n                ".join(
+        f"{stats_average(name)} as {name}_score"
+        for _, name in [('Overall Score', 'composite')] + SKILL_SUBJECTS
+    )
+    subjects = "\n            UNION ALL".join(
+        f"""
             SELECT 
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score
-            FROM call_sim_scoring
-            WHERE accuracy IS NOT NULL
-            AND team_id::text != %s
-        ),
-        benchmarks AS (
+                '{subject}' as subject,
+                team_scores.{name}_score as team_avg,
+                benchmarks.{name}_score as benchmark
+            FROM team_scores, benchmarks"""
+        for subject, name in [('Overall Score', 'composite')] + SKILL_SUBJECTS
+    )
+
+    query = f"""
+        WITH benchmarks AS (
             SELECT 
-                AVG(intro_score) as intro_benchmark,
-                AVG(rapport_score) as rapport_benchmark,
-                AVG(interest_score) as interest_benchmark,
-                AVG(probing_score) as probing_benchmark,
-                AVG(product_score) as product_benchmark,
-                AVG((intro_score + rapport_score + interest_score + probing_score + product_score) / 5) as total_benchmark
-            FROM all_scores
+                {averages}
+            FROM team_benchmark_stats
+            WHERE has_accuracy
+            AND team_id != %s
         ),
         team_scores AS (
             SELECT 
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score
-            FROM call_sim_scoring
-            WHERE team_id::text = %s
-            {product_filter}
+                {averages}
+            FROM team_benchmark_stats
+            WHERE team_id = %s
+            {{product_filter}}
         )
-        SELECT * FROM (
-            SELECT 
-                'Overall Score' as subject,
-                AVG((intro_score + rapport_score + interest_score + probing_score + product_score) / 5) as team_avg,
-                (SELECT total_benchmark FROM benchmarks) as benchmark
-            FROM team_scores
-            WHERE intro_score IS NOT NULL 
-            AND rapport_score IS NOT NULL 
-            AND interest_score IS NOT NULL 
-            AND probing_score IS NOT NULL 
-            AND product_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Introduction' as subject,
-                AVG(intro_score) as team_avg,
-                (SELECT intro_benchmark FROM benchmarks) as benchmark
-            FROM team_scores
-            WHERE intro_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Rapport' as subject,
-                AVG(rapport_score) as team_avg,
-                (SELECT rapport_benchmark FROM benchmarks) as benchmark
-            FROM team_scores
-            WHERE rapport_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Interest' as subject,
-                AVG(interest_score) as team_avg,
-                (SELECT interest_benchmark FROM benchmarks) as benchmark
-            FROM team_scores
-            WHERE interest_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Probing' as subject,
-                AVG(probing_score) as team_avg,
-                (SELECT probing_benchmark FROM benchmarks) as benchmark
-            FROM team_scores
-            WHERE probing_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Product' as subject,
-                AVG(product_score) as team_avg,
-                (SELECT product_benchmark FROM benchmarks) as benchmark
-            FROM team_scores
-            WHERE product_score IS NOT NULL
+        SELECT * FROM ({subjects}
         ) sub
         WHERE team_avg IS NOT NULL
     """
@@ -119,33 +97,41 @@ def calculate_skill_data(cursor, product_id=None, team_id=None):
 
 def calculate_benchmark_data(cursor, product_id=None, team_id=None):
     """
-    Calculate benchmark comparison data from call_sim_scoring table
+    Calculate benchmark comparison data from team_benchmark_stats
     """
-    # Base query to get team performance metrics with dynamic benchmarks
-    query = """
+    team_averages = ",\n                ".join(
+        f"{stats_average(name)} as {name}_score" for _, name in SKILL_SUBJECTS
+    )
+    metrics = "\n            UNION ALL".join(
+        f"""
+            SELECT 
+                '{metric}' as metric,
+                AVG({name}_score) as team_average,
+                (SELECT AVG({name}_score) FROM all_scores) as industry_benchmark,
+                ROUND((AVG({name}_score) - (SELECT AVG({name}_score) FROM all_scores))::numeric, 1) as difference,
+                {sort_order} as sort_order
+            FROM team_scores
+            WHERE {name}_score IS NOT NULL"""
+        for sort_order, (metric, name) in enumerate(SKILL_SUBJECTS, start=2)
+    )
+
+    # Benchmarks average the per-team averages, so the statistics are first
+    # rolled up to one row per team
+    query = f"""
         WITH all_scores AS (
             SELECT 
                 team_id,
-                AVG(CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT)) as intro_score,
-                AVG(CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT)) as rapport_score,
-                AVG(CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT)) as interest_score,
-                AVG(CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT)) as probing_score,
-                AVG(CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT)) as product_score,
-                COUNT(*) as total_simulations,
-                AVG(CASE 
-                    WHEN conversation_data->'analysis'->'evaluation_criteria_results'->'introduction'->>'result' = 'success' THEN 100
-                    ELSE 0
-                END) as improvement_rate
-            FROM call_sim_scoring
-            WHERE accuracy IS NOT NULL
-            AND team_id::text != %s
+                {team_averages},
+                SUM(row_count) as total_simulations
+            FROM team_benchmark_stats
+            WHERE has_accuracy
+            AND team_id != %s
             GROUP BY team_id
         ),
         overall_benchmark AS (
             SELECT 
                 AVG((intro_score + rapport_score + interest_score + probing_score + product_score) / 5) as overall_benchmark_score,
-                AVG(total_simulations) as simulations_benchmark,
-                AVG(improvement_rate) as improvement_benchmark
+                AVG(total_simulations) as simulations_benchmark
             FROM all_scores
             WHERE intro_score IS NOT NULL 
             AND rapport_score IS NOT NULL 
@@ -156,19 +142,11 @@ def calculate_benchmark_data(cursor, product_id=None, team_id=None):
         team_scores AS (
             SELECT 
                 team_id,
-                AVG(CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT)) as intro_score,
-                AVG(CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT)) as rapport_score,
-                AVG(CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT)) as interest_score,
-                AVG(CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT)) as probing_score,
-                AVG(CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT)) as product_score,
-                COUNT(*) as total_simulations,
-                AVG(CASE 
-                    WHEN conversation_data->'analysis'->'evaluation_criteria_results'->'introduction'->>'result' = 'success' THEN 100
-                    ELSE 0
-                END) as improvement_rate
-            FROM call_sim_scoring
-            WHERE team_id::text = %s
-            {product_filter}
+                {team_averages},
+                SUM(row_count) as total_simulations
+            FROM team_benchmark_stats
+            WHERE team_id = %s
+            {{product_filter}}
             GROUP BY team_id
         ),
         benchmark_results AS (
@@ -184,51 +162,7 @@ def calculate_benchmark_data(cursor, product_id=None, team_id=None):
             AND interest_score IS NOT NULL 
             AND probing_score IS NOT NULL 
             AND product_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Introduction' as metric,
-                AVG(intro_score) as team_average,
-                (SELECT AVG(intro_score) FROM all_scores) as industry_benchmark,
-                ROUND((AVG(intro_score) - (SELECT AVG(intro_score) FROM all_scores))::numeric, 1) as difference,
-                2 as sort_order
-            FROM team_scores
-            WHERE intro_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Rapport' as metric,
-                AVG(rapport_score) as team_average,
-                (SELECT AVG(rapport_score) FROM all_scores) as industry_benchmark,
-                ROUND((AVG(rapport_score) - (SELECT AVG(rapport_score) FROM all_scores))::numeric, 1) as difference,
-                3 as sort_order
-            FROM team_scores
-            WHERE rapport_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Interest' as metric,
-                AVG(interest_score) as team_average,
-                (SELECT AVG(interest_score) FROM all_scores) as industry_benchmark,
-                ROUND((AVG(interest_score) - (SELECT AVG(interest_score) FROM all_scores))::numeric, 1) as difference,
-                4 as sort_order
-            FROM team_scores
-            WHERE interest_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Probing' as metric,
-                AVG(probing_score) as team_average,
-                (SELECT AVG(probing_score) FROM all_scores) as industry_benchmark,
-                ROUND((AVG(probing_score) - (SELECT AVG(probing_score) FROM all_scores))::numeric, 1) as difference,
-                5 as sort_order
-            FROM team_scores
-            WHERE probing_score IS NOT NULL
-            UNION ALL
-            SELECT 
-                'Product' as metric,
-                AVG(product_score) as team_average,
-                (SELECT AVG(product_score) FROM all_scores) as industry_benchmark,
-                ROUND((AVG(product_score) - (SELECT AVG(product_score) FROM all_scores))::numeric, 1) as difference,
-                6 as sort_order
-            FROM team_scores
-            WHERE product_score IS NOT NULL
+            UNION ALL{metrics}
             UNION ALL
             SELECT 
                 'Simulations Completed' as metric,
@@ -277,109 +211,89 @@ def calculate_benchmark_data(cursor, product_id=None, team_id=None):
 
     return benchmark_data
 
-def calculate_adoption_data(cursor, product_id=None, team_id=None):
+def calculate_group_comparison(cursor, dimension, label, product_id=None, team_id=None, require_benchmark=False):
     """
-    Calculate adoption level comparison data from call_sim_scoring table
+    Compare the team's composite score with everyone else's for each value of a
+    team_benchmark_stats dimension, followed by an 'Overall' row. With
+    require_benchmark, values where nobody else has a complete set of skill
+    scores are left out.
     """
-    # Base query to get team performance metrics with dynamic benchmarks
-    query = """
-        WITH all_scores AS (
+    query = f"""
+        WITH benchmarks AS (
             SELECT 
-                adoption_continuum,
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score
-            FROM call_sim_scoring
-            WHERE accuracy IS NOT NULL
-            AND adoption_continuum IS NOT NULL
-            AND team_id::text != %s
-        ),
-        benchmarks AS (
-            SELECT 
-                adoption_continuum,
-                AVG((intro_score + rapport_score + interest_score + probing_score + product_score) / 5) as benchmark_score
-            FROM all_scores
-            WHERE intro_score IS NOT NULL 
-            AND rapport_score IS NOT NULL 
-            AND interest_score IS NOT NULL 
-            AND probing_score IS NOT NULL 
-            AND product_score IS NOT NULL
-            GROUP BY adoption_continuum
+                {dimension},
+                {stats_average('composite')} as benchmark_score
+            FROM team_benchmark_stats
+            WHERE has_accuracy
+            AND {dimension} IS NOT NULL
+            AND team_id != %s
+            GROUP BY {dimension}
+            {"HAVING SUM(composite_count) > 0" if require_benchmark else ""}
         ),
         overall_benchmark AS (
-            SELECT AVG((intro_score + rapport_score + interest_score + probing_score + product_score) / 5) as overall_benchmark_score
-            FROM all_scores
-            WHERE intro_score IS NOT NULL 
-            AND rapport_score IS NOT NULL 
-            AND interest_score IS NOT NULL 
-            AND probing_score IS NOT NULL 
-            AND product_score IS NOT NULL
+            SELECT {stats_average('composite')} as overall_benchmark_score
+            FROM team_benchmark_stats
+            WHERE has_accuracy
+            AND {dimension} IS NOT NULL
+            AND team_id != %s
         ),
         team_scores AS (
             SELECT 
-                adoption_continuum,
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score
-            FROM call_sim_scoring
-            WHERE team_id::text = %s
-            {product_filter}
-            AND adoption_continuum IS NOT NULL
+                {dimension},
+                SUM(composite_sum) as composite_sum,
+                SUM(composite_count) as composite_count
+            FROM team_benchmark_stats
+            WHERE team_id = %s
+            {{product_filter}}
+            AND {dimension} IS NOT NULL
+            GROUP BY {dimension}
         ),
-        adoption_results AS (
+        comparison_results AS (
             SELECT 
-                INITCAP(t.adoption_continuum) as type,
-                AVG((t.intro_score + t.rapport_score + t.interest_score + t.probing_score + t.product_score) / 5) as team_average,
+                INITCAP(t.{dimension}) as {label},
+                t.composite_sum / t.composite_count as team_average,
                 b.benchmark_score as industry_benchmark,
-                ROUND((AVG((t.intro_score + t.rapport_score + t.interest_score + t.probing_score + t.product_score) / 5) - b.benchmark_score)::numeric, 1) as difference,
+                ROUND((t.composite_sum / t.composite_count - b.benchmark_score)::numeric, 1) as difference,
                 0 as sort_order
             FROM team_scores t
-            JOIN benchmarks b ON t.adoption_continuum = b.adoption_continuum
-            WHERE t.intro_score IS NOT NULL 
-            AND t.rapport_score IS NOT NULL 
-            AND t.interest_score IS NOT NULL 
-            AND t.probing_score IS NOT NULL 
-            AND t.product_score IS NOT NULL
-            GROUP BY t.adoption_continuum, b.benchmark_score
+            JOIN benchmarks b ON t.{dimension} = b.{dimension}
+            WHERE t.composite_count > 0
             UNION ALL
             SELECT 
-                'Overall' as type,
-                AVG((t.intro_score + t.rapport_score + t.interest_score + t.probing_score + t.product_score) / 5) as team_average,
+                'Overall' as {label},
+                SUM(t.composite_sum) / NULLIF(SUM(t.composite_count), 0) as team_average,
                 (SELECT overall_benchmark_score FROM overall_benchmark) as industry_benchmark,
-                ROUND((AVG((t.intro_score + t.rapport_score + t.interest_score + t.probing_score + t.product_score) / 5) - (SELECT overall_benchmark_score FROM overall_benchmark))::numeric, 1) as difference,
+                ROUND((SUM(t.composite_sum) / NULLIF(SUM(t.composite_count), 0) - (SELECT overall_benchmark_score FROM overall_benchmark))::numeric, 1) as difference,
                 1 as sort_order
             FROM team_scores t
-            WHERE t.intro_score IS NOT NULL 
-            AND t.rapport_score IS NOT NULL 
-            AND t.interest_score IS NOT NULL 
-            AND t.probing_score IS NOT NULL 
-            AND t.product_score IS NOT NULL
         )
         SELECT 
-            type,
+            {label},
             team_average,
             industry_benchmark,
             difference
-        FROM adoption_results
-        ORDER BY sort_order, type
+        FROM comparison_results
+        ORDER BY sort_order, {label}
     """
-    
+
     # Add product filter if specified
     product_filter = ""
-    params = [team_id, team_id]  # team_id is used twice - once for excluding from benchmark, once for team scores
+    params = [team_id, team_id, team_id]  # twice to exclude the team from the benchmarks, once for team scores
     if product_id and product_id != 'all':
         product_filter = "AND product_id = %s"
         params.append(product_id)
-    
+
     query = query.format(product_filter=product_filter)
 
     # Execute query
     cursor.execute(query, params)
-    results = cursor.fetchall()
+    return cursor.fetchall()
+
+def calculate_adoption_data(cursor, product_id=None, team_id=None):
+    """
+    Calculate adoption level comparison data from team_benchmark_stats
+    """
+    results = calculate_group_comparison(cursor, 'adoption_continuum', 'type', product_id, team_id, require_benchmark=True)
 
     if not results:
         return []
@@ -399,102 +313,9 @@ def calculate_adoption_data(cursor, product_id=None, team_id=None):
 
 def calculate_situation_data(cursor, product_id=None, team_id=None):
     """
-    Calculate situation comparison data from call_sim_scoring table
+    Calculate situation comparison data from team_benchmark_stats
     """
-    # Base query to get team performance metrics with dynamic benchmarks
-    query = """
-        WITH all_scores AS (
-            SELECT 
-                situation,
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score
-            FROM call_sim_scoring
-            WHERE accuracy IS NOT NULL
-            AND situation IS NOT NULL
-            AND team_id::text != %s
-        ),
-        benchmarks AS (
-            SELECT 
-                situation,
-                AVG((intro_score + rapport_score + interest_score + probing_score + product_score) / 5) as benchmark_score
-            FROM all_scores
-            GROUP BY situation
-        ),
-        team_scores AS (
-            SELECT 
-                situation,
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score
-            FROM call_sim_scoring
-            WHERE team_id::text = %s
-            {product_filter}
-            AND situation IS NOT NULL
-        ),
-        overall_benchmark AS (
-            SELECT AVG((intro_score + rapport_score + interest_score + probing_score + product_score) / 5) as overall_benchmark_score
-            FROM all_scores
-            WHERE intro_score IS NOT NULL 
-            AND rapport_score IS NOT NULL 
-            AND interest_score IS NOT NULL 
-            AND probing_score IS NOT NULL 
-            AND product_score IS NOT NULL
-        ),
-        situation_results AS (
-            SELECT 
-                INITCAP(t.situation) as situation,
-                AVG((t.intro_score + t.rapport_score + t.interest_score + t.probing_score + t.product_score) / 5) as team_average,
-                b.benchmark_score as industry_benchmark,
-                ROUND((AVG((t.intro_score + t.rapport_score + t.interest_score + t.probing_score + t.product_score) / 5) - b.benchmark_score)::numeric, 1) as difference,
-                0 as sort_order
-            FROM team_scores t
-            JOIN benchmarks b ON t.situation = b.situation
-            WHERE t.intro_score IS NOT NULL 
-            AND t.rapport_score IS NOT NULL 
-            AND t.interest_score IS NOT NULL 
-            AND t.probing_score IS NOT NULL 
-            AND t.product_score IS NOT NULL
-            GROUP BY t.situation, b.benchmark_score
-            UNION ALL
-            SELECT 
-                'Overall' as situation,
-                AVG((t.intro_score + t.rapport_score + t.interest_score + t.probing_score + t.product_score) / 5) as team_average,
-                (SELECT overall_benchmark_score FROM overall_benchmark) as industry_benchmark,
-                ROUND((AVG((t.intro_score + t.rapport_score + t.interest_score + t.probing_score + t.product_score) / 5) - (SELECT overall_benchmark_score FROM overall_benchmark))::numeric, 1) as difference,
-                1 as sort_order
-            FROM team_scores t
-            WHERE t.intro_score IS NOT NULL 
-            AND t.rapport_score IS NOT NULL 
-            AND t.interest_score IS NOT NULL 
-            AND t.probing_score IS NOT NULL 
-            AND t.product_score IS NOT NULL
-        )
-        SELECT 
-            situation,
-            team_average,
-            industry_benchmark,
-            difference
-        FROM situation_results
-        ORDER BY sort_order, situation
-    """
-    
-    # Add product filter if specified
-    product_filter = ""
-    params = [team_id, team_id]  # team_id is used twice - once for excluding from benchmark, once for team scores
-    if product_id and product_id != 'all':
-        product_filter = "AND product_id = %s"
-        params.append(product_id)
-    
-    query = query.format(product_filter=product_filter)
-
-    # Execute query
-    cursor.execute(query, params)
-    results = cursor.fetchall()
+    results = calculate_group_comparison(cursor, 'situation', 'situation', product_id, team_id)
 
     if not results:
         return []
@@ -540,6 +361,78 @@ def get_filter_options(cursor, team_id=None):
         "products": products
     }
 
+def calculate_benchmark_response(cursor, path, product_id=None, team_id=None):
+    """
+    Compute the status code and body for a benchmarks endpoint
+    """
+    # Handle different endpoints
+    if path == 'industry-benchmarks':
+        # Get filter options with team_id to filter products
+        filter_options = get_filter_options(cursor, team_id)
+
+        # Get skill data
+        skill_data = calculate_skill_data(cursor, product_id, team_id)
+
+        if not skill_data:
+            return 404, {
+                "error": "No data found for the specified filters"
+            }
+
+        return 200, {
+            "skillData": skill_data,
+            "filterOptions": filter_options
+        }
+    elif path == 'industry-benchmarks/detail':
+        # Get benchmark data
+        benchmark_data = calculate_benchmark_data(cursor, product_id, team_id)
+
+        if not benchmark_data:
+            return 404, {
+                "error": "No data found for the specified filters"
+            }
+
+        return 200, {
+            "benchmarkData": benchmark_data
+        }
+    elif path == 'industry-benchmarks/adoption':
+        # Get adoption data
+        adoption_data = calculate_adoption_data(cursor, product_id, team_id)
+
+        if not adoption_data:
+            return 404, {
+                "error": "No data found for the specified filters"
+            }
+
+        return 200, {
+            "adoptionData": adoption_data
+        }
+    elif path == 'industry-benchmarks/situation':
+        try:
+            # Get situation data
+            situation_data = calculate_situation_data(cursor, product_id, team_id)
+
+            if not situation_data:
+                return 404, {
+                    "error": "No data found for the specified filters"
+                }
+
+            # Get filter options
+            filter_options = get_filter_options(cursor, team_id)
+
+            return 200, {
+                "situationData": situation_data,
+                "filterOptions": filter_options
+            }
+        except Exception as e:
+            logger.error("Error in situation endpoint: %s", e)
+            raise
+
+    # Return 404 for unknown paths
+    return 404, {
+        "message": "Endpoint not found",
+        "path": path
+    }
+
 def handle_benchmarks_request(event, context):
     # Get query parameters and path
     query_params = event.get('queryStringParameters', {}) or {}
@@ -547,183 +440,42 @@ def handle_benchmarks_request(event, context):
     
     # Remove leading slash if present
     path = path.lstrip('/')
+
+    # Get filters from query parameters
+    try:
+        spec = QuerySpec.from_query_params(query_params, 'team_id', 'product_id')
+    except InvalidFilter:
+        return error_response(400, "Invalid team ID format")
+
+    # Benchmarks only change when call_sim_scoring does, so responses are
+    # cached per data version. While the last version read is still fresh a
+    # hit is served without touching the database.
+    cache_key = (path, spec.key)
+    cached = BENCHMARK_CACHE.get(cache_key)
+    if cached and cached[0] == known_data_version():
+        _, status_code, body = cached
+        return text_response(status_code, body, JSON_HEADERS)
     
     try:
         # Connect to database
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
 
-        cursor = connection.cursor()
-        
-        # Get filters from query parameters
-        product_id = query_params.get('product')
-        team_id = query_params.get('team')
-        
-        # Handle different endpoints
-        if path == 'industry-benchmarks':
-            # Get filter options with team_id to filter products
-            filter_options = get_filter_options(cursor, team_id)
-            
-            # Get skill data
-            skill_data = calculate_skill_data(cursor, product_id, team_id)
-            
-            if not skill_data:
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "skillData": skill_data,
-                    "filterOptions": filter_options
-                })
-            }
-        elif path == 'industry-benchmarks/detail':
-            # Get benchmark data
-            benchmark_data = calculate_benchmark_data(cursor, product_id, team_id)
-            
-            if not benchmark_data:
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "benchmarkData": benchmark_data
-                })
-            }
-        elif path == 'industry-benchmarks/adoption':
-            # Get adoption data
-            adoption_data = calculate_adoption_data(cursor, product_id, team_id)
-            
-            if not adoption_data:
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "adoptionData": adoption_data
-                })
-            }
-        elif path == 'industry-benchmarks/situation':
-            try:
-                # Get situation data
-                situation_data = calculate_situation_data(cursor, product_id, team_id)
-                
-                if not situation_data:
-                    return {
-                        "statusCode": 404,
-                        "headers": {
-                            "Access-Control-Allow-Origin": "*",
-                            "Access-Control-Allow-Headers": "*",
-                            "Access-Control-Allow-Methods": "*"
-                        },
-                        "body": json.dumps({
-                            "error": "No data found for the specified filters"
-                        })
-                    }
-                
-                # Get filter options
-                filter_options = get_filter_options(cursor, team_id)
-                
-                return {
-                    "statusCode": 200,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "situationData": situation_data,
-                        "filterOptions": filter_options
-                    })
-                }
-            except Exception as e:
-                print(f"Error in situation endpoint: {str(e)}")
-                raise
-        
-        # Return 404 for unknown paths
-        return {
-            "statusCode": 404,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "message": "Endpoint not found",
-                "path": path
-            })
-        }
+            cursor = connection.cursor()
+
+            data_version = refresh_data_version(cursor)
+            if cached and cached[0] == data_version:
+                _, status_code, body = cached
+            else:
+                status_code, response_data = calculate_benchmark_response(cursor, path, spec.get('product_id'), spec.get('team_id'))
+                body = encode_json(response_data)
+                # Only cache results computed entirely at data_version
+                if refresh_data_version(cursor) == data_version:
+                    BENCHMARK_CACHE.set(cache_key, (data_version, status_code, body))
+
+            return text_response(status_code, body, JSON_HEADERS)
             
     except Exception as e:
-        print(f"Database error: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": f"Database error occurred: {str(e)}"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close() 
\ No newline at end of file
+        logger.error("Database error: %s", e)
+        return error_response(500, f"Database error occurred: {str(e)}")
@@ -0,0 +1,125 @@
+"""
+Conditional GET for the report routes.
+
+A report is a function of its route, its query parameters and the contents of
+call_sim_scoring, whose data version (migrations/0010) advances with every
+committed change. The ETag hashes exactly those, so it is known before the
+handler runs: a dashboard polling unchanged data gets a 304 for the price of
+one version read, or of none while the last version read is still fresh
+(DATA_VERSION_CHECK_SECONDS). A response is only tagged if the version read
+again after the handler ran is unchanged, since otherwise it may include
+changes the ETag does not cover; handlers that answer from a cache without
+touching the database skip that read.
+
+Streamed (NDJSON) responses are never tagged: their status and headers are
+final before the body is read, so a stream cut short by an error would
+otherwise be revalidated as current until the data changed.
+"""
+import hashlib
+import json
+import os
+import time
+from types import MappingProxyType
+
+from .data_version import known_data_version, refresh_data_version
+from .db_connection import connections_acquired, db_connection
+from .streaming import wants_stream
+from utils.logger import logger
+from utils.responses import CORS_HEADERS, text_response
+
+# Reports over a trailing window (the default 12-month team trend) also move
+# with the clock, so ETags change at least this often
+ETAG_CLOCK_SECONDS = float(os.environ.get('ETAG_CLOCK_SECONDS', '3600'))
+
+# Clients always revalidate, and scripts may read the ETag
+CONDITIONAL_HEADERS = MappingProxyType({
+    "Access-Control-Expose-Headers": "ETag",
+    "Cache-Control": "no-cache"
+})
+
+
+def current_data_version(refresh=False):
+    """
+    Returns the data version, reading it from Postgres unless the last read
+    is still fresh (or refresh is set). Returns None if it cannot be read.
+    """
+    version = None if refresh else known_data_version()
+    if version is not None:
+        return version
+    try:
+        with db_connection() as connection:
+            if not connection:
+                return None
+            return refresh_data_version(connection.cursor())
+    except Exception as e:
+        logger.warning("Error reading data version: %s", e)
+        return None
+
+
+def request_etag(event, version):
+    """
+    Weak ETag for the response to a request at the given data version
+    """
+    query_params = event.get('queryStringParameters', {}) or {}
+    scope = [
+        event.get('path', ''),
+        sorted(query_params.items()),
+        version,
+        int(time.time() // ETAG_CLOCK_SECONDS)
+    ]
+    digest = hashlib.sha1(json.dumps(scope, separators=(',', ':')).encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(event, etag):
+    """
+    True if the request's If-None-Match header lists etag (weak comparison)
+    """
+    headers = event.get('headers', {}) or {}
+    header = next((value for name, value in headers.items() if name.lower() == 'if-none-match'), None)
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    opaque_tag = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque_tag for tag in header.split(','))
+
+
+def conditional_get(event, handle):
+    """
+    Answers 304 Not Modified if the client already holds the current response
+    to this request; otherwise runs handle(event) and tags a buffered 200
+    response with its ETag if the data version did not move meanwhile.
+    Streamed requests, and requests made without a data version, are handled
+    as usual.
+    """
+    if wants_stream(event):
+        return handle(event)
+
+    version = current_data_version()
+    if version is None:
+        return handle(event)
+
+    etag = request_etag(event, version)
+    if etag_matches(event, etag):
+        return text_response(304, "", {**CORS_HEADERS, **CONDITIONAL_HEADERS, "ETag": etag})
+
+    acquired = connections_acquired()
+    response = handle(event)
+    if response.get('statusCode') != 200 or not isinstance(response.get('body'), str):
+        return response
+
+    # A handler that did not touch the database answered from a result cached
+    # at this version (BENCHMARK_CACHE). Otherwise the data may have changed
+    # while it ran, and the body may reflect the change.
+    if connections_acquired() != acquired and current_data_version(refresh=True) != version:
+        return response
+
+    return {
+        **response,
+        "headers": {
+            **response.get('headers', {}),
+            **CONDITIONAL_HEADERS,
+            "ETag": etag
+        }
+    }
@@ -0,0 +1,39 @@
+import os
+import time
+
+# How long a data version read from Postgres is trusted before it is checked
+# again. Within this window cached results are served without a round trip.
+DATA_VERSION_CHECK_SECONDS = float(os.environ.get('DATA_VERSION_CHECK_SECONDS', '10'))
+
+_version = None
+_checked_at = 0.0
+
+
+def read_data_version(cursor):
+    """
+    Returns the current call_sim_scoring data version, which advances with
+    every committed change and becomes visible together with it (see
+    migrations/0010_statement_data_version.py).
+    """
+    cursor.execute("SELECT version FROM call_sim_scoring_data_version")
+    return cursor.fetchone()[0]
+
+
+def known_data_version():
+    """
+    Returns the last data version read, or None if it has not been checked
+    within DATA_VERSION_CHECK_SECONDS.
+    """
+    if _version is None or time.monotonic() - _checked_at > DATA_VERSION_CHECK_SECONDS:
+        return None
+    return _version
+
+
+def refresh_data_version(cursor):
+    """
+    Reads the data version from the database and remembers it.
+    """
+    global _version, _checked_at
+    _version = read_data_version(cursor)
+    _checked_at = time.monotonic()
+    return _version
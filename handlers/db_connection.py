@@ -1,5 +1,412 @@
-import pg8000
+import logging
 import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import count, islice
+
+import pg8000
+from pg8000.core import DATA_ROW
+
+from utils.logger import logger
+
+# Connections are kept in a module-level pool so they survive across warm
+# Lambda invocations instead of paying TCP + TLS + auth on every request.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '2'))
+DB_POOL_MAX_AGE_SECONDS = float(os.environ.get('DB_POOL_MAX_AGE_SECONDS', '900'))
+DB_POOL_HEALTHCHECK_SECONDS = float(os.environ.get('DB_POOL_HEALTHCHECK_SECONDS', '30'))
+
+# Parameterized statements run as named server-side prepared statements, kept
+# per connection and keyed by their SQL text (one per query shape), so Postgres
+# parses them once per connection instead of once per request. 0 disables.
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_PREPARED_STATEMENT_CACHE_SIZE', '64'))
+# When set, each newly prepared statement is EXPLAINed once to record its
+# planning time, so prepared_statement_stats() can report plan time saved.
+DB_PREPARED_STATEMENT_MEASURE_PLANNING = os.environ.get('DB_PREPARED_STATEMENT_MEASURE_PLANNING', '') == '1'
+
+# Rows fetched per round trip by iter_rows
+DB_FETCH_BATCH_SIZE = int(os.environ.get('DB_FETCH_BATCH_SIZE', '500'))
+
+# Each statement on a pooled connection is timed into QUERY_STATS; 0 disables.
+# Statements that take longer than DB_SLOW_QUERY_MS are logged as slow queries.
+DB_QUERY_STATS = os.environ.get('DB_QUERY_STATS', '1') != '0'
+# Rows, bytes and decode time are counted per DataRow message, which costs a
+# Python call per row, so only when this is 1 or the request is sampled for
+# DEBUG logging (utils/logger.py). Otherwise decoding counts as fetch time.
+DB_QUERY_ROW_STATS = os.environ.get('DB_QUERY_ROW_STATS', '0') == '1'
+DB_SLOW_QUERY_MS = float(os.environ.get('DB_SLOW_QUERY_MS', '500'))
+
+_placeholder = re.compile(r'%[s%]')
+_planning_time = re.compile(r'Planning Time: ([0-9.]+) ms')
+
+_pool = []
+_pool_lock = threading.Lock()
+_acquisitions = 0
+_cursor_ids = count(1)
+
+# Modules whose functions only pass queries through; a statement's caller is
+# the first function outside them
+_query_plumbing = {__name__, 'handlers.streaming'}
+
+
+def named_placeholders(query):
+    """
+    Rewrites %s placeholders as :p1, :p2, ... for pg8000's prepare().
+    """
+    numbers = iter(range(1, query.count('%s') + 1))
+    return _placeholder.sub(lambda m: '%' if m.group() == '%%' else f":p{next(numbers)}", query)
+
+
+class StatementStats:
+    """
+    What one statement cost: time spent executing it and fetching its rows
+    (round trips), time spent decoding the rows into Python values, and the
+    rows and DataRow bytes received.
+    """
+
+    __slots__ = ('query', 'caller', 'execute_seconds', 'fetch_seconds', 'decode_seconds', 'rows', 'bytes', 'slow')
+
+    def __init__(self, query, caller):
+        self.query = query
+        self.caller = caller
+        self.execute_seconds = 0.0
+        self.fetch_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.slow = False
+
+    def total_seconds(self):
+        return self.execute_seconds + self.fetch_seconds + self.decode_seconds
+
+    def as_dict(self, rows=True):
+        document = {
+            "caller": self.caller,
+            "query": " ".join(self.query.split())[:200],
+            "executeMs": round(self.execute_seconds * 1000, 3),
+            "fetchMs": round(self.fetch_seconds * 1000, 3)
+        }
+        if rows:
+            document.update(
+                decodeMs=round(self.decode_seconds * 1000, 3),
+                rows=self.rows,
+                bytes=self.bytes
+            )
+        return document
+
+
+class QueryStats:
+    """
+    Statements run since the last reset(), which lambda_function does at the
+    start of every request. Decoding happens inside pg8000 while a result is
+    read, so when track_rows is set it is timed per DataRow message and
+    charged to the statement being executed or fetched at the time.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.statements = []
+        self.current = None
+        self.track_rows = DB_QUERY_STATS and (DB_QUERY_ROW_STATS or logger.isEnabledFor(logging.DEBUG))
+
+    def begin(self, query, caller):
+        if not DB_QUERY_STATS:
+            return None
+        statement = StatementStats(query, caller)
+        self.statements.append(statement)
+        return statement
+
+    @contextmanager
+    def measure(self, statement, phase):
+        """
+        Times the block as the statement's execute or fetch phase, not
+        counting the row decoding inside it
+        """
+        if statement is None:
+            yield
+            return
+
+        self.current = statement
+        decoded = statement.decode_seconds
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start - (statement.decode_seconds - decoded)
+            if phase == 'execute':
+                statement.execute_seconds += elapsed
+            else:
+                statement.fetch_seconds += elapsed
+            if not statement.slow and statement.total_seconds() * 1000 >= DB_SLOW_QUERY_MS:
+                statement.slow = True
+                logger.warning(
+                    "Slow query in %s: %.1f ms: %s",
+                    statement.caller, statement.total_seconds() * 1000, ' '.join(statement.query.split())
+                )
+
+    def row_decoded(self, size, seconds):
+        statement = self.current
+        if statement is not None:
+            statement.rows += 1
+            statement.bytes += size
+            statement.decode_seconds += seconds
+
+    def total_seconds(self):
+        return sum(statement.total_seconds() for statement in self.statements)
+
+    def summary(self):
+        """
+        Request totals plus every statement, slowest first. Rows, bytes and
+        decode time are only included when they were tracked.
+        """
+        statements = sorted(self.statements, key=StatementStats.total_seconds, reverse=True)
+        summary = {
+            "queries": len(statements),
+            "executeMs": round(sum(s.execute_seconds for s in statements) * 1000, 3),
+            "fetchMs": round(sum(s.fetch_seconds for s in statements) * 1000, 3),
+            "decodeMs": round(sum(s.decode_seconds for s in statements) * 1000, 3),
+            "rows": sum(s.rows for s in statements),
+            "bytes": sum(s.bytes for s in statements),
+            "statements": [statement.as_dict(self.track_rows) for statement in statements]
+        }
+        if not self.track_rows:
+            for key in ('decodeMs', 'rows', 'bytes'):
+                del summary[key]
+        return summary
+
+    def server_timing(self):
+        """
+        Server-Timing header value summarizing the request's database work
+        """
+        execute = sum(s.execute_seconds for s in self.statements) * 1000
+        fetch = sum(s.fetch_seconds for s in self.statements) * 1000
+        if not self.track_rows:
+            return (
+                f'db;dur={execute + fetch:.2f};desc="{len(self.statements)} queries", '
+                f'db-execute;dur={execute:.2f}, db-fetch;dur={fetch:.2f}'
+            )
+        decode = sum(s.decode_seconds for s in self.statements) * 1000
+        rows = sum(s.rows for s in self.statements)
+        return (
+            f'db;dur={execute + fetch + decode:.2f};desc="{len(self.statements)} queries, {rows} rows", '
+            f'db-execute;dur={execute:.2f}, db-fetch;dur={fetch:.2f}, db-decode;dur={decode:.2f}'
+        )
+
+
+QUERY_STATS = QueryStats()
+
+
+def query_caller():
+    """
+    Name of the function that issued the statement being run
+    """
+    frame = sys._getframe(2)
+    while frame.f_back is not None and frame.f_globals.get('__name__') in _query_plumbing:
+        frame = frame.f_back
+    return frame.f_code.co_name
+
+
+def timed_data_row_handler(handle_data_row):
+    """
+    Wraps a connection's DataRow handler so it times the decoding of every
+    row, and counts the rows and bytes, into QUERY_STATS
+    """
+    def timed_data_row(data, context):
+        start = time.perf_counter()
+        handle_data_row(data, context)
+        QUERY_STATS.row_decoded(len(data), time.perf_counter() - start)
+
+    return timed_data_row
+
+
+class PreparedStatement:
+    """
+    One named server-side statement plus what it has saved so far.
+    """
+
+    def __init__(self, connection, query):
+        start = time.perf_counter()
+        self.statement = connection.prepare(named_placeholders(query))
+        self.parse_seconds = time.perf_counter() - start
+        self.plan_seconds = None
+        self.executions = 0
+        self.query = query
+        self.description = [
+            (column['name'], column['type_oid'], None, None, None, None, None)
+            for column in self.statement.row_desc
+        ] if self.statement.row_desc else None
+
+    @property
+    def name(self):
+        return self.statement.name_bin[:-1].decode('ascii')
+
+    def measure_planning(self, cursor, params):
+        cursor.execute("EXPLAIN (SUMMARY) " + self.query, params)
+        for (line,) in cursor.fetchall():
+            match = _planning_time.search(line)
+            if match:
+                self.plan_seconds = float(match.group(1)) / 1000
+
+    def run(self, params):
+        rows = self.statement.run(**{f"p{i}": value for i, value in enumerate(params, 1)})
+        self.executions += 1
+        return rows
+
+    def close(self):
+        try:
+            self.statement.close()
+        except Exception:
+            # Closing the connection drops it anyway
+            pass
+
+
+class PreparedStatementCursor:
+    """
+    Cursor that runs parameterized statements through its connection's
+    prepared statement cache. Statements without parameters go straight to
+    the pg8000 cursor.
+    """
+
+    def __init__(self, pooled):
+        self.pooled = pooled
+        self.cursor = pooled.connection.cursor()
+        self.stats = None
+        self._rows = None
+        self._description = None
+
+    @property
+    def description(self):
+        if self._rows is None:
+            return self.cursor.description
+        return self._description
+
+    def execute(self, query, params=()):
+        self.stats = QUERY_STATS.begin(query, query_caller())
+        with QUERY_STATS.measure(self.stats, 'execute'):
+            if not params or DB_PREPARED_STATEMENT_CACHE_SIZE <= 0:
+                self._rows = None
+                self.cursor.execute(query, params)
+                return self
+
+            statement = self.pooled.prepared_statement(query, self.cursor, params)
+            try:
+                rows = statement.run(params)
+            except Exception:
+                # Statements can go stale, e.g. when a migration changes their
+                # result type; prepare a fresh one next time
+                self.pooled.forget_statement(query)
+                raise
+            self._rows = iter(rows)
+            self._description = statement.description
+            return self
+
+    def __iter__(self):
+        return self._rows if self._rows is not None else iter(self.cursor)
+
+    def fetchone(self):
+        with QUERY_STATS.measure(self.stats, 'fetch'):
+            if self._rows is None:
+                return self.cursor.fetchone()
+            return next(self._rows, None)
+
+    def fetchmany(self, size=None):
+        with QUERY_STATS.measure(self.stats, 'fetch'):
+            if self._rows is None:
+                return self.cursor.fetchmany(size)
+            return tuple(islice(self._rows, self.cursor.arraysize if size is None else size))
+
+    def fetchall(self):
+        with QUERY_STATS.measure(self.stats, 'fetch'):
+            if self._rows is None:
+                return self.cursor.fetchall()
+            return tuple(self._rows)
+
+    def close(self):
+        self.cursor.close()
+
+
+class PooledConnection:
+    """
+    A pg8000 connection plus the bookkeeping the pool needs to recycle it.
+    Handlers get this object: cursor() returns a PreparedStatementCursor and
+    everything else (commit, rollback, ...) is the pg8000 connection's.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.handle_data_row = connection.message_types[DATA_ROW]
+        self.timed_data_row = timed_data_row_handler(self.handle_data_row)
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.statements = OrderedDict()
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def track_rows(self, enabled):
+        """
+        Installs or removes the per-row hook that feeds QUERY_STATS
+        """
+        self.connection.message_types[DATA_ROW] = self.timed_data_row if enabled else self.handle_data_row
+
+    def cursor(self):
+        return PreparedStatementCursor(self)
+
+    def prepared_statement(self, query, cursor, params):
+        """
+        Returns the prepared statement for query, preparing it on first use and
+        evicting the least recently used one when the cache is full.
+        """
+        statement = self.statements.get(query)
+        if statement is not None:
+            self.statements.move_to_end(query)
+            return statement
+
+        statement = PreparedStatement(self.connection, query)
+        if DB_PREPARED_STATEMENT_MEASURE_PLANNING:
+            statement.measure_planning(cursor, params)
+        self.statements[query] = statement
+        if len(self.statements) > DB_PREPARED_STATEMENT_CACHE_SIZE:
+            _, evicted = self.statements.popitem(last=False)
+            evicted.close()
+        return statement
+
+    def forget_statement(self, query):
+        self.statements.pop(query, None)
+
+    def age(self):
+        return time.monotonic() - self.created_at
+
+    def idle_time(self):
+        return time.monotonic() - self.last_used_at
+
+    def is_healthy(self):
+        """
+        Runs a trivial round trip to make sure the server is still there.
+        """
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            self.connection.rollback()
+            return True
+        except Exception as e:
+            logger.warning("Discarding unhealthy PostgreSQL connection: %s", e)
+            return False
+
+    def close(self):
+        self.statements.clear()
+        try:
+            self.connection.close()
+        except Exception:
+            # The socket is usually already gone when this fails
+            pass
+
 
 def get_db_connection():
     """
@@ -15,5 +422,148 @@ def get_db_connection():
         )
         return connection
     except Exception as e:
-        print(f"Error connecting to PostgreSQL: {e}")
-        return None 
\ No newline at end of file
+        logger.error("Error connecting to PostgreSQL: %s", e)
+        return None
+
+
+def acquire_connection():
+    """
+    Takes a connection from the pool, recycling any that are too old or fail
+    the health check, and opens a new one when the pool is empty. The
+    per-row stats hook is set to follow the current request's QUERY_STATS.
+    Returns None if no connection could be established.
+    """
+    global _acquisitions
+    while True:
+        with _pool_lock:
+            _acquisitions += 1
+            pooled = _pool.pop() if _pool else None
+        if pooled is None:
+            break
+        if pooled.age() > DB_POOL_MAX_AGE_SECONDS:
+            pooled.close()
+            continue
+        if pooled.idle_time() > DB_POOL_HEALTHCHECK_SECONDS and not pooled.is_healthy():
+            pooled.close()
+            continue
+        break
+
+    if pooled is None:
+        connection = get_db_connection()
+        if not connection:
+            return None
+        pooled = PooledConnection(connection)
+    pooled.track_rows(QUERY_STATS.track_rows)
+    return pooled
+
+
+def connections_acquired():
+    """
+    How many times acquire_connection has run, so a caller can tell whether
+    the code it ran in between touched the database
+    """
+    return _acquisitions
+
+
+def release_connection(pooled, discard=False):
+    """
+    Ends any open transaction and hands the connection back to the pool.
+    Connections that cannot be rolled back, are past their max age or do not
+    fit in the pool are closed instead.
+    """
+    if not discard:
+        try:
+            pooled.connection.rollback()
+        except Exception as e:
+            logger.warning("Error resetting PostgreSQL connection: %s", e)
+            discard = True
+
+    if not discard and pooled.age() <= DB_POOL_MAX_AGE_SECONDS:
+        pooled.last_used_at = time.monotonic()
+        with _pool_lock:
+            if len(_pool) < DB_POOL_SIZE:
+                _pool.append(pooled)
+                return
+    pooled.close()
+
+
+@contextmanager
+def db_connection():
+    """
+    Context manager yielding a pooled connection, or None if the database is
+    unreachable. The connection goes back to the pool on exit; uncommitted
+    work is rolled back.
+    """
+    pooled = acquire_connection()
+    if pooled is None:
+        yield None
+        return
+
+    try:
+        yield pooled
+    finally:
+        release_connection(pooled)
+
+
+def iter_rows(connection, query, params=(), batch_size=None):
+    """
+    Iterates over the rows of a query through a named server-side cursor,
+    fetching batch_size (DB_FETCH_BATCH_SIZE) rows at a time, so only one
+    batch is ever held in memory. The cursor is declared right away, so SQL
+    errors raise here, and lives in the connection's open transaction.
+    """
+    cursor = connection.connection.cursor()
+    name = f"rows_{next(_cursor_ids)}"
+    stats = QUERY_STATS.begin(query, query_caller())
+    with QUERY_STATS.measure(stats, 'execute'):
+        cursor.execute(f"DECLARE {name} NO SCROLL CURSOR FOR {query}", params)
+    return _fetch_batches(cursor, name, batch_size or DB_FETCH_BATCH_SIZE, stats)
+
+
+def _fetch_batches(cursor, name, batch_size, stats):
+    while True:
+        with QUERY_STATS.measure(stats, 'fetch'):
+            cursor.execute(f"FETCH FORWARD {batch_size} FROM {name}")
+            rows = cursor.fetchall()
+        yield from rows
+        if len(rows) < batch_size:
+            break
+    cursor.execute(f"CLOSE {name}")
+
+
+def prepared_statement_stats(connection):
+    """
+    Reports what each prepared statement on a pooled connection has saved.
+    Every execution after the first skips parsing; executions Postgres ran
+    with its cached generic plan also skip planning (the planning time is
+    only known when DB_PREPARED_STATEMENT_MEASURE_PLANNING is set).
+    """
+    cursor = connection.connection.cursor()
+    cursor.execute("SELECT name, generic_plans, custom_plans FROM pg_prepared_statements")
+    plans = {name: (generic_plans, custom_plans) for name, generic_plans, custom_plans in cursor.fetchall()}
+
+    stats = []
+    for statement in connection.statements.values():
+        generic_plans, custom_plans = plans.get(statement.name, (0, 0))
+        stats.append({
+            "query": statement.query,
+            "executions": statement.executions,
+            "genericPlans": generic_plans,
+            "customPlans": custom_plans,
+            "parseMs": statement.parse_seconds * 1000,
+            "parseMsSaved": statement.parse_seconds * max(statement.executions - 1, 0) * 1000,
+            "planMs": statement.plan_seconds * 1000 if statement.plan_seconds is not None else None,
+            "planMsSaved": statement.plan_seconds * generic_plans * 1000 if statement.plan_seconds is not None else None
+        })
+    return stats
+
+
+def close_pool():
+    """
+    Closes every idle pooled connection.
+    """
+    with _pool_lock:
+        idle = list(_pool)
+        _pool.clear()
+    for pooled in idle:
+        pooled.close()
@@ -0,0 +1,114 @@
+class InvalidFilter(ValueError):
+    """
+    Raised when a query string filter cannot be bound to its column type.
+    """
+
+
+def parse_team_id(value):
+    """
+    Validates a team query parameter once, up front. Returns None when no team
+    filter applies (missing or 'all'), otherwise the team id as an int so it
+    binds to team_id in its native type.
+    """
+    if value is None or value == '' or value == 'all':
+        return None
+    value = str(value).strip()
+    if not value.isdigit():
+        raise InvalidFilter(f"Invalid team ID format: {value}")
+    return int(value)
+
+
+# Canonical filter order: (filter name, query string parameter, predicate).
+# Team filters come first to match idx_call_sim_scoring_team_filters.
+FILTERS = [
+    ('team_id', 'team', "team_id = %s"),
+    ('user_id', 'userId', "user_id = %s"),
+    ('product_id', 'product', "product_id = %s"),
+    ('specialty', 'specialty', "LOWER(specialty) = %s"),
+    ('mode', 'mode', "mode = %s"),
+    ('assessment_status', 'assessmentStatus', "assessment_status = %s"),
+]
+
+PREDICATES = {name: predicate for name, _, predicate in FILTERS}
+
+# Rendered SQL per (template, filter shape)
+_compiled_sql = {}
+
+
+def normalize_filter(name, value):
+    """
+    Returns the value a filter binds, or None when it does not apply.
+    'all' and missing mean the same thing; specialty is matched lowercased.
+    """
+    if name == 'team_id':
+        return parse_team_id(value)
+    if value is None or value == '' or value == 'all':
+        return None
+    if name == 'specialty':
+        return value.lower()
+    return value
+
+
+class QuerySpec:
+    """
+    Normalized report filters. Two requests that filter the same rows produce
+    the same key, and the SQL rendered for a filter shape is compiled once.
+    """
+
+    def __init__(self, **filters):
+        unknown = set(filters) - set(PREDICATES)
+        if unknown:
+            raise TypeError(f"Unknown filters: {', '.join(sorted(unknown))}")
+        self.filters = {}
+        for name, _, _ in FILTERS:
+            value = normalize_filter(name, filters.get(name))
+            if value is not None:
+                self.filters[name] = value
+        self.shape = tuple(self.filters)
+        self.key = tuple(self.filters.items())
+        self.params = list(self.filters.values())
+
+    @classmethod
+    def from_query_params(cls, query_params, *names):
+        """
+        Builds a spec from API Gateway query string parameters, reading only the
+        named filters (all of them when none are given).
+        Raises InvalidFilter if a value cannot be bound.
+        """
+        return cls(**{
+            name: query_params.get(param)
+            for name, param, _ in FILTERS
+            if not names or name in names
+        })
+
+    def only(self, *names):
+        return QuerySpec(**{name: value for name, value in self.filters.items() if name in names})
+
+    def without(self, *names):
+        return QuerySpec(**{name: value for name, value in self.filters.items() if name not in names})
+
+    def get(self, name):
+        return self.filters.get(name)
+
+    def compile(self, template):
+        """
+        Renders template with its {filters} placeholder replaced by this spec's
+        predicates joined with AND (TRUE when there are none). Bind self.params
+        in order. The rendered SQL is cached per template and filter shape.
+        """
+        cache_key = (template, self.shape)
+        sql = _compiled_sql.get(cache_key)
+        if sql is None:
+            predicates = " AND ".join(PREDICATES[name] for name in self.shape) or "TRUE"
+            sql = template.replace('{filters}', predicates)
+            _compiled_sql[cache_key] = sql
+        return sql
+
+    def __eq__(self, other):
+        return isinstance(other, QuerySpec) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return "QuerySpec(" + ", ".join(f"{name}={value!r}" for name, value in self.key) + ")"
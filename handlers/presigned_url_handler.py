@@ -1,11 +1,7 @@
 import boto3
-import json
-import logging
 import os
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from utils.logger import logger
+from utils.responses import error_response, json_response
 
 s3_client = boto3.client('s3')
 
@@ -41,20 +37,10 @@ def handle_presigned_url_request(event, context):
             ExpiresIn=expiration
         )
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps({
-                "presignedUrl": presigned_url,
-                "accessUrl": "/callsim/" + key,
-            }),
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"  # Optional: for CORS
-            }
-        }
+        return json_response(200, {
+            "presignedUrl": presigned_url,
+            "accessUrl": "/callsim/" + key,
+        })
     except Exception as e:
-        logger.error(f"[presigned_url_handler] Error: {str(e)}")
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": str(e)})
-        }
+        logger.error("[presigned_url_handler] Error: %s", e)
+        return error_response(500, str(e))
@@ -0,0 +1,65 @@
+import json
+
+
+def json_value(column, *path, default=None):
+    """
+    SQL expression selecting the JSON value at path inside a JSONB column.
+    With a default it behaves like chained dict.get(key, {}) calls ending in
+    .get(key, default): a missing key yields the default while an explicit
+    JSON null stays None.
+    """
+    expression = column + "".join(f"->'{key}'" for key in path)
+    if default is None:
+        return expression
+    literal = json.dumps(default).replace("'", "''")
+    return f"COALESCE({expression}, '{literal}'::jsonb)"
+
+
+def row_type(names):
+    """
+    Tuple subclass for result rows with the given column names. get() reads
+    a column by name through its position, like dict.get on a row dict, so
+    transforms need no per-row dict.
+    """
+    positions = {name: position for position, name in enumerate(names)}
+
+    class Row(tuple):
+        __slots__ = ()
+
+        def get(self, name, default=None):
+            position = positions.get(name)
+            return default if position is None else self[position]
+
+    return Row
+
+
+class Projection:
+    """
+    Ordered mapping of row keys to the SQL expressions that produce them.
+    """
+
+    def __init__(self, **columns):
+        self.columns = columns
+        self.row_type = row_type(columns)
+        self.select_sql = ", ".join(
+            expression if expression == alias else f"{expression} AS {alias}"
+            for alias, expression in columns.items()
+        )
+
+    def query(self, table='call_sim_scoring'):
+        return f"SELECT {self.select_sql} FROM {table}"
+
+
+def projects(**columns):
+    """
+    Decorator declaring the columns and JSON paths a row transform reads.
+    The transform receives rows keyed by the declared names and exposes the
+    matching SELECT list as transform.projection. transform.map(rows)
+    applies it lazily to result tuples in that column order.
+    """
+    def decorator(transform):
+        projection = Projection(**columns)
+        transform.projection = projection
+        transform.map = lambda rows: map(transform, map(projection.row_type, rows))
+        return transform
+    return decorator
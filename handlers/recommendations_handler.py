@@ -1,4 +1,5 @@
-import json
+from utils.logger import logger
+from utils.responses import json_response
 
 def handle_recommendations_request(event, context):
     path = event.get('path', '')
@@ -6,8 +7,7 @@ def handle_recommendations_request(event, context):
     # Remove leading slash if present
     path = path.lstrip('/')
     
-    # Debug logging
-    print(f"Recommendations handler received path: {path}")
+    logger.debug("Recommendations handler received path: %s", path)
     
     # Base recommendations data
     recommendations_data = {
@@ -72,86 +72,30 @@ def handle_recommendations_request(event, context):
 
     # Handle different endpoints
     if path == 'insights-recommendations':
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps(recommendations_data)
-        }
+        return json_response(200, recommendations_data)
     elif path == 'insights-recommendations/strengths':
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "teamStrengths": recommendations_data["teamStrengths"]
-            })
-        }
+        return json_response(200, {
+            "teamStrengths": recommendations_data["teamStrengths"]
+        })
     elif path == 'insights-recommendations/improvements':
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "areasForImprovement": recommendations_data["areasForImprovement"]
-            })
-        }
+        return json_response(200, {
+            "areasForImprovement": recommendations_data["areasForImprovement"]
+        })
     elif path == 'insights-recommendations/training':
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "trainingFocus": recommendations_data["trainingFocus"]
-            })
-        }
+        return json_response(200, {
+            "trainingFocus": recommendations_data["trainingFocus"]
+        })
     elif path == 'insights-recommendations/development':
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "developmentPlans": recommendations_data["developmentPlans"]
-            })
-        }
+        return json_response(200, {
+            "developmentPlans": recommendations_data["developmentPlans"]
+        })
     elif path == 'insights-recommendations/strategies':
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "simulationStrategies": recommendations_data["simulationStrategies"]
-            })
-        }
+        return json_response(200, {
+            "simulationStrategies": recommendations_data["simulationStrategies"]
+        })
     
     # Return 404 for unknown paths
-    return {
-        "statusCode": 404,
-        "headers": {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Allow-Methods": "*"
-        },
-        "body": json.dumps({
-            "message": "Endpoint not found",
-            "path": path
-        })
-    } 
+    return json_response(404, {
+        "message": "Endpoint not found",
+        "path": path
+    }) 
@@ -1,7 +1,7 @@
-import json
 from datetime import datetime
-from .db_connection import get_db_connection
-from .simulation_overview_handler import datetime_handler
+from .db_connection import db_connection
+from utils.logger import logger
+from utils.responses import error_response, json_response
 
 def transform_sample_data(row):
     # Extract data from the conversation_data
@@ -67,75 +67,33 @@ def handle_sample_data_request(event, context):
     """
     try:
         # Connect to database using the shared connection function
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
 
-        cursor = connection.cursor()
+            cursor = connection.cursor()
         
-        # Query to get one random record from call_sim_scoring
-        query = "SELECT * FROM call_sim_scoring ORDER BY RANDOM() LIMIT 1"
+            # Query to get one random record from call_sim_scoring
+            query = "SELECT * FROM call_sim_scoring ORDER BY RANDOM() LIMIT 1"
         
-        # Execute query
-        cursor.execute(query)
+            # Execute query
+            cursor.execute(query)
         
-        # Fetch the result
-        columns = [desc[0] for desc in cursor.description]
-        row = cursor.fetchone()
+            # Fetch the result
+            columns = [desc[0] for desc in cursor.description]
+            row = cursor.fetchone()
         
-        if not row:
-            return {
-                "statusCode": 404,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "No sample data found"
-                })
-            }
+            if not row:
+                return error_response(404, "No sample data found")
             
-        # Transform the data using our new transformation function
-        row_dict = dict(zip(columns, row))
-        transformed_data = transform_sample_data(row_dict)
+            # Transform the data using our new transformation function
+            row_dict = dict(zip(columns, row))
+            transformed_data = transform_sample_data(row_dict)
             
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
+            return json_response(200, {
                 "sampleData": transformed_data
-            }, default=datetime_handler)
-        }
+            })
         
     except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close() 
\ No newline at end of file
+        logger.error("Database error: %s", e)
+        return error_response(500, "Database error occurred")
@@ -1,31 +1,42 @@
-import json
 from datetime import datetime
-from .db_connection import get_db_connection
-
-def datetime_handler(obj):
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+from .db_connection import db_connection, iter_rows
+from .filters import QuerySpec
+from .projections import json_value, projects
+from .streaming import RowStream, ndjson_response, wants_stream
+from utils.logger import logger
+from utils.responses import error_response, json_response
 
+@projects(
+    id='id',
+    user_id='user_id',
+    created_at='created_at',
+    adoption_continuum='adoption_continuum',
+    situation='situation',
+    product_id='product_id',
+    specialty='specialty',
+    introduction_score=json_value('accuracy', 'scores', 'introduction', 'score', default=0),
+    rapport_score=json_value('accuracy', 'scores', 'rapport', 'score', default=0),
+    interest_score=json_value('accuracy', 'scores', 'creatingInterest', 'score', default=0),
+    probing_score=json_value('accuracy', 'scores', 'probing', 'score', default=0),
+    product_knowledge_score=json_value('accuracy', 'scores', 'productKnowledge', 'score', default=0),
+    overall_score=json_value('accuracy', 'scores', 'total', 'score', default=0),
+    adoption_continuum_score=json_value('accuracy', 'scores', 'adoptionContinuum', 'score', default=0),
+    strategic_fit=json_value('accuracy', 'scores', 'adoptionContinuum', 'detailed_scores', 'strategic_fit', 'score', default=0),
+    conversion_momentum=json_value('accuracy', 'scores', 'adoptionContinuum', 'detailed_scores', 'conversion_momentum', 'score', default=0)
+)
 def transform_insights_data(row):
-    # Get scores from the accuracy column
-    accuracy = row.get('accuracy', {})
-    scores = accuracy.get('scores', {})
-    
     # Get all scores
-    introduction_score = scores.get('introduction', {}).get('score', 0)
-    rapport_score = scores.get('rapport', {}).get('score', 0)
-    interest_score = scores.get('creatingInterest', {}).get('score', 0)
-    probing_score = scores.get('probing', {}).get('score', 0)
-    product_knowledge_score = scores.get('productKnowledge', {}).get('score', 0)
-    overall_score = scores.get('total', {}).get('score', 0)
+    introduction_score = row.get('introduction_score')
+    rapport_score = row.get('rapport_score')
+    interest_score = row.get('interest_score')
+    probing_score = row.get('probing_score')
+    product_knowledge_score = row.get('product_knowledge_score')
+    overall_score = row.get('overall_score')
     
     # Get adoption continuum scores
-    adoption_continuum = scores.get('adoptionContinuum', {})
-    adoption_continuum_score = adoption_continuum.get('score', 0)
-    detailed_scores = adoption_continuum.get('detailed_scores', {})
-    strategic_fit = detailed_scores.get('strategic_fit', {}).get('score', 0)
-    conversion_momentum = detailed_scores.get('conversion_momentum', {}).get('score', 0)
+    adoption_continuum_score = row.get('adoption_continuum_score')
+    strategic_fit = row.get('strategic_fit')
+    conversion_momentum = row.get('conversion_momentum')
     
     # Handle date formatting
     created_at = row.get('created_at')
@@ -107,93 +118,41 @@ def calculate_averages(data):
         'situationData': situation_data
     }
 
+def insights_records(rows):
+    """
+    The streamed insights as a single NDJSON record. A generator, so the rows
+    are only read, and their averages folded in, once the body is consumed.
+    """
+    yield {"insightsData": calculate_averages(transform_insights_data.map(rows))}
+
 def handle_simulation_insights(event, context):
     query_params = event.get('queryStringParameters', {}) or {}
     
     # Get filters
-    product_filter = query_params.get('product')
-    specialty_filter = query_params.get('specialty')
-    user_id = query_params.get('userId')
+    spec = QuerySpec.from_query_params(query_params, 'user_id', 'product_id', 'specialty')
     
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
+        if wants_stream(event):
+            # The averages are folded in as rows arrive and sent as one line
+            return ndjson_response(
+                RowStream(spec.compile(transform_insights_data.projection.query() + " WHERE {filters}"), spec.params),
+                insights_records
+            )
 
-        cursor = connection.cursor()
-        
-        # Base query
-        query = "SELECT * FROM call_sim_scoring"
-        params = []
-        conditions = []
-        
-        # Add filters
-        if user_id:
-            conditions.append("user_id = %s")
-            params.append(user_id)
-            
-        if product_filter and product_filter != 'all':
-            conditions.append("product_id = %s")
-            params.append(product_filter)
-            
-        if specialty_filter and specialty_filter != 'all':
-            conditions.append("LOWER(specialty) = LOWER(%s)")
-            params.append(specialty_filter)
-            
-        # Combine all conditions with AND
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        # Execute query
-        cursor.execute(query, params)
-        
-        # Fetch all results
-        columns = [desc[0] for desc in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            row_dict = dict(zip(columns, row))
-            transformed_data = transform_insights_data(row_dict)
-            results.append(transformed_data)
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
+
+            # Base query
+            query = spec.compile(transform_insights_data.projection.query() + " WHERE {filters}")
         
-        # Calculate averages
-        insights_data = calculate_averages(results)
+            # Calculate averages as rows are fetched, a batch at a time
+            insights_data = calculate_averages(transform_insights_data.map(iter_rows(connection, query, spec.params)))
             
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
+            return json_response(200, {
                 "insightsData": insights_data
-            }, default=datetime_handler)
-        }
+            })
         
     except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close() 
\ No newline at end of file
+        logger.error("Database error: %s", e)
+        return error_response(500, "Database error occurred")
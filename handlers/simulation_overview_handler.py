@@ -1,24 +1,24 @@
-import json
 from datetime import datetime
-from .db_connection import get_db_connection
-
-def datetime_handler(obj):
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+from .db_connection import db_connection, iter_rows
+from .filters import QuerySpec
+from .projections import json_value, projects
+from .streaming import RowStream, ndjson_response, wants_stream
+from utils.logger import logger
+from utils.responses import error_response, json_response
 
+@projects(
+    id='id',
+    user_id='user_id',
+    created_at='created_at',
+    adoption_continuum='adoption_continuum',
+    situation='situation',
+    product_id='product_id',
+    specialty='specialty',
+    adoption_continuum_score=json_value('accuracy', 'scores', 'adoptionContinuum', 'score', default=0),
+    strategic_fit=json_value('accuracy', 'scores', 'adoptionContinuum', 'detailed_scores', 'strategic_fit', 'score', default=0),
+    conversion_momentum=json_value('accuracy', 'scores', 'adoptionContinuum', 'detailed_scores', 'conversion_momentum', 'score', default=0)
+)
 def transform_overview_data(row):
-    # Get scores from the accuracy column
-    accuracy = row.get('accuracy', {})
-    scores = accuracy.get('scores', {})
-    
-    # Get adoption continuum detailed scores
-    adoption_continuum = scores.get('adoptionContinuum', {})
-    adoption_continuum_score = adoption_continuum.get('score', 0)
-    detailed_scores = adoption_continuum.get('detailed_scores', {})
-    strategic_fit = detailed_scores.get('strategic_fit', {}).get('score', 0)
-    conversion_momentum = detailed_scores.get('conversion_momentum', {}).get('score', 0)
-    
     # Handle date formatting
     created_at = row.get('created_at')
     if isinstance(created_at, datetime):
@@ -34,84 +34,187 @@ def transform_overview_data(row):
         "situation": row.get('situation', '').capitalize(),
         "product": row.get('product_id', ''),
         "specialty": row.get('specialty', '').capitalize(),
-        "strategicFit": strategic_fit,
-        "conversionMomentum": conversion_momentum,
-        "adoptionContinuumScore": adoption_continuum_score
+        "strategicFit": row.get('strategic_fit'),
+        "conversionMomentum": row.get('conversion_momentum'),
+        "adoptionContinuumScore": row.get('adoption_continuum_score')
     }
 
-def transform_adoption_data(row):
-    # Get scores from the accuracy column
-    accuracy = row.get('accuracy', {})
-    scores = accuracy.get('scores', {})
-    
-    # Get adoption continuum detailed scores
-    adoption_continuum = scores.get('adoptionContinuum', {})
-    adoption_continuum_score = adoption_continuum.get('score', 0)
-    detailed_scores = adoption_continuum.get('detailed_scores', {})
-    strategic_fit = detailed_scores.get('strategic_fit', {}).get('score', 0)
-    conversion_momentum = detailed_scores.get('conversion_momentum', {}).get('score', 0)
-    
-    return {
-        "name": row.get('adoption_continuum', 'naive').capitalize(),
-        "score": adoption_continuum_score,
-        "strategicFit": strategic_fit,
-        "conversionMomentum": conversion_momentum
-    }
+# SQL expressions for the scores each sub-endpoint averages, in response order
+ADOPTION_SCORES = [
+    ('score', "adoption_continuum_score"),
+    ('strategicFit', "accuracy->'scores'->'adoptionContinuum'->'detailed_scores'->'strategic_fit'->>'score'"),
+    ('conversionMomentum', "accuracy->'scores'->'adoptionContinuum'->'detailed_scores'->'conversion_momentum'->>'score'")
+]
 
-def transform_metrics_data(row):
-    # Get scores from the accuracy column
-    accuracy = row.get('accuracy', {})
-    scores = accuracy.get('scores', {})
-    
-    # Extract all metric scores with null checks
-    metrics = {
-        'disc': scores.get('disc', {}).get('score', 0) or 0,
-        'total': scores.get('total', {}).get('score', 0) or 0,
-        'traits': scores.get('traits', {}).get('score', 0) or 0,
-        'closing': scores.get('closing', {}).get('score', 0) or 0,
-        'probing': scores.get('probing', {}).get('score', 0) or 0,
-        'rapport': scores.get('rapport', {}).get('score', 0) or 0,
-        'strategy': scores.get('strategy', {}).get('score', 0) or 0,
-        'introduction': scores.get('introduction', {}).get('score', 0) or 0,
-        'creatingInterest': scores.get('creatingInterest', {}).get('score', 0) or 0,
-        'productKnowledge': scores.get('productKnowledge', {}).get('score', 0) or 0,
-        'adoptionContinuum': scores.get('adoptionContinuum', {}).get('score', 0) or 0
-    }
-    
-    return metrics
-
-def transform_traits_data(row):
-    # Get scores from the accuracy column
-    accuracy = row.get('accuracy', {})
-    scores = accuracy.get('scores', {})
-    traits = scores.get('traits', {})
-    detailed_scores = traits.get('detailed_scores', {}).get('traits', {})
-    
-    # Extract the required trait scores
-    return {
-        'overall': traits.get('score', 0),
-        'clarity': detailed_scores.get('clarity', {}).get('score', 0),
-        'confidence': detailed_scores.get('confidence', {}).get('score', 0),
-        'empathy': detailed_scores.get('empathy', {}).get('score', 0),
-        'engagement': detailed_scores.get('engagement', {}).get('score', 0)
-    }
+METRIC_SCORES = [
+    ('disc', "disc_score"),
+    ('total', "total_accuracy_score"),
+    ('traits', "traits_score"),
+    ('closing', "closing_score"),
+    ('probing', "probing_score"),
+    ('rapport', "rapport_score"),
+    ('strategy', "strategy_score"),
+    ('introduction', "introduction_score"),
+    ('creatingInterest', "creating_interest_score"),
+    ('productKnowledge', "product_knowledge_score"),
+    ('adoptionContinuum', "adoption_continuum_score")
+]
 
-def transform_disc_data(row):
-    # Get scores from the accuracy column
-    accuracy = row.get('accuracy', {})
-    scores = accuracy.get('scores', {})
-    disc = scores.get('disc', {})
-    detailed_scores = disc.get('detailed_scores', {})
-    
-    # Extract the required DISC scores
-    return {
-        'overall': disc.get('score', 0),
-        'message_fit': detailed_scores.get('message_fit', {}).get('score', 0),
-        'pacing_and_tone': detailed_scores.get('pacing_and_tone', {}).get('score', 0),
-        'overall_influence': detailed_scores.get('overall_influence', {}).get('score', 0),
-        'objection_handling': detailed_scores.get('objection_handling', {}).get('score', 0),
-        'engagement_approach': detailed_scores.get('engagement_approach', {}).get('score', 0)
+TRAIT_SCORES = [
+    ('overall', "traits_score"),
+    ('clarity', "accuracy->'scores'->'traits'->'detailed_scores'->'traits'->'clarity'->>'score'"),
+    ('confidence', "accuracy->'scores'->'traits'->'detailed_scores'->'traits'->'confidence'->>'score'"),
+    ('empathy', "accuracy->'scores'->'traits'->'detailed_scores'->'traits'->'empathy'->>'score'"),
+    ('engagement', "accuracy->'scores'->'traits'->'detailed_scores'->'traits'->'engagement'->>'score'")
+]
+
+DISC_SCORES = [
+    ('overall', "disc_score"),
+    ('message_fit', "accuracy->'scores'->'disc'->'detailed_scores'->'message_fit'->>'score'"),
+    ('pacing_and_tone', "accuracy->'scores'->'disc'->'detailed_scores'->'pacing_and_tone'->>'score'"),
+    ('overall_influence', "accuracy->'scores'->'disc'->'detailed_scores'->'overall_influence'->>'score'"),
+    ('objection_handling', "accuracy->'scores'->'disc'->'detailed_scores'->'objection_handling'->>'score'"),
+    ('engagement_approach', "accuracy->'scores'->'disc'->'detailed_scores'->'engagement_approach'->>'score'")
+]
+
+FLUENCY_SCORES = [
+    ('wpm', "fluency_wpm"),
+    ('total', "fluency_total"),
+    ('pauses', "fluency_pauses"),
+    ('fillerWords', "fluency_filler_words")
+]
+
+# Same result as Python's str.capitalize() on the adoption_continuum column
+ADOPTION_LEVEL_SQL = (
+    "UPPER(LEFT(COALESCE(adoption_continuum, 'naive'), 1)) || "
+    "LOWER(SUBSTRING(COALESCE(adoption_continuum, 'naive') FROM 2))"
+)
+
+# Filters the overview queries accept, and the subset the specialties list uses
+OVERVIEW_FILTERS = ('user_id', 'product_id', 'specialty', 'mode', 'assessment_status')
+SPECIALTY_FILTERS = ('user_id', 'assessment_status')
+
+SPECIALTIES_QUERY = "SELECT DISTINCT specialty FROM call_sim_scoring WHERE {filters} ORDER BY specialty"
+
+def average_columns(scores):
+    """
+    Build one AVG column per score, counting missing scores as 0
+    """
+    return ", ".join(
+        f"AVG(COALESCE(CAST({path} AS FLOAT), 0))"
+        for _, path in scores
+    )
+
+def format_score_averages(scores, values):
+    """
+    Pair averaged values with their score names, sorted by score in descending order
+    """
+    averages = [
+        {
+            'name': name,
+            'score': value
+        }
+        for (name, _), value in zip(scores, values)
+    ]
+    averages.sort(key=lambda x: x['score'], reverse=True)
+    return averages
+
+def query_score_averages(cursor, scores, spec):
+    """
+    Average the given scores over the filtered rows in a single aggregate row
+    """
+    query = f"SELECT COUNT(*), {average_columns(scores)} FROM call_sim_scoring WHERE {{filters}}"
+
+    cursor.execute(spec.compile(query), spec.params)
+    result = cursor.fetchone()
+
+    if not result or result[0] == 0:
+        return []
+    return format_score_averages(scores, result[1:])
+
+def query_adoption_averages(cursor, spec):
+    """
+    Average the adoption continuum scores per adoption level
+    """
+    query = f"""
+        SELECT
+            {ADOPTION_LEVEL_SQL} as name,
+            {average_columns(ADOPTION_SCORES)}
+        FROM call_sim_scoring
+        WHERE {{filters}}
+        GROUP BY 1 ORDER BY 1
+    """
+
+    cursor.execute(spec.compile(query), spec.params)
+    return [
+        {
+            'name': row[0],
+            'score': row[1],
+            'strategicFit': row[2],
+            'conversionMomentum': row[3]
+        }
+        for row in cursor.fetchall()
+    ]
+
+def query_overview_aggregates(cursor, spec):
+    """
+    Compute the adoption, metrics, traits, DISC and fluency averages of the
+    overview bundle in one statement. GROUPING SETS returns one row per
+    adoption level plus a grand-total row for the ungrouped averages.
+    """
+    ungrouped_scores = METRIC_SCORES + TRAIT_SCORES + DISC_SCORES + FLUENCY_SCORES
+    query = f"""
+        SELECT
+            GROUPING({ADOPTION_LEVEL_SQL}) as is_total,
+            {ADOPTION_LEVEL_SQL} as name,
+            COUNT(*) as total_count,
+            {average_columns(ADOPTION_SCORES)},
+            {average_columns(ungrouped_scores)}
+        FROM call_sim_scoring
+        WHERE {{filters}}
+        GROUP BY GROUPING SETS (({ADOPTION_LEVEL_SQL}), ())
+        ORDER BY 1, 2
+    """
+
+    cursor.execute(spec.compile(query), spec.params)
+    results = cursor.fetchall()
+
+    adoption_data = []
+    aggregates = {
+        "adoptionData": adoption_data,
+        "metricsData": [],
+        "traitsData": [],
+        "discData": [],
+        "fluencyData": []
     }
+    adoption_end = 3 + len(ADOPTION_SCORES)
+    for row in results:
+        if not row[0]:
+            adoption_data.append({
+                'name': row[1],
+                'score': row[3],
+                'strategicFit': row[4],
+                'conversionMomentum': row[5]
+            })
+        elif row[2] > 0:
+            values = row[adoption_end:]
+            offset = 0
+            for key, scores in (
+                ("metricsData", METRIC_SCORES),
+                ("traitsData", TRAIT_SCORES),
+                ("discData", DISC_SCORES),
+                ("fluencyData", FLUENCY_SCORES)
+            ):
+                aggregates[key] = format_score_averages(scores, values[offset:offset + len(scores)])
+                offset += len(scores)
+
+    return aggregates
+
+def build_query_spec(query_params):
+    """
+    Normalized filters shared by the overview queries
+    """
+    return QuerySpec.from_query_params(query_params, *OVERVIEW_FILTERS)
 
 def handle_simulation_overview(event, context):
     path = event.get('path', '')
@@ -129,815 +232,153 @@ def handle_simulation_overview(event, context):
         return handle_simulation_disc(event, context)
     elif path.endswith('/fluency'):
         return handle_simulation_fluency(event, context)
-    
+    elif path.endswith('/all'):
+        return handle_simulation_overview_bundle(event, context)
+
     # Default overview endpoint handling
     query_params = event.get('queryStringParameters', {}) or {}
-    
-    # Get filters
-    product_filter = query_params.get('product')
-    specialty_filter = query_params.get('specialty')
-    mode_filter = query_params.get('mode')
-    user_id = query_params.get('userId')
-    assessment_status = query_params.get('assessmentStatus')
+    spec = build_query_spec(query_params)
     
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
-
-        cursor = connection.cursor()
-        
-        # Base query
-        query = "SELECT * FROM call_sim_scoring"
-        params = []
-        conditions = []
-        
-        # Add filters
-        if user_id:
-            conditions.append("user_id = %s")
-            params.append(user_id)
-            
-        if product_filter and product_filter != 'all':
-            conditions.append("product_id = %s")
-            params.append(product_filter)
-            
-        if specialty_filter and specialty_filter != 'all':
-            conditions.append("LOWER(specialty) = LOWER(%s)")
-            params.append(specialty_filter)
-            
-        if mode_filter and mode_filter != 'all':
-            conditions.append("mode = %s")
-            params.append(mode_filter)
-            
-        if assessment_status and assessment_status != 'all':
-            conditions.append("assessment_status = %s")
-            params.append(assessment_status)
-            
-        # Combine all conditions with AND
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        # Execute query
-        cursor.execute(query, params)
+        if wants_stream(event):
+            return ndjson_response(
+                RowStream(spec.compile(transform_overview_data.projection.query() + " WHERE {filters}"), spec.params),
+                transform_overview_data.map
+            )
+
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
+
+            # Base query
+            query = spec.compile(transform_overview_data.projection.query() + " WHERE {filters}")
         
-        # Fetch all results
-        columns = [desc[0] for desc in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            row_dict = dict(zip(columns, row))
-            transformed_data = transform_overview_data(row_dict)
-            results.append(transformed_data)
+            # Transform rows a batch at a time as they are fetched
+            results = list(transform_overview_data.map(iter_rows(connection, query, spec.params)))
             
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
+            return json_response(200, {
                 "simulationData": results
-            }, default=datetime_handler)
-        }
+            })
         
     except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close()
+        logger.error("Database error: %s", e)
+        return error_response(500, "Database error occurred")
 
 def handle_simulation_adoption(event, context):
     query_params = event.get('queryStringParameters', {}) or {}
-    
-    # Get filters
-    product_filter = query_params.get('product')
-    specialty_filter = query_params.get('specialty')
-    mode_filter = query_params.get('mode')
-    user_id = query_params.get('userId')
-    assessment_status = query_params.get('assessmentStatus')
-    
+
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
-
-        cursor = connection.cursor()
-        
-        # Base query
-        query = "SELECT * FROM call_sim_scoring"
-        params = []
-        conditions = []
-        
-        # Add filters
-        if user_id:
-            conditions.append("user_id = %s")
-            params.append(user_id)
-            
-        if product_filter and product_filter != 'all':
-            conditions.append("product_id = %s")
-            params.append(product_filter)
-            
-        if specialty_filter and specialty_filter != 'all':
-            conditions.append("LOWER(specialty) = LOWER(%s)")
-            params.append(specialty_filter)
-            
-        if mode_filter and mode_filter != 'all':
-            conditions.append("mode = %s")
-            params.append(mode_filter)
-            
-        if assessment_status and assessment_status != 'all':
-            conditions.append("assessment_status = %s")
-            params.append(assessment_status)
-            
-        # Combine all conditions with AND
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        # Execute query
-        cursor.execute(query, params)
-        
-        # Fetch all results
-        columns = [desc[0] for desc in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            row_dict = dict(zip(columns, row))
-            transformed_data = transform_adoption_data(row_dict)
-            results.append(transformed_data)
-        
-        # Calculate averages by adoption level
-        adoption_levels = {}
-        for item in results:
-            level = item['name']
-            if level not in adoption_levels:
-                adoption_levels[level] = {
-                    'count': 0,
-                    'totalOverall': 0,
-                    'totalStrategicFit': 0,
-                    'totalConversionMomentum': 0
-                }
-            
-            adoption_levels[level]['count'] += 1
-            adoption_levels[level]['totalOverall'] += item['score']
-            adoption_levels[level]['totalStrategicFit'] += item['strategicFit']
-            adoption_levels[level]['totalConversionMomentum'] += item['conversionMomentum']
-        
-        # Calculate final averages
-        adoption_data = [
-            {
-                'name': level,
-                'score': data['totalOverall'] / data['count'],
-                'strategicFit': data['totalStrategicFit'] / data['count'],
-                'conversionMomentum': data['totalConversionMomentum'] / data['count']
-            }
-            for level, data in adoption_levels.items()
-        ]
-            
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
+
+            cursor = connection.cursor()
+
+            adoption_data = query_adoption_averages(cursor, build_query_spec(query_params))
+
+            return json_response(200, {
                 "adoptionData": adoption_data
-            }, default=datetime_handler)
-        }
-        
-    except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
             })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close()
+
+    except Exception as e:
+        logger.error("Database error: %s", e)
+        return error_response(500, "Database error occurred")
 
 def handle_simulation_specialties(event, context):
     query_params = event.get('queryStringParameters', {}) or {}
-    user_id = query_params.get('userId')
-    assessment_status = query_params.get('assessmentStatus')
+    spec = QuerySpec.from_query_params(query_params, *SPECIALTY_FILTERS)
     
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
-
-        cursor = connection.cursor()
-        
-        # Query to get distinct specialties
-        query = "SELECT DISTINCT specialty FROM call_sim_scoring"
-        params = []
-        conditions = []
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
+
+            cursor = connection.cursor()
         
-        if user_id:
-            conditions.append("user_id = %s")
-            params.append(user_id)
-            
-        if assessment_status and assessment_status != 'all':
-            conditions.append("assessment_status = %s")
-            params.append(assessment_status)
-            
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        query += " ORDER BY specialty"
+            # Query to get distinct specialties
+            query = spec.compile(SPECIALTIES_QUERY)
         
-        # Execute query
-        cursor.execute(query, params)
+            # Execute query
+            cursor.execute(query, spec.params)
         
-        # Fetch all results
-        specialties = [row[0].capitalize() for row in cursor.fetchall() if row[0]]
+            # Fetch all results
+            specialties = [row[0].capitalize() for row in cursor.fetchall() if row[0]]
             
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
+            return json_response(200, {
                 "specialties": specialties
             })
-        }
         
     except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close()
+        logger.error("Database error: %s", e)
+        return error_response(500, "Database error occurred")
 
-def handle_simulation_metrics(event, context):
+def handle_score_averages(event, scores, response_key):
+    """
+    Shared implementation of the sub-endpoints that average a list of scores
+    """
     query_params = event.get('queryStringParameters', {}) or {}
-    
-    # Get filters
-    product_filter = query_params.get('product')
-    specialty_filter = query_params.get('specialty')
-    mode_filter = query_params.get('mode')
-    user_id = query_params.get('userId')
-    assessment_status = query_params.get('assessmentStatus')
-    
+
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
-
-        cursor = connection.cursor()
-        
-        # Base query
-        query = "SELECT * FROM call_sim_scoring"
-        params = []
-        conditions = []
-        
-        # Add filters
-        if user_id:
-            conditions.append("user_id = %s")
-            params.append(user_id)
-            
-        if product_filter and product_filter != 'all':
-            conditions.append("product_id = %s")
-            params.append(product_filter)
-            
-        if specialty_filter and specialty_filter != 'all':
-            conditions.append("LOWER(specialty) = LOWER(%s)")
-            params.append(specialty_filter)
-            
-        if mode_filter and mode_filter != 'all':
-            conditions.append("mode = %s")
-            params.append(mode_filter)
-            
-        if assessment_status and assessment_status != 'all':
-            conditions.append("assessment_status = %s")
-            params.append(assessment_status)
-            
-        # Combine all conditions with AND
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        # Execute query
-        cursor.execute(query, params)
-        
-        # Fetch all results
-        columns = [desc[0] for desc in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            row_dict = dict(zip(columns, row))
-            transformed_data = transform_metrics_data(row_dict)
-            results.append(transformed_data)
-        
-        # Calculate averages for each metric
-        metric_totals = {}
-        count = len(results)
-        
-        if count > 0:
-            for result in results:
-                for metric, score in result.items():
-                    if metric not in metric_totals:
-                        metric_totals[metric] = 0
-                    # Ensure score is a number before adding
-                    metric_totals[metric] += float(score) if score is not None else 0
-            
-            # Calculate final averages
-            metrics_data = [
-                {
-                    'name': metric,
-                    'score': total / count
-                }
-                for metric, total in metric_totals.items()
-            ]
-            
-            # Sort by score in descending order
-            metrics_data.sort(key=lambda x: x['score'], reverse=True)
-        else:
-            metrics_data = []
-            
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "metricsData": metrics_data
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
+
+            cursor = connection.cursor()
+
+            averages = query_score_averages(cursor, scores, build_query_spec(query_params))
+
+            return json_response(200, {
+                response_key: averages
             })
-        }
-        
+
     except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close()
+        logger.error("Database error: %s", e)
+        return error_response(500, "Database error occurred")
+
+def handle_simulation_metrics(event, context):
+    return handle_score_averages(event, METRIC_SCORES, "metricsData")
 
 def handle_simulation_traits(event, context):
-    query_params = event.get('queryStringParameters', {}) or {}
-    
-    # Get filters
-    product_filter = query_params.get('product')
-    specialty_filter = query_params.get('specialty')
-    mode_filter = query_params.get('mode')
-    user_id = query_params.get('userId')
-    assessment_status = query_params.get('assessmentStatus')
-    
-    try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
-
-        cursor = connection.cursor()
-        
-        # Base query
-        query = "SELECT * FROM call_sim_scoring"
-        params = []
-        conditions = []
-        
-        # Add filters
-        if user_id:
-            conditions.append("user_id = %s")
-            params.append(user_id)
-            
-        if product_filter and product_filter != 'all':
-            conditions.append("product_id = %s")
-            params.append(product_filter)
-            
-        if specialty_filter and specialty_filter != 'all':
-            conditions.append("LOWER(specialty) = LOWER(%s)")
-            params.append(specialty_filter)
-            
-        if mode_filter and mode_filter != 'all':
-            conditions.append("mode = %s")
-            params.append(mode_filter)
-            
-        if assessment_status and assessment_status != 'all':
-            conditions.append("assessment_status = %s")
-            params.append(assessment_status)
-            
-        # Combine all conditions with AND
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        # Execute query
-        cursor.execute(query, params)
-        
-        # Fetch all results
-        columns = [desc[0] for desc in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            row_dict = dict(zip(columns, row))
-            transformed_data = transform_traits_data(row_dict)
-            results.append(transformed_data)
-        
-        # Calculate averages for each trait
-        trait_totals = {
-            'overall': 0,
-            'clarity': 0,
-            'confidence': 0,
-            'empathy': 0,
-            'engagement': 0
-        }
-        count = len(results)
-        
-        if count > 0:
-            for result in results:
-                for trait, score in result.items():
-                    trait_totals[trait] += score
-            
-            # Calculate final averages
-            traits_data = [
-                {
-                    'name': trait,
-                    'score': total / count
-                }
-                for trait, total in trait_totals.items()
-            ]
-            
-            # Sort by score in descending order
-            traits_data.sort(key=lambda x: x['score'], reverse=True)
-        else:
-            traits_data = []
-            
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "traitsData": traits_data
-            })
-        }
-        
-    except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close()
+    return handle_score_averages(event, TRAIT_SCORES, "traitsData")
 
 def handle_simulation_disc(event, context):
-    query_params = event.get('queryStringParameters', {}) or {}
-    
-    # Get filters
-    product_filter = query_params.get('product')
-    specialty_filter = query_params.get('specialty')
-    mode_filter = query_params.get('mode')
-    user_id = query_params.get('userId')
-    assessment_status = query_params.get('assessmentStatus')
-    
-    try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
-
-        cursor = connection.cursor()
-        
-        # Base query
-        query = "SELECT * FROM call_sim_scoring"
-        params = []
-        conditions = []
-        
-        # Add filters
-        if user_id:
-            conditions.append("user_id = %s")
-            params.append(user_id)
-            
-        if product_filter and product_filter != 'all':
-            conditions.append("product_id = %s")
-            params.append(product_filter)
-            
-        if specialty_filter and specialty_filter != 'all':
-            conditions.append("LOWER(specialty) = LOWER(%s)")
-            params.append(specialty_filter)
-            
-        if mode_filter and mode_filter != 'all':
-            conditions.append("mode = %s")
-            params.append(mode_filter)
-            
-        if assessment_status and assessment_status != 'all':
-            conditions.append("assessment_status = %s")
-            params.append(assessment_status)
-            
-        # Combine all conditions with AND
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        # Execute query
-        cursor.execute(query, params)
-        
-        # Fetch all results
-        columns = [desc[0] for desc in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            row_dict = dict(zip(columns, row))
-            transformed_data = transform_disc_data(row_dict)
-            results.append(transformed_data)
-        
-        # Calculate averages for each DISC component
-        disc_totals = {
-            'overall': 0,
-            'message_fit': 0,
-            'pacing_and_tone': 0,
-            'overall_influence': 0,
-            'objection_handling': 0,
-            'engagement_approach': 0
-        }
-        count = len(results)
-        
-        if count > 0:
-            for result in results:
-                for component, score in result.items():
-                    disc_totals[component] += score
-            
-            # Calculate final averages
-            disc_data = [
-                {
-                    'name': component,
-                    'score': total / count
-                }
-                for component, total in disc_totals.items()
-            ]
-            
-            # Sort by score in descending order
-            disc_data.sort(key=lambda x: x['score'], reverse=True)
-        else:
-            disc_data = []
-            
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "discData": disc_data
-            })
-        }
-        
-    except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close()
+    return handle_score_averages(event, DISC_SCORES, "discData")
 
 def handle_simulation_fluency(event, context):
+    return handle_score_averages(event, FLUENCY_SCORES, "fluencyData")
+
+def handle_simulation_overview_bundle(event, context):
+    """
+    Return every simulation-overview payload in one response: the row listing,
+    one GROUPING SETS aggregate for all averages and the specialties list
+    """
     query_params = event.get('queryStringParameters', {}) or {}
-    
-    # Get filters
-    product_filter = query_params.get('product')
-    specialty_filter = query_params.get('specialty')
-    mode_filter = query_params.get('mode')
-    user_id = query_params.get('userId')
-    assessment_status = query_params.get('assessmentStatus')
-    
+    spec = build_query_spec(query_params)
+
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
-
-        cursor = connection.cursor()
-        
-        # Base query
-        query = "SELECT * FROM call_sim_scoring"
-        params = []
-        conditions = []
-        
-        # Add filters
-        if user_id:
-            conditions.append("user_id = %s")
-            params.append(user_id)
-            
-        if product_filter and product_filter != 'all':
-            conditions.append("product_id = %s")
-            params.append(product_filter)
-            
-        if specialty_filter and specialty_filter != 'all':
-            conditions.append("LOWER(specialty) = LOWER(%s)")
-            params.append(specialty_filter)
-            
-        if mode_filter and mode_filter != 'all':
-            conditions.append("mode = %s")
-            params.append(mode_filter)
-            
-        if assessment_status and assessment_status != 'all':
-            conditions.append("assessment_status = %s")
-            params.append(assessment_status)
-            
-        # Combine all conditions with AND
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        # Execute query
-        cursor.execute(query, params)
-        
-        # Fetch all results
-        columns = [desc[0] for desc in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            row_dict = dict(zip(columns, row))
-            fluency = row_dict.get('fluency', {})
-            scores = fluency.get('scores', {})
-            
-            results.append({
-                'wpm': scores.get('wpm', 0),
-                'total': scores.get('total', 0),
-                'pauses': scores.get('pauses', 0),
-                'fillerWords': scores.get('fillerWords', 0)
-            })
-        
-        # Calculate averages for each fluency metric
-        fluency_totals = {
-            'wpm': 0,
-            'total': 0,
-            'pauses': 0,
-            'fillerWords': 0
-        }
-        count = len(results)
-        
-        if count > 0:
-            for result in results:
-                for metric, score in result.items():
-                    fluency_totals[metric] += score
-            
-            # Calculate final averages
-            fluency_data = [
-                {
-                    'name': metric,
-                    'score': total / count
-                }
-                for metric, total in fluency_totals.items()
-            ]
-            
-            # Sort by score in descending order
-            fluency_data.sort(key=lambda x: x['score'], reverse=True)
-        else:
-            fluency_data = []
-            
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "fluencyData": fluency_data
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
+
+            cursor = connection.cursor()
+
+            query = spec.compile(transform_overview_data.projection.query() + " WHERE {filters}")
+            overview_results = list(transform_overview_data.map(iter_rows(connection, query, spec.params)))
+
+            aggregates = query_overview_aggregates(cursor, spec)
+
+            # Specialties are only filtered by user and status so the filter
+            # dropdown keeps listing every option
+            specialties_spec = spec.only(*SPECIALTY_FILTERS)
+            cursor.execute(specialties_spec.compile(SPECIALTIES_QUERY), specialties_spec.params)
+            specialties = [row[0].capitalize() for row in cursor.fetchall() if row[0]]
+
+            return json_response(200, {
+                "simulationData": overview_results,
+                **aggregates,
+                "specialties": specialties
             })
-        }
-        
+
     except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close() 
\ No newline at end of file
+        logger.error("Database error: %s", e)
+        return error_response(500, "Database error occurred")
@@ -1,43 +1,129 @@
+import base64
 import json
+import os
 from datetime import datetime
-from .db_connection import get_db_connection
+from .db_connection import db_connection
+from .filters import QuerySpec
+from .projections import json_value, projects
+from .streaming import RowStream, ndjson_response, wants_stream
+from utils.logger import logger
+from utils.responses import error_response, json_response
 
-def datetime_handler(obj):
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+# Listings are paged by keyset on (created_at, id) so a deep page costs the
+# same as the first one; see migrations/0011_keyset_index_null_created_at.py.
+# created_at is nullable, so runs without one sort last, as -infinity; the
+# indexes are built on this same expression.
+SORT_KEY = "COALESCE(created_at, '-infinity'::timestamptz)"
+DEFAULT_PAGE_SIZE = int(os.environ.get('SIMULATION_RUN_PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = int(os.environ.get('SIMULATION_RUN_MAX_PAGE_SIZE', '200'))
 
+LISTING_FILTERS = ('user_id', 'product_id', 'specialty', 'mode', 'assessment_status')
+
+def encode_cursor(created_at, run_id):
+    """
+    Opaque cursor pointing just past the run with the given sort key;
+    created_at may be None
+    """
+    payload = json.dumps([created_at.isoformat() if created_at is not None else None, run_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Returns the (created_at, id) sort key encoded in a cursor.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, run_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(created_at) if created_at is not None else None), int(run_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def parse_page_size(value):
+    """
+    Validates the limit query parameter, falling back to the default page size.
+    Raises ValueError if it is not an integer between 1 and MAX_PAGE_SIZE.
+    """
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    if not str(value).isdigit() or not 1 <= int(value) <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be an integer between 1 and {MAX_PAGE_SIZE}")
+    return int(value)
+
+def simulation_run_query(simulation_id, query_params, after, limit):
+    """
+    SELECT for one run by id, or for the filtered listing newest first,
+    resuming after the given sort key. Returns (query, params).
+    """
+    query = transform_simulation_run_data.projection.query()
+    if simulation_id:
+        return query + " WHERE id = %s", [int(simulation_id)]
+
+    # Same filters as the overview handler
+    spec = QuerySpec.from_query_params(query_params, *LISTING_FILTERS)
+    query += " WHERE {filters}"
+    params = spec.params
+
+    # Resume strictly after the last run of the previous page
+    if after:
+        query += f" AND ({SORT_KEY}, id) < (COALESCE(CAST(%s AS timestamptz), '-infinity'), %s)"
+        params = params + list(after)
+
+    # id breaks ties between runs created at the same instant
+    query += f" ORDER BY {SORT_KEY} DESC, id DESC"
+    if limit is not None:
+        query += " LIMIT %s"
+        params = params + [limit]
+    return spec.compile(query), params
+
+@projects(
+    id='id',
+    mode='mode',
+    user_id='user_id',
+    created_at='created_at',
+    adoption_continuum='adoption_continuum',
+    situation='situation',
+    product_id='product_id',
+    specialty='specialty',
+    introduction_score=json_value('accuracy', 'scores', 'introduction', 'score', default=0),
+    rapport_score=json_value('accuracy', 'scores', 'rapport', 'score', default=0),
+    interest_score=json_value('accuracy', 'scores', 'creatingInterest', 'score', default=0),
+    probing_score=json_value('accuracy', 'scores', 'probing', 'score', default=0),
+    product_knowledge_score=json_value('accuracy', 'scores', 'productKnowledge', 'score', default=0),
+    strategy_score=json_value('accuracy', 'scores', 'strategy', 'score', default=0),
+    closing_score=json_value('accuracy', 'scores', 'closing', 'score', default=0),
+    disc_score=json_value('accuracy', 'scores', 'disc', 'score', default=0),
+    disc_feedback=json_value('accuracy', 'scores', 'disc', 'feedback', default=''),
+    traits_score=json_value('accuracy', 'scores', 'traits', 'score', default=0),
+    traits_feedback=json_value('accuracy', 'scores', 'traits', 'feedback', default=''),
+    adoption_score=json_value('accuracy', 'scores', 'adoptionContinuum', 'score', default=0),
+    adoption_feedback=json_value('accuracy', 'scores', 'adoptionContinuum', 'feedback', default=''),
+    overall_score=json_value('accuracy', 'scores', 'total', 'score', default=0)
+)
 def transform_simulation_run_data(row):
-    # Get scores from the accuracy column
-    accuracy = row.get('accuracy', {})
-    scores = accuracy.get('scores', {})
-    
     # Get individual scores
-    introduction_score = scores.get('introduction', {}).get('score', 0)
-    rapport_score = scores.get('rapport', {}).get('score', 0)
-    interest_score = scores.get('creatingInterest', {}).get('score', 0)
-    probing_score = scores.get('probing', {}).get('score', 0)
-    product_knowledge_score = scores.get('productKnowledge', {}).get('score', 0)
-    strategy_score = scores.get('strategy', {}).get('score', 0)
-    closing_score = scores.get('closing', {}).get('score', 0)
+    introduction_score = row.get('introduction_score')
+    rapport_score = row.get('rapport_score')
+    interest_score = row.get('interest_score')
+    probing_score = row.get('probing_score')
+    product_knowledge_score = row.get('product_knowledge_score')
+    strategy_score = row.get('strategy_score')
+    closing_score = row.get('closing_score')
     
     # Get DISC data with feedback
-    disc_data = scores.get('disc', {})
-    disc_score = disc_data.get('score', 0)
-    disc_feedback = disc_data.get('feedback', '')
+    disc_score = row.get('disc_score')
+    disc_feedback = row.get('disc_feedback')
     
     # Get traits data with feedback
-    traits_data = scores.get('traits', {})
-    traits_score = traits_data.get('score', 0)
-    traits_feedback = traits_data.get('feedback', '')
+    traits_score = row.get('traits_score')
+    traits_feedback = row.get('traits_feedback')
     
     # Get adoption continuum data with feedback
-    adoption_data = scores.get('adoptionContinuum', {})
-    adoption_score = adoption_data.get('score', 0)
-    adoption_feedback = adoption_data.get('feedback', '')
+    adoption_score = row.get('adoption_score')
+    adoption_feedback = row.get('adoption_feedback')
     
     # Get overall score from scores.total.score
-    overall_score = scores.get('total', {}).get('score', 0)
+    overall_score = row.get('overall_score')
     
     # Handle date formatting
     created_at = row.get('created_at')
@@ -105,117 +191,63 @@ def handle_simulation_run(event, context):
     
     # Validate that simulation_id is a valid integer
     if simulation_id and not simulation_id.isdigit():
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Invalid simulation ID format"
-            })
-        }
+        return error_response(400, "Invalid simulation ID format")
+
+    page_size = None
+    after = None
+    if not simulation_id:
+        try:
+            page_size = parse_page_size(query_params.get('limit'))
+            if query_params.get('cursor'):
+                after = decode_cursor(query_params['cursor'])
+        except ValueError as e:
+            return error_response(400, str(e))
     
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
+        if wants_stream(event):
+            # Every run after the cursor, or only limit of them if one is given
+            limit = page_size if query_params.get('limit') else None
+            query, params = simulation_run_query(simulation_id, query_params, after, limit)
+            return ndjson_response(
+                RowStream(query, params),
+                transform_simulation_run_data.map
+            )
 
-        cursor = connection.cursor()
-        
-        # Base query
-        query = "SELECT * FROM call_sim_scoring"
-        params = []
-        conditions = []
-        
-        # Add filters
-        if simulation_id:
-            conditions.append("id = %s")
-            params.append(int(simulation_id))
-        else:
-            # Add other filters like in overview handler
-            user_id = query_params.get('userId')
-            product_filter = query_params.get('product')
-            specialty_filter = query_params.get('specialty')
-            mode_filter = query_params.get('mode')
-            assessment_status = query_params.get('assessmentStatus')
-            
-            if user_id:
-                conditions.append("user_id = %s")
-                params.append(user_id)
-                
-            if product_filter and product_filter != 'all':
-                conditions.append("product_id = %s")
-                params.append(product_filter)
-                
-            if specialty_filter and specialty_filter != 'all':
-                conditions.append("LOWER(specialty) = LOWER(%s)")
-                params.append(specialty_filter)
-                
-            if mode_filter and mode_filter != 'all':
-                conditions.append("mode = %s")
-                params.append(mode_filter)
-                
-            if assessment_status and assessment_status != 'all':
-                conditions.append("assessment_status = %s")
-                params.append(assessment_status)
-            
-        # Combine all conditions with AND
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        # Add ordering by date
-        query += " ORDER BY created_at DESC"
+        with db_connection() as connection:
+            if not connection:
+                return error_response(500, "Failed to connect to database")
+
+            cursor = connection.cursor()
+
+            # One extra row tells us whether another page exists
+            query, params = simulation_run_query(
+                simulation_id, query_params, after,
+                page_size + 1 if page_size is not None else None
+            )
             
-        # Execute query
-        cursor.execute(query, params)
+            # Execute query
+            cursor.execute(query, params)
         
-        # Fetch all results
-        columns = [desc[0] for desc in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            row_dict = dict(zip(columns, row))
-            transformed_data = transform_simulation_run_data(row_dict)
-            results.append(transformed_data)
+            # A page is at most MAX_PAGE_SIZE + 1 rows, so it is fetched in one
+            # go through its prepared statement rather than a server-side cursor
+            rows = cursor.fetchall()
+
+            next_cursor = None
+            if page_size is not None and len(rows) > page_size:
+                rows = rows[:page_size]
+                last = transform_simulation_run_data.projection.row_type(rows[-1])
+                next_cursor = encode_cursor(last.get('created_at'), last.get('id'))
+
+            results = list(transform_simulation_run_data.map(rows))
         
-        # Return empty array if no results found, instead of 404 error
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "simulationData": results if not simulation_id else results[0] if results else []
-            }, default=datetime_handler)
-        }
+            if simulation_id:
+                body = {"simulationData": results[0] if results else []}
+            else:
+                # Return empty array if no results found, instead of 404 error
+                body = {"simulationData": results, "nextCursor": next_cursor}
+
+            return json_response(200, body)
         
     except Exception as e:
-        print(f"Database error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close() 
\ No newline at end of file
+        logger.error("Database error: %s", e)
+        return error_response(500, "Database error occurred")
@@ -0,0 +1,145 @@
+"""
+Newline-delimited JSON responses for listings too large to build in memory.
+
+A streaming handler returns its usual response dict, but the body is an
+iterator of text chunks instead of a string. Rows come from a server-side
+cursor STREAM_BATCH_SIZE at a time and are encoded as they arrive, so memory
+is bounded by the batch size rather than by the number of matching rows.
+
+API Gateway proxy integrations need the whole body at once, so
+lambda_function.lambda_handler joins the chunks. A response-streaming runtime
+writes them as they are produced with write_response, which frames them the
+way Lambda HTTP response streams do. To watch a stream locally:
+
+    python -m handlers.streaming simulation-run user_id=42
+"""
+import json
+import os
+import resource
+import sys
+
+from types import MappingProxyType
+
+from .db_connection import acquire_connection, iter_rows, release_connection
+from utils.logger import logger
+from utils.responses import CORS_HEADERS, encode_json, text_response
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+NDJSON_HEADERS = MappingProxyType({
+    **CORS_HEADERS,
+    "Content-Type": NDJSON_CONTENT_TYPE
+})
+
+# Rows fetched per round trip, and lines per body chunk
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', '500'))
+
+# Separates the JSON prelude (status code and headers) from the body in a
+# Lambda HTTP response stream
+PRELUDE_DELIMITER = b'\x00' * 8
+
+
+def wants_stream(event):
+    """
+    True if the request asked for NDJSON, with an Accept header or ?stream=1
+    """
+    query_params = event.get('queryStringParameters', {}) or {}
+    if query_params.get('stream') == '1':
+        return True
+    headers = event.get('headers', {}) or {}
+    accept = next((value for name, value in headers.items() if name.lower() == 'accept'), None)
+    return NDJSON_CONTENT_TYPE in (accept or '')
+
+
+class RowStream:
+    """
+    Result tuples of a query, read through a server-side cursor batch_size
+    at a time. The stream takes a pooled connection when it is first
+    iterated and holds it until it is exhausted or closed, so a body that is
+    never read never takes one.
+    """
+
+    def __init__(self, query, params=(), batch_size=None):
+        self.query = query
+        self.params = params
+        self.batch_size = batch_size or STREAM_BATCH_SIZE
+        self.connection = None
+
+    def __iter__(self):
+        self.connection = acquire_connection()
+        if self.connection is None:
+            raise ConnectionError("Failed to connect to database")
+        try:
+            yield from iter_rows(self.connection, self.query, self.params, self.batch_size)
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Returns the connection to the pool; its rollback closes the cursor.
+        """
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            release_connection(connection)
+
+
+def encode_ndjson(records):
+    """
+    Encodes records one JSON document per line, STREAM_BATCH_SIZE lines per
+    chunk. A failure after the response has started ends the body with an
+    error line, since the status code has already been sent.
+    """
+    lines = []
+    try:
+        for record in records:
+            lines.append(encode_json(record))
+            if len(lines) >= STREAM_BATCH_SIZE:
+                yield "\n".join(lines) + "\n"
+                lines = []
+    except Exception as e:
+        logger.error("Database error: %s", e)
+        lines.append(encode_json({"error": "Database error occurred"}))
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def ndjson_response(rows, records):
+    """
+    Returns a 200 response whose body streams the records built from a
+    RowStream's rows by records(rows). Nothing is queried until the body is
+    read, so an unreachable database ends the body with an error line.
+    """
+    return text_response(200, encode_ndjson(records(rows)), NDJSON_HEADERS)
+
+
+def write_response(response, write):
+    """
+    Writes a response in Lambda's HTTP response stream format: a JSON prelude
+    with the status code and headers, eight NUL bytes, then the body chunks
+    (text, or bytes once compressed) as they are produced.
+    """
+    prelude = {"statusCode": response["statusCode"], "headers": response.get("headers", {})}
+    write(json.dumps(prelude).encode('utf-8'))
+    write(PRELUDE_DELIMITER)
+    body = response.get("body") or ""
+    for chunk in ([body] if isinstance(body, str) else body):
+        write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+
+
+if __name__ == '__main__':
+    # Local driver: streams a route's NDJSON body to stdout as it is produced,
+    # and reports the status and peak memory on stderr
+    from lambda_function import route_request
+
+    path, *pairs = sys.argv[1:] or ['simulation-run']
+    query_params = dict(pair.split('=', 1) for pair in pairs)
+    query_params['stream'] = '1'
+    response = route_request({"path": path, "httpMethod": "GET", "queryStringParameters": query_params}, None)
+
+    body = response.get("body") or ""
+    for chunk in ([body] if isinstance(body, str) else body):
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"status {response['statusCode']}, peak RSS {peak_kb} KB", file=sys.stderr)
@@ -1,4 +1,5 @@
-import json
+from utils.logger import logger
+from utils.responses import json_response
 
 def handle_team_members_request(event, context):
     path = event.get('path', '')
@@ -6,8 +7,7 @@ def handle_team_members_request(event, context):
     # Remove leading slash if present
     path = path.lstrip('/')
     
-    # Debug logging
-    print(f"Team members handler received path: {path}")
+    logger.debug("Team members handler received path: %s", path)
     
     # Base team members data
     team_members_data = {
@@ -135,36 +135,12 @@ def handle_team_members_request(event, context):
         member = next((m for m in team_members_data["teamMembers"] if m["id"] == member_id), None)
         
         if member:
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps(member)
-            }
+            return json_response(200, member)
         else:
-            return {
-                "statusCode": 404,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "message": "Member not found",
-                    "path": path
-                })
-            }
+            return json_response(404, {
+                "message": "Member not found",
+                "path": path
+            })
     
     # Return all team members for the main endpoint
-    return {
-        "statusCode": 200,
-        "headers": {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Allow-Methods": "*"
-        },
-        "body": json.dumps(team_members_data)
-    } 
+    return json_response(200, team_members_data) 
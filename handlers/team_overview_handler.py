@@ -1,101 +1,200 @@
-import json
-from .db_connection import get_db_connection
-import logging
+import os
+from datetime import date, timedelta
+from .db_connection import db_connection
+from .filters import InvalidFilter, QuerySpec
+from utils.logger import logger
+from utils.responses import error_response, json_response
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# The team overview filters (team, product, mode, assessment status) are all
+# rollup dimensions, so its sections are answered from the monthly
+# team_overview_rollup (migrations/0006_team_overview_rollup.py) and the daily
+# team_trend_daily (migrations/0007_team_trend_daily.py) instead of scanning
+# call_sim_scoring. TEAM_OVERVIEW_ROLLUP=0 switches to the live queries over
+# call_sim_scoring, e.g. to compare results or before the rollups are built.
+# team-overview/all scans the table for every section but the trend.
+TEAM_OVERVIEW_ROLLUP = os.environ.get('TEAM_OVERVIEW_ROLLUP', '1') != '0'
 
-def calculate_team_averages(cursor, product_id=None, team_id=None, mode=None, assessment_status=None):
+ROLLUP_PRODUCTS_QUERY = """
+    SELECT DISTINCT product_id
+    FROM team_overview_rollup
+    WHERE {filters}
+    AND product_id IS NOT NULL
+    ORDER BY product_id
+"""
+
+ROLLUP_AVERAGES_QUERY = """
+    SELECT
+        SUM(overall_score_sum) / NULLIF(SUM(overall_score_count), 0) as overall_avg,
+        COALESCE(SUM(row_count), 0)::bigint as total_simulations,
+        SUM(total_accuracy_sum) / NULLIF(SUM(total_accuracy_count), 0) as total_accuracy
+    FROM team_overview_rollup
+    WHERE {filters}
+"""
+
+ROLLUP_ACCURACY_QUERY = """
+    SELECT
+        SUM(total_accuracy_sum) / NULLIF(SUM(total_accuracy_count), 0) as total_accuracy,
+        COALESCE(SUM(row_count), 0)::bigint as total_count
+    FROM team_overview_rollup
+    WHERE {filters}
+"""
+
+ROLLUP_FLUENCY_QUERY = """
+    SELECT
+        SUM(wpm_sum) / NULLIF(SUM(wpm_count), 0) as wpm,
+        SUM(fluency_total_sum) / NULLIF(SUM(fluency_total_count), 0) as total,
+        SUM(pauses_sum) / NULLIF(SUM(pauses_count), 0) as pauses,
+        SUM(filler_words_sum) / NULLIF(SUM(filler_words_count), 0) as filler_words,
+        COALESCE(SUM(fluency_count), 0)::bigint as total_count
+    FROM team_overview_rollup
+    WHERE {filters}
+"""
+
+ROLLUP_SIMULATION_COUNT_QUERY = """
+    SELECT COALESCE(SUM(row_count), 0)::bigint as total_simulations
+    FROM team_overview_rollup
+    WHERE {filters}
+"""
+
+# Trend buckets and the TO_CHAR format of their labels
+TREND_BUCKETS = {
+    'day': 'YYYY-MM-DD',
+    'week': 'IYYY-"W"IW',
+    'month': 'Mon YYYY',
+    'quarter': 'YYYY "Q"Q'
+}
+
+# Trend window bounds and bucket; without a start date the trend covers the
+# last 12 months
+TREND_BOUNDS_SQL = """
+    SELECT
+        COALESCE(%s::timestamptz, NOW() - INTERVAL '12 months') as lower_bound,
+        %s::timestamptz as upper_bound,
+        %s::text as bucket
+"""
+
+# Whole days come from team_trend_daily (migrations/0007_team_trend_daily.py);
+# a window that starts mid-day reads the rest of that day from the rows
+ROLLUP_TREND_QUERY = f"""
+    WITH bounds AS ({TREND_BOUNDS_SQL}),
+    days AS (
+        SELECT team_id, product_id, mode, assessment_status, day,
+               composite_sum, composite_count, accuracy_count
+        FROM team_trend_daily, bounds
+        WHERE day >= lower_bound
+        AND (upper_bound IS NULL OR day < upper_bound)
+        UNION ALL
+        SELECT team_id, product_id, mode, assessment_status, day,
+               composite, (composite IS NOT NULL)::int, 1
+        FROM (
+            SELECT
+                team_id, product_id, mode, assessment_status,
+                DATE_TRUNC('day', created_at) as day,
+                (introduction_score + rapport_score + creating_interest_score + probing_score +
+                 product_knowledge_score + strategy_score + closing_score + disc_score +
+                 traits_score + adoption_continuum_score) / 10 as composite
+            FROM call_sim_scoring, bounds
+            WHERE accuracy IS NOT NULL
+            AND lower_bound > DATE_TRUNC('day', lower_bound)
+            AND created_at >= lower_bound
+            AND created_at < DATE_TRUNC('day', lower_bound) + INTERVAL '1 day'
+            AND (upper_bound IS NULL OR created_at < upper_bound)
+        ) partial_day
+    )
+    SELECT
+        TO_CHAR(period, %s) as name,
+        SUM(composite_sum) / NULLIF(SUM(composite_count), 0) as team
+    FROM (
+        SELECT DATE_TRUNC(bucket, day) as period, composite_sum, composite_count, accuracy_count
+        FROM days, bounds
+        WHERE {{filters}}
+    ) periods
+    GROUP BY period
+    HAVING SUM(accuracy_count) > 0
+    ORDER BY period
+"""
+
+def rollup_comparison_query():
+    """
+    Per-score averages from the rollup as the same (name, team, total_count)
+    rows the live comparison query returns, in teamComparisonData order
+    """
+    totals = ",\n                ".join(
+        f"SUM({column}_sum) as {column}_sum, SUM({column}_count) as {column}_count"
+        for _, column in COMPARISON_SCORES
+    )
+    scores = ",\n            ".join(
+        f"({position}, '{name}', {column}_sum, {column}_count)"
+        for position, (name, column) in enumerate(COMPARISON_SCORES)
+    )
+    return f"""
+        WITH totals AS (
+            SELECT
+                COALESCE(SUM(accuracy_count), 0)::bigint as total_count,
+                {totals}
+            FROM team_overview_rollup
+            WHERE {{filters}}
+        )
+        SELECT name, score_sum / score_count as team, total_count
+        FROM totals
+        CROSS JOIN LATERAL (VALUES
+            {scores}
+        ) as scores(position, name, score_sum, score_count)
+        WHERE score_count > 0
+        ORDER BY position
+    """
+
+def calculate_team_averages(cursor, spec):
     """
     Calculate team averages from call_sim_scoring table with optional filters
     """
-    logger.info(f"Calculating team averages with filters - product_id: {product_id}, team_id: {team_id}, mode: {mode}, assessment_status: {assessment_status}")
+    logger.debug("Calculating team averages with filters - %s", spec)
     
     # Get available products for this team
-    products_query = """
-        SELECT DISTINCT product_id 
-        FROM call_sim_scoring 
-        WHERE 1=1
-    """
-    params = []
-    
-    if team_id and team_id != 'all':
-        products_query += " AND team_id::text = %s"
-        params.append(team_id)
-    
-    if mode and mode != 'all':
-        products_query += " AND mode = %s"
-        params.append(mode)
+    products_spec = spec.without('product_id')
+    if TEAM_OVERVIEW_ROLLUP:
+        products_query = ROLLUP_PRODUCTS_QUERY
+    else:
+        products_query = """
+            SELECT DISTINCT product_id 
+            FROM call_sim_scoring 
+            WHERE {filters}
+            AND product_id IS NOT NULL
+            ORDER BY product_id
+        """
+    products_query = products_spec.compile(products_query)
+    params = products_spec.params
     
-    if assessment_status and assessment_status != 'all':
-        products_query += " AND assessment_status = %s"
-        params.append(assessment_status)
-    
-    products_query += " AND product_id IS NOT NULL"
-    
-    logger.info(f"Executing products query: {products_query}")
-    logger.info(f"Products query parameters: {params}")
+    logger.debug("Executing products query: %s", products_query)
+    logger.debug("Products query parameters: %s", params)
     
     cursor.execute(products_query, params)
     available_products = [row[0] for row in cursor.fetchall()]
-    logger.info(f"Available products: {available_products}")
-
-    # Base query
-    query = """
-        SELECT 
-            AVG(overall_score) as overall_avg,
-            COUNT(*) as total_simulations,
-            AVG(CASE 
-                WHEN conversation_data->'analysis'->'evaluation_criteria_results'->'introduction'->>'result' = 'success' THEN 100
-                ELSE 0
-            END) as introduction_avg,
-            AVG(CASE 
-                WHEN conversation_data->'analysis'->'evaluation_criteria_results'->'rapport'->>'result' = 'success' THEN 100
-                ELSE 0
-            END) as rapport_avg,
-            AVG(CASE 
-                WHEN conversation_data->'analysis'->'evaluation_criteria_results'->'creating_interest'->>'result' = 'success' THEN 100
-                ELSE 0
-            END) as interest_avg,
-            AVG(CASE 
-                WHEN conversation_data->'analysis'->'evaluation_criteria_results'->'probing'->>'result' = 'success' THEN 100
-                ELSE 0
-            END) as probing_avg,
-            AVG(CASE 
-                WHEN conversation_data->'analysis'->'evaluation_criteria_results'->'product_knowledge'->>'result' = 'success' THEN 100
-                ELSE 0
-            END) as product_knowledge_avg,
-            AVG(CAST(accuracy->'scores'->'total'->>'score' AS FLOAT)) as total_accuracy
-        FROM call_sim_scoring
-        WHERE 1=1
-    """
-    params = []
-
-    # Add filters only if they are provided and not 'all'
-    if product_id and product_id != 'all':
-        query += " AND product_id = %s"
-        params.append(product_id)
-    
-    if team_id and team_id != 'all':
-        query += " AND team_id::text = %s"
-        params.append(team_id)
+    logger.debug("Available products: %s", available_products)
 
-    if mode and mode != 'all':
-        query += " AND mode = %s"
-        params.append(mode)
+    if TEAM_OVERVIEW_ROLLUP:
+        query = ROLLUP_AVERAGES_QUERY
+    else:
+        # Base query
+        query = """
+            SELECT 
+                AVG(overall_score) as overall_avg,
+                COUNT(*) as total_simulations,
+                AVG(total_accuracy_score) as total_accuracy
+            FROM call_sim_scoring
+            WHERE {filters}
+        """
 
-    if assessment_status and assessment_status != 'all':
-        query += " AND assessment_status = %s"
-        params.append(assessment_status)
+    query = spec.compile(query)
+    params = spec.params
 
-    logger.info(f"Executing query: {query}")
-    logger.info(f"Query parameters: {params}")
+    logger.debug("Executing query: %s", query)
+    logger.debug("Query parameters: %s", params)
 
     # Execute query
     cursor.execute(query, params)
     result = cursor.fetchone()
-    logger.info(f"Query result: {result}")
+    logger.debug("Query result: %s", result)
 
     if not result or result[1] == 0:  # Check if no data or zero simulations
         logger.info("No data found for the specified filters")
@@ -113,153 +212,143 @@ def calculate_team_averages(cursor, product_id=None, team_id=None, mode=None, as
             "overall": round(result[0] or 0, 1),  # overall_avg
             "simulations": result[1] or 0,  # total_simulations
             "availableProducts": available_products,  # Add available products to response
-            "totalAccuracy": round(result[7] or 0, 1)  # total_accuracy
+            "totalAccuracy": round(result[2] or 0, 1)  # total_accuracy
         }
     }
-    logger.info(f"Response data: {response_data}")
+    logger.debug("Response data: %s", response_data)
     return response_data
 
-def calculate_team_comparison(cursor, product_id=None, team_id=None, mode=None, assessment_status=None):
+def calculate_team_comparison(cursor, spec):
     """
     Calculate team comparison data from call_sim_scoring table with optional filters
     """
-    logger.info(f"Calculating team comparison with filters - product_id: {product_id}, team_id: {team_id}, mode: {mode}, assessment_status: {assessment_status}")
+    logger.debug("Calculating team comparison with filters - %s", spec)
     
-    # Base query to get team performance metrics with dynamic benchmarks
-    query = """
-        WITH team_scores AS (
+    if TEAM_OVERVIEW_ROLLUP:
+        query = rollup_comparison_query()
+    else:
+        # Base query to get team performance metrics with dynamic benchmarks
+        query = """
+            WITH team_scores AS (
+                SELECT 
+                    introduction_score as intro_score,
+                    rapport_score,
+                    creating_interest_score as interest_score,
+                    probing_score,
+                    product_knowledge_score as product_score,
+                    strategy_score,
+                    closing_score,
+                    disc_score,
+                    traits_score,
+                    adoption_continuum_score as adoption_score,
+                    COUNT(*) OVER() as total_count
+                FROM call_sim_scoring
+                WHERE accuracy IS NOT NULL
+                AND {filters}
+        """
+
+        query += """
+            )
             SELECT 
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score,
-                CAST(accuracy->'scores'->'strategy'->>'score' AS FLOAT) as strategy_score,
-                CAST(accuracy->'scores'->'closing'->>'score' AS FLOAT) as closing_score,
-                CAST(accuracy->'scores'->'disc'->>'score' AS FLOAT) as disc_score,
-                CAST(accuracy->'scores'->'traits'->>'score' AS FLOAT) as traits_score,
-                CAST(accuracy->'scores'->'adoptionContinuum'->>'score' AS FLOAT) as adoption_score,
-                COUNT(*) OVER() as total_count
-            FROM call_sim_scoring
-            WHERE accuracy IS NOT NULL
-    """
-    
-    params = []
-    if team_id and team_id != 'all':
-        query += " AND team_id::text = %s"
-        params.append(team_id)
-    
-    if mode and mode != 'all':
-        query += " AND mode = %s"
-        params.append(mode)
-    
-    if product_id and product_id != 'all':
-        query += " AND product_id = %s"
-        params.append(product_id)
-    
-    if assessment_status and assessment_status != 'all':
-        query += " AND assessment_status = %s"
-        params.append(assessment_status)
-    
-    query += """
-        )
-        SELECT 
-            'Introduction' as name,
-            AVG(intro_score) as team,
-            total_count
-        FROM team_scores
-        WHERE intro_score IS NOT NULL
-        GROUP BY total_count
+                'Introduction' as name,
+                AVG(intro_score) as team,
+                total_count
+            FROM team_scores
+            WHERE intro_score IS NOT NULL
+            GROUP BY total_count
 
-        UNION ALL
-        SELECT 
-            'Rapport' as name,
-            AVG(rapport_score) as team,
-            total_count
-        FROM team_scores
-        WHERE rapport_score IS NOT NULL
-        GROUP BY total_count
+            UNION ALL
+            SELECT 
+                'Rapport' as name,
+                AVG(rapport_score) as team,
+                total_count
+            FROM team_scores
+            WHERE rapport_score IS NOT NULL
+            GROUP BY total_count
 
-        UNION ALL
-        SELECT 
-            'Creating Interest' as name,
-            AVG(interest_score) as team,
-            total_count
-        FROM team_scores
-        WHERE interest_score IS NOT NULL
-        GROUP BY total_count
+            UNION ALL
+            SELECT 
+                'Creating Interest' as name,
+                AVG(interest_score) as team,
+                total_count
+            FROM team_scores
+            WHERE interest_score IS NOT NULL
+            GROUP BY total_count
 
-        UNION ALL
-        SELECT 
-            'Probing' as name,
-            AVG(probing_score) as team,
-            total_count
-        FROM team_scores
-        WHERE probing_score IS NOT NULL
-        GROUP BY total_count
+            UNION ALL
+            SELECT 
+                'Probing' as name,
+                AVG(probing_score) as team,
+                total_count
+            FROM team_scores
+            WHERE probing_score IS NOT NULL
+            GROUP BY total_count
 
-        UNION ALL
-        SELECT 
-            'Product Knowledge' as name,
-            AVG(product_score) as team,
-            total_count
-        FROM team_scores
-        WHERE product_score IS NOT NULL
-        GROUP BY total_count
+            UNION ALL
+            SELECT 
+                'Product Knowledge' as name,
+                AVG(product_score) as team,
+                total_count
+            FROM team_scores
+            WHERE product_score IS NOT NULL
+            GROUP BY total_count
 
-        UNION ALL
-        SELECT 
-            'Strategy' as name,
-            AVG(strategy_score) as team,
-            total_count
-        FROM team_scores
-        WHERE strategy_score IS NOT NULL
-        GROUP BY total_count
+            UNION ALL
+            SELECT 
+                'Strategy' as name,
+                AVG(strategy_score) as team,
+                total_count
+            FROM team_scores
+            WHERE strategy_score IS NOT NULL
+            GROUP BY total_count
 
-        UNION ALL
-        SELECT 
-            'Closing' as name,
-            AVG(closing_score) as team,
-            total_count
-        FROM team_scores
-        WHERE closing_score IS NOT NULL
-        GROUP BY total_count
+            UNION ALL
+            SELECT 
+                'Closing' as name,
+                AVG(closing_score) as team,
+                total_count
+            FROM team_scores
+            WHERE closing_score IS NOT NULL
+            GROUP BY total_count
 
-        UNION ALL
-        SELECT 
-            'DISC' as name,
-            AVG(disc_score) as team,
-            total_count
-        FROM team_scores
-        WHERE disc_score IS NOT NULL
-        GROUP BY total_count
+            UNION ALL
+            SELECT 
+                'DISC' as name,
+                AVG(disc_score) as team,
+                total_count
+            FROM team_scores
+            WHERE disc_score IS NOT NULL
+            GROUP BY total_count
 
-        UNION ALL
-        SELECT 
-            'Traits' as name,
-            AVG(traits_score) as team,
-            total_count
-        FROM team_scores
-        WHERE traits_score IS NOT NULL
-        GROUP BY total_count
+            UNION ALL
+            SELECT 
+                'Traits' as name,
+                AVG(traits_score) as team,
+                total_count
+            FROM team_scores
+            WHERE traits_score IS NOT NULL
+            GROUP BY total_count
 
-        UNION ALL
-        SELECT 
-            'Adoption Continuum' as name,
-            AVG(adoption_score) as team,
-            total_count
-        FROM team_scores
-        WHERE adoption_score IS NOT NULL
-        GROUP BY total_count
-    """
+            UNION ALL
+            SELECT 
+                'Adoption Continuum' as name,
+                AVG(adoption_score) as team,
+                total_count
+            FROM team_scores
+            WHERE adoption_score IS NOT NULL
+            GROUP BY total_count
+        """
+
+    query = spec.compile(query)
+    params = spec.params
 
-    logger.info(f"Executing query: {query}")
-    logger.info(f"Query parameters: {params}")
+    logger.debug("Executing query: %s", query)
+    logger.debug("Query parameters: %s", params)
 
     # Execute query
     cursor.execute(query, params)
     results = cursor.fetchall()
-    logger.info(f"Query results: {results}")
+    logger.debug("Query results: %s", results)
 
     if not results or results[0][2] == 0:  # Check if no data or zero count
         logger.info("No data found for the specified filters")
@@ -279,52 +368,36 @@ def calculate_team_comparison(cursor, product_id=None, team_id=None, mode=None,
     response_data = {
         "teamComparisonData": comparison_data
     }
-    logger.info(f"Response data: {response_data}")
+    logger.debug("Response data: %s", response_data)
     return response_data
 
-def calculate_team_situation(cursor, product_id=None, team_id=None, mode=None, assessment_status=None):
+def calculate_team_situation(cursor, spec):
     """
     Calculate team performance metrics grouped by situation type
     """
-    logger.info(f"Calculating team situation with filters - product_id: {product_id}, team_id: {team_id}, mode: {mode}, assessment_status: {assessment_status}")
+    logger.debug("Calculating team situation with filters - %s", spec)
     
     # Base query to get team performance metrics with dynamic benchmarks
     query = """
         WITH team_scores AS (
             SELECT 
                 situation,
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score,
-                CAST(accuracy->'scores'->'strategy'->>'score' AS FLOAT) as strategy_score,
-                CAST(accuracy->'scores'->'closing'->>'score' AS FLOAT) as closing_score,
-                CAST(accuracy->'scores'->'disc'->>'score' AS FLOAT) as disc_score,
-                CAST(accuracy->'scores'->'traits'->>'score' AS FLOAT) as traits_score,
-                CAST(accuracy->'scores'->'adoptionContinuum'->>'score' AS FLOAT) as adoption_score
+                introduction_score as intro_score,
+                rapport_score,
+                creating_interest_score as interest_score,
+                probing_score,
+                product_knowledge_score as product_score,
+                strategy_score,
+                closing_score,
+                disc_score,
+                traits_score,
+                adoption_continuum_score as adoption_score
             FROM call_sim_scoring
             WHERE accuracy IS NOT NULL
             AND situation IS NOT NULL
+            AND {filters}
     """
     
-    params = []
-    if team_id and team_id != 'all':
-        query += " AND team_id::text = %s"
-        params.append(team_id)
-    
-    if mode and mode != 'all':
-        query += " AND mode = %s"
-        params.append(mode)
-    
-    if product_id and product_id != 'all':
-        query += " AND product_id = %s"
-        params.append(product_id)
-    
-    if assessment_status and assessment_status != 'all':
-        query += " AND assessment_status = %s"
-        params.append(assessment_status)
-    
     query += """
         )
         SELECT 
@@ -336,13 +409,16 @@ def calculate_team_situation(cursor, product_id=None, team_id=None, mode=None, a
         ORDER BY situation
     """
     
-    logger.info(f"Executing query: {query}")
-    logger.info(f"Query parameters: {params}")
+    query = spec.compile(query)
+    params = spec.params
+
+    logger.debug("Executing query: %s", query)
+    logger.debug("Query parameters: %s", params)
 
     # Execute query
     cursor.execute(query, params)
     results = cursor.fetchall()
-    logger.info(f"Query results: {results}")
+    logger.debug("Query results: %s", results)
 
     # Format results for frontend, converting Decimal to float
     situation_data = [
@@ -356,70 +432,76 @@ def calculate_team_situation(cursor, product_id=None, team_id=None, mode=None, a
     response_data = {
         "situationData": situation_data
     }
-    logger.info(f"Response data: {response_data}")
+    logger.debug("Response data: %s", response_data)
     return response_data
 
-def calculate_team_trend(cursor, product_id=None, team_id=None, mode=None, assessment_status=None):
+def parse_trend_params(query_params):
     """
-    Calculate team performance trends over time
+    Reads the trend bucket and from/to dates (inclusive, YYYY-MM-DD).
+    Returns (bucket, start, end) with end as the exclusive upper bound.
+    Raises ValueError if any of them is invalid.
     """
-    logger.info(f"Calculating team trend with filters - product_id: {product_id}, team_id: {team_id}, mode: {mode}, assessment_status: {assessment_status}")
-    
-    # Base query to get team performance metrics with dynamic benchmarks
-    query = """
-        WITH team_scores AS (
-            SELECT 
-                DATE_TRUNC('month', created_at) as month,
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score,
-                CAST(accuracy->'scores'->'strategy'->>'score' AS FLOAT) as strategy_score,
-                CAST(accuracy->'scores'->'closing'->>'score' AS FLOAT) as closing_score,
-                CAST(accuracy->'scores'->'disc'->>'score' AS FLOAT) as disc_score,
-                CAST(accuracy->'scores'->'traits'->>'score' AS FLOAT) as traits_score,
-                CAST(accuracy->'scores'->'adoptionContinuum'->>'score' AS FLOAT) as adoption_score
-            FROM call_sim_scoring
-            WHERE accuracy IS NOT NULL
-            AND created_at >= NOW() - INTERVAL '12 months'
+    bucket = query_params.get('bucket') or 'month'
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(TREND_BUCKETS)}")
+    try:
+        start = date.fromisoformat(query_params['from']) if query_params.get('from') else None
+        end = date.fromisoformat(query_params['to']) + timedelta(days=1) if query_params.get('to') else None
+    except ValueError:
+        raise ValueError("from and to must be dates in YYYY-MM-DD format")
+    except OverflowError:
+        # The day after to does not exist for to=9999-12-31
+        raise ValueError(f"to must be before {date.max.isoformat()}")
+    if start and end and start >= end:
+        raise ValueError("from must not be after to")
+    return bucket, start, end
+
+def calculate_team_trend(cursor, spec, bucket='month', start=None, end=None):
     """
-    
-    params = []
-    if team_id and team_id != 'all':
-        query += " AND team_id::text = %s"
-        params.append(team_id)
-    
-    if mode and mode != 'all':
-        query += " AND mode = %s"
-        params.append(mode)
-    
-    if product_id and product_id != 'all':
-        query += " AND product_id = %s"
-        params.append(product_id)
-    
-    if assessment_status and assessment_status != 'all':
-        query += " AND assessment_status = %s"
-        params.append(assessment_status)
-    
-    query += """
-        )
-        SELECT 
-            TO_CHAR(month, 'Mon YYYY') as name,
-            AVG((intro_score + rapport_score + interest_score + probing_score + product_score + 
-                 strategy_score + closing_score + disc_score + traits_score + adoption_score) / 10) as team
-        FROM team_scores
-        GROUP BY month
-        ORDER BY month
+    Calculate team performance trends over time, per day, week, month or
+    quarter between start and end (the last 12 months by default)
     """
-    
-    logger.info(f"Executing query: {query}")
-    logger.info(f"Query parameters: {params}")
+    logger.debug("Calculating team trend with filters - %s, bucket: %s, start: %s, end: %s", spec, bucket, start, end)
+
+    if TEAM_OVERVIEW_ROLLUP:
+        query = ROLLUP_TREND_QUERY
+    else:
+        query = f"""
+            WITH bounds AS ({TREND_BOUNDS_SQL})
+            SELECT
+                TO_CHAR(period, %s) as name,
+                AVG(composite) as team
+            FROM (
+                SELECT
+                    DATE_TRUNC(bucket, created_at) as period,
+                    (introduction_score + rapport_score + creating_interest_score + probing_score +
+                     product_knowledge_score + strategy_score + closing_score + disc_score +
+                     traits_score + adoption_continuum_score) / 10 as composite
+                FROM call_sim_scoring, bounds
+                WHERE accuracy IS NOT NULL
+                AND created_at >= lower_bound
+                AND (upper_bound IS NULL OR created_at < upper_bound)
+                AND {{filters}}
+            ) team_scores
+            GROUP BY period
+            ORDER BY period
+        """
+
+    query = spec.compile(query)
+    params = [
+        start.isoformat() if start else None,
+        end.isoformat() if end else None,
+        bucket,
+        TREND_BUCKETS[bucket]
+    ] + spec.params
+
+    logger.debug("Executing query: %s", query)
+    logger.debug("Query parameters: %s", params)
 
     # Execute query
     cursor.execute(query, params)
     results = cursor.fetchall()
-    logger.info(f"Query results: {results}")
+    logger.debug("Query results: %s", results)
 
     # Format results for frontend, converting Decimal to float
     trend_data = [
@@ -433,52 +515,36 @@ def calculate_team_trend(cursor, product_id=None, team_id=None, mode=None, asses
     response_data = {
         "teamTrendData": trend_data
     }
-    logger.info(f"Response data: {response_data}")
+    logger.debug("Response data: %s", response_data)
     return response_data
 
-def calculate_team_adoption(cursor, product_id=None, team_id=None, mode=None, assessment_status=None):
+def calculate_team_adoption(cursor, spec):
     """
     Calculate team performance metrics grouped by adoption level
     """
-    logger.info(f"Calculating team adoption with filters - product_id: {product_id}, team_id: {team_id}, mode: {mode}, assessment_status: {assessment_status}")
+    logger.debug("Calculating team adoption with filters - %s", spec)
     
     # Base query to get team performance metrics with dynamic benchmarks
     query = """
         WITH team_scores AS (
             SELECT 
                 adoption_continuum,
-                CAST(accuracy->'scores'->'introduction'->>'score' AS FLOAT) as intro_score,
-                CAST(accuracy->'scores'->'rapport'->>'score' AS FLOAT) as rapport_score,
-                CAST(accuracy->'scores'->'creatingInterest'->>'score' AS FLOAT) as interest_score,
-                CAST(accuracy->'scores'->'probing'->>'score' AS FLOAT) as probing_score,
-                CAST(accuracy->'scores'->'productKnowledge'->>'score' AS FLOAT) as product_score,
-                CAST(accuracy->'scores'->'strategy'->>'score' AS FLOAT) as strategy_score,
-                CAST(accuracy->'scores'->'closing'->>'score' AS FLOAT) as closing_score,
-                CAST(accuracy->'scores'->'disc'->>'score' AS FLOAT) as disc_score,
-                CAST(accuracy->'scores'->'traits'->>'score' AS FLOAT) as traits_score,
-                CAST(accuracy->'scores'->'adoptionContinuum'->>'score' AS FLOAT) as adoption_score
+                introduction_score as intro_score,
+                rapport_score,
+                creating_interest_score as interest_score,
+                probing_score,
+                product_knowledge_score as product_score,
+                strategy_score,
+                closing_score,
+                disc_score,
+                traits_score,
+                adoption_continuum_score as adoption_score
             FROM call_sim_scoring
             WHERE accuracy IS NOT NULL
             AND adoption_continuum IS NOT NULL
+            AND {filters}
     """
     
-    params = []
-    if team_id and team_id != 'all':
-        query += " AND team_id::text = %s"
-        params.append(team_id)
-    
-    if mode and mode != 'all':
-        query += " AND mode = %s"
-        params.append(mode)
-    
-    if product_id and product_id != 'all':
-        query += " AND product_id = %s"
-        params.append(product_id)
-    
-    if assessment_status and assessment_status != 'all':
-        query += " AND assessment_status = %s"
-        params.append(assessment_status)
-    
     query += """
         )
         SELECT 
@@ -498,13 +564,16 @@ def calculate_team_adoption(cursor, product_id=None, team_id=None, mode=None, as
             END
     """
     
-    logger.info(f"Executing query: {query}")
-    logger.info(f"Query parameters: {params}")
+    query = spec.compile(query)
+    params = spec.params
+
+    logger.debug("Executing query: %s", query)
+    logger.debug("Query parameters: %s", params)
 
     # Execute query
     cursor.execute(query, params)
     results = cursor.fetchall()
-    logger.info(f"Query results: {results}")
+    logger.debug("Query results: %s", results)
 
     # Format results for frontend, converting Decimal to float
     adoption_data = [
@@ -518,50 +587,36 @@ def calculate_team_adoption(cursor, product_id=None, team_id=None, mode=None, as
     response_data = {
         "adoptionData": adoption_data
     }
-    logger.info(f"Response data: {response_data}")
+    logger.debug("Response data: %s", response_data)
     return response_data
 
-def calculate_team_accuracy(cursor, product_id=None, team_id=None, mode=None, assessment_status=None):
+def calculate_team_accuracy(cursor, spec):
     """
     Calculate team accuracy metrics from call_sim_scoring table
     """
-    logger.info(f"Calculating team accuracy with filters - product_id: {product_id}, team_id: {team_id}, mode: {mode}, assessment_status: {assessment_status}")
+    logger.debug("Calculating team accuracy with filters - %s", spec)
     
-    # Base query
-    query = """
-        SELECT 
-            AVG(CAST(accuracy->'scores'->'total'->>'score' AS FLOAT)) as total_accuracy,
-            COUNT(*) as total_count
-        FROM call_sim_scoring
-        WHERE 1=1
-    """
-    
-    # Build parameters list
-    params = []
-    
-    # Add filters only if they are provided and not 'all'
-    if team_id and team_id != 'all':
-        query += " AND team_id::text = %s"
-        params.append(team_id)
-    
-    if product_id and product_id != 'all':
-        query += " AND product_id = %s"
-        params.append(product_id)
-    
-    if mode and mode != 'all':
-        query += " AND mode = %s"
-        params.append(mode)
-        
-    if assessment_status and assessment_status != 'all':
-        query += " AND assessment_status = %s"
-        params.append(assessment_status)
+    if TEAM_OVERVIEW_ROLLUP:
+        query = ROLLUP_ACCURACY_QUERY
+    else:
+        # Base query
+        query = """
+            SELECT 
+                AVG(total_accuracy_score) as total_accuracy,
+                COUNT(*) as total_count
+            FROM call_sim_scoring
+            WHERE {filters}
+        """
 
-    logger.info(f"Executing query: {query}")
-    logger.info(f"Query parameters: {params}")
+    query = spec.compile(query)
+    params = spec.params
+
+    logger.debug("Executing query: %s", query)
+    logger.debug("Query parameters: %s", params)
 
     cursor.execute(query, params)
     result = cursor.fetchone()
-    logger.info(f"Query result: {result}")
+    logger.debug("Query result: %s", result)
 
     if not result or result[1] == 0:  # Check if no data or zero count
         logger.info("No data found for the specified filters")
@@ -576,53 +631,40 @@ def calculate_team_accuracy(cursor, product_id=None, team_id=None, mode=None, as
             "totalAccuracy": round(result[0] if result and result[0] is not None else 0, 1)
         }
     }
-    logger.info(f"Response data: {response_data}")
+    logger.debug("Response data: %s", response_data)
     return response_data
 
-def calculate_team_fluency(cursor, product_id=None, team_id=None, mode=None, assessment_status=None):
+def calculate_team_fluency(cursor, spec):
     """
     Calculate team fluency metrics from call_sim_scoring table
     """
-    logger.info(f"Calculating team fluency with filters - product_id: {product_id}, team_id: {team_id}, mode: {mode}, assessment_status: {assessment_status}")
-    
-    # Base query
-    query = """
-        SELECT 
-            AVG(CAST(fluency->'scores'->'wpm' AS FLOAT)) as wpm,
-            AVG(CAST(fluency->'scores'->'total' AS FLOAT)) as total,
-            AVG(CAST(fluency->'scores'->'pauses' AS FLOAT)) as pauses,
-            AVG(CAST(fluency->'scores'->'fillerWords' AS FLOAT)) as filler_words,
-            COUNT(*) as total_count
-        FROM call_sim_scoring
-        WHERE fluency IS NOT NULL
-    """
+    logger.debug("Calculating team fluency with filters - %s", spec)
     
-    # Build parameters list
-    params = []
-    
-    # Add filters only if they are provided and not 'all'
-    if team_id and team_id != 'all':
-        query += " AND team_id::text = %s"
-        params.append(team_id)
-    
-    if product_id and product_id != 'all':
-        query += " AND product_id = %s"
-        params.append(product_id)
-    
-    if mode and mode != 'all':
-        query += " AND mode = %s"
-        params.append(mode)
-        
-    if assessment_status and assessment_status != 'all':
-        query += " AND assessment_status = %s"
-        params.append(assessment_status)
+    if TEAM_OVERVIEW_ROLLUP:
+        query = ROLLUP_FLUENCY_QUERY
+    else:
+        # Base query
+        query = """
+            SELECT 
+                AVG(fluency_wpm) as wpm,
+                AVG(fluency_total) as total,
+                AVG(fluency_pauses) as pauses,
+                AVG(fluency_filler_words) as filler_words,
+                COUNT(*) as total_count
+            FROM call_sim_scoring
+            WHERE fluency IS NOT NULL
+            AND {filters}
+        """
 
-    logger.info(f"Executing query: {query}")
-    logger.info(f"Query parameters: {params}")
+    query = spec.compile(query)
+    params = spec.params
+
+    logger.debug("Executing query: %s", query)
+    logger.debug("Query parameters: %s", params)
 
     cursor.execute(query, params)
     result = cursor.fetchone()
-    logger.info(f"Query result: {result}")
+    logger.debug("Query result: %s", result)
 
     if not result or result[4] == 0:  # Check if no data or zero count
         logger.info("No data found for the specified filters")
@@ -643,48 +685,34 @@ def calculate_team_fluency(cursor, product_id=None, team_id=None, mode=None, ass
             "fillerWords": round(result[3] if result and result[3] is not None else 0, 1)
         }
     }
-    logger.info(f"Response data: {response_data}")
+    logger.debug("Response data: %s", response_data)
     return response_data
 
-def calculate_team_simulation_count(cursor, product_id=None, team_id=None, mode=None, assessment_status=None):
+def calculate_team_simulation_count(cursor, spec):
     """
     Calculate total number of simulations for the team
     """
-    logger.info(f"Calculating team simulation count with filters - product_id: {product_id}, team_id: {team_id}, mode: {mode}, assessment_status: {assessment_status}")
-    
-    # Base query
-    query = """
-        SELECT COUNT(*) as total_simulations
-        FROM call_sim_scoring
-        WHERE 1=1
-    """
-    
-    # Build parameters list
-    params = []
-    
-    # Add filters only if they are provided and not 'all'
-    if team_id and team_id != 'all':
-        query += " AND team_id::text = %s"
-        params.append(team_id)
+    logger.debug("Calculating team simulation count with filters - %s", spec)
     
-    if product_id and product_id != 'all':
-        query += " AND product_id = %s"
-        params.append(product_id)
-    
-    if mode and mode != 'all':
-        query += " AND mode = %s"
-        params.append(mode)
-        
-    if assessment_status and assessment_status != 'all':
-        query += " AND assessment_status = %s"
-        params.append(assessment_status)
+    if TEAM_OVERVIEW_ROLLUP:
+        query = ROLLUP_SIMULATION_COUNT_QUERY
+    else:
+        # Base query
+        query = """
+            SELECT COUNT(*) as total_simulations
+            FROM call_sim_scoring
+            WHERE {filters}
+        """
 
-    logger.info(f"Executing query: {query}")
-    logger.info(f"Query parameters: {params}")
+    query = spec.compile(query)
+    params = spec.params
+
+    logger.debug("Executing query: %s", query)
+    logger.debug("Query parameters: %s", params)
 
     cursor.execute(query, params)
     result = cursor.fetchone()
-    logger.info(f"Query result: {result}")
+    logger.debug("Query result: %s", result)
 
     if not result or result[0] == 0:  # Check if no data or zero count
         logger.info("No data found for the specified filters")
@@ -699,7 +727,208 @@ def calculate_team_simulation_count(cursor, product_id=None, team_id=None, mode=
             "total": result[0] if result and result[0] is not None else 0
         }
     }
-    logger.info(f"Response data: {response_data}")
+    logger.debug("Response data: %s", response_data)
+    return response_data
+
+# (response name, score column) in the order teamComparisonData lists them
+COMPARISON_SCORES = [
+    ('Introduction', 'intro_score'),
+    ('Rapport', 'rapport_score'),
+    ('Creating Interest', 'interest_score'),
+    ('Probing', 'probing_score'),
+    ('Product Knowledge', 'product_score'),
+    ('Strategy', 'strategy_score'),
+    ('Closing', 'closing_score'),
+    ('DISC', 'disc_score'),
+    ('Traits', 'traits_score'),
+    ('Adoption Continuum', 'adoption_score'),
+]
+
+def calculate_team_overview(cursor, spec, bucket='month', start=None, end=None):
+    """
+    Calculate all eight team overview sections. Every section but the trend
+    comes from a single scan of call_sim_scoring; the product filter is applied
+    through aggregate FILTER clauses rather than the WHERE clause because
+    availableProducts has to ignore it. The trend is calculate_team_trend with
+    the same bucket and date range as team-overview/trend.
+    """
+    logger.debug("Calculating team overview with filters - %s, bucket: %s, start: %s, end: %s", spec, bucket, start, end)
+
+    params = []
+    product_id = spec.get('product_id')
+    if product_id is not None:
+        in_product = "product_id = %s"
+        params.append(product_id)
+    else:
+        in_product = "TRUE"
+
+    scope = spec.without('product_id')
+    params.extend(scope.params)
+
+    comparison_columns = ",\n            ".join(
+        f"AVG({column}) FILTER (WHERE in_product) as {column}"
+        for _, column in COMPARISON_SCORES
+    )
+
+    query = f"""
+        WITH scoped AS (
+            SELECT
+                product_id,
+                situation,
+                adoption_continuum,
+                {in_product} as in_product,
+                accuracy IS NOT NULL as has_accuracy,
+                fluency IS NOT NULL as has_fluency,
+                overall_score,
+                total_accuracy_score as total_accuracy,
+                fluency_wpm as wpm,
+                fluency_total,
+                fluency_pauses as pauses,
+                fluency_filler_words as filler_words,
+                introduction_score as intro_score,
+                rapport_score,
+                creating_interest_score as interest_score,
+                probing_score,
+                product_knowledge_score as product_score,
+                strategy_score,
+                closing_score,
+                disc_score,
+                traits_score,
+                adoption_continuum_score as adoption_score
+            FROM call_sim_scoring
+            WHERE {{filters}}
+        ),
+        team_scores AS (
+            SELECT
+                *,
+                (intro_score + rapport_score + interest_score + probing_score + product_score +
+                 strategy_score + closing_score + disc_score + traits_score + adoption_score) / 10 as composite
+            FROM scoped
+        )
+        SELECT
+            CASE
+                WHEN GROUPING(product_id) = 0 THEN 'product'
+                WHEN GROUPING(situation) = 0 THEN 'situation'
+                WHEN GROUPING(adoption_continuum) = 0 THEN 'adoption'
+                ELSE 'overall'
+            END as section,
+            product_id,
+            situation,
+            INITCAP(adoption_continuum) as adoption_name,
+            COUNT(*) FILTER (WHERE in_product) as total_simulations,
+            AVG(overall_score) FILTER (WHERE in_product) as overall_avg,
+            AVG(total_accuracy) FILTER (WHERE in_product) as total_accuracy,
+            COUNT(*) FILTER (WHERE in_product AND has_fluency) as fluency_count,
+            AVG(wpm) FILTER (WHERE in_product AND has_fluency) as wpm,
+            AVG(fluency_total) FILTER (WHERE in_product AND has_fluency) as fluency_total,
+            AVG(pauses) FILTER (WHERE in_product AND has_fluency) as pauses,
+            AVG(filler_words) FILTER (WHERE in_product AND has_fluency) as filler_words,
+            COUNT(*) FILTER (WHERE in_product AND has_accuracy) as scored_count,
+            {comparison_columns},
+            AVG(composite) FILTER (WHERE in_product AND has_accuracy) as composite
+        FROM team_scores
+        GROUP BY GROUPING SETS ((), (product_id), (situation), (adoption_continuum))
+        ORDER BY
+            situation,
+            CASE adoption_continuum
+                WHEN 'naive' THEN 1
+                WHEN 'aware' THEN 2
+                WHEN 'trialing' THEN 3
+                WHEN 'adopter' THEN 4
+                WHEN 'advocate' THEN 5
+                ELSE 6
+            END,
+            adoption_continuum
+    """
+    query = scope.compile(query)
+
+    logger.debug("Executing query: %s", query)
+    logger.debug("Query parameters: %s", params)
+
+    cursor.execute(query, params)
+    columns = [desc[0] for desc in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    logger.debug("Query returned %s rows", len(rows))
+
+    overall = next(row for row in rows if row['section'] == 'overall')
+    available_products = [
+        row['product_id'] for row in rows
+        if row['section'] == 'product' and row['product_id'] is not None
+    ]
+
+    def grouped(section, key):
+        # Grouping sets keep groups the per-section queries filter out
+        # (NULL keys, groups without scored rows), so drop those here
+        return [
+            {
+                "name": row[key],
+                "team": float(round(row['composite'] or 0, 1))
+            }
+            for row in rows
+            if row['section'] == section and row[key] is not None and row['scored_count'] > 0
+        ]
+
+    simulations = overall['total_simulations']
+    if simulations:
+        team_averages = {
+            "overall": round(overall['overall_avg'] or 0, 1),
+            "simulations": simulations,
+            "availableProducts": available_products,
+            "totalAccuracy": round(overall['total_accuracy'] or 0, 1)
+        }
+        accuracy_data = {
+            "totalAccuracy": round(overall['total_accuracy'] if overall['total_accuracy'] is not None else 0, 1)
+        }
+        simulation_count = {
+            "total": simulations
+        }
+    else:
+        team_averages = {
+            "overall": None,
+            "simulations": None,
+            "availableProducts": available_products,
+            "totalAccuracy": None
+        }
+        accuracy_data = {
+            "totalAccuracy": None
+        }
+        simulation_count = {
+            "total": None
+        }
+
+    if overall['fluency_count']:
+        fluency_data = {
+            key: round(overall[column] if overall[column] is not None else 0, 1)
+            for key, column in (('wpm', 'wpm'), ('total', 'fluency_total'), ('pauses', 'pauses'), ('fillerWords', 'filler_words'))
+        }
+    else:
+        fluency_data = {
+            "wpm": None,
+            "total": None,
+            "pauses": None,
+            "fillerWords": None
+        }
+
+    comparison_data = [
+        {
+            "name": name,
+            "team": float(round(overall[column], 1))
+        }
+        for name, column in COMPARISON_SCORES
+        if overall[column] is not None
+    ]
+
+    response_data = {
+        "teamAverages": team_averages,
+        "accuracyData": accuracy_data,
+        "fluencyData": fluency_data,
+        "simulationCount": simulation_count,
+        "teamComparisonData": comparison_data or None,
+        "situationData": grouped('situation', 'situation'),
+        "teamTrendData": calculate_team_trend(cursor, spec, bucket, start, end)["teamTrendData"],
+        "adoptionData": grouped('adoption', 'adoption_name')
+    }
+    logger.debug("Response data: %s", response_data)
     return response_data
 
 def handle_team_overview_request(event, context):
@@ -710,259 +939,94 @@ def handle_team_overview_request(event, context):
     # Remove leading slash if present
     path = path.lstrip('/')
     
-    logger.info(f"Handling request for path: {path}")
-    logger.info(f"Query parameters: {query_params}")
+    logger.info("Handling request for path: %s", path)
+    logger.debug("Query parameters: %s", query_params)
+
+    try:
+        spec = QuerySpec.from_query_params(query_params, 'team_id', 'product_id', 'mode', 'assessment_status')
+    except InvalidFilter as e:
+        logger.info(str(e))
+        return error_response(400, "Invalid team ID format")
     
     try:
         # Connect to database
-        connection = get_db_connection()
-        if not connection:
-            logger.error("Failed to connect to database")
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
-                    "error": "Failed to connect to database"
-                })
-            }
+        with db_connection() as connection:
+            if not connection:
+                logger.error("Failed to connect to database")
+                return error_response(500, "Failed to connect to database")
 
-        cursor = connection.cursor()
-        
-        # Get filters from query parameters
-        product_id = query_params.get('product')
-        team_id = query_params.get('team')
-        mode = query_params.get('mode')
-        assessment_status = query_params.get('assessmentStatus')
+            cursor = connection.cursor()
         
-        logger.info(f"Processing request with filters - product_id: {product_id}, team_id: {team_id}, mode: {mode}, assessment_status: {assessment_status}")
-
-        # Handle different endpoints
-        if path == 'team-overview/averages':
-            averages_data = calculate_team_averages(cursor, product_id, team_id, mode, assessment_status)
-            if not averages_data:
-                logger.info("No averages data found")
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps(averages_data)
-            }
-        elif path == 'team-overview/accuracy':
-            accuracy_data = calculate_team_accuracy(cursor, product_id, team_id, mode, assessment_status)
-            if not accuracy_data:
-                logger.info("No accuracy data found")
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps(accuracy_data)
-            }
-        elif path == 'team-overview/fluency':
-            fluency_data = calculate_team_fluency(cursor, product_id, team_id, mode, assessment_status)
-            if not fluency_data:
-                logger.info("No fluency data found")
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps(fluency_data)
-            }
-        elif path == 'team-overview/simulation-count':
-            count_data = calculate_team_simulation_count(cursor, product_id, team_id, mode, assessment_status)
-            if not count_data:
-                logger.info("No simulation count data found")
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps(count_data)
-            }
-        elif path == 'team-overview/comparison':
-            comparison_data = calculate_team_comparison(cursor, product_id, team_id, mode, assessment_status)
-            if not comparison_data:
-                logger.info("No comparison data found")
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps(comparison_data)
-            }
-        elif path == 'team-overview/situation':
-            situation_data = calculate_team_situation(cursor, product_id, team_id, mode, assessment_status)
-            if not situation_data:
-                logger.info("No situation data found")
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps(situation_data)
-            }
-        elif path == 'team-overview/trend':
-            trend_data = calculate_team_trend(cursor, product_id, team_id, mode, assessment_status)
-            if not trend_data:
-                logger.info("No trend data found")
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps(trend_data)
-            }
-        elif path == 'team-overview/adoption':
-            adoption_data = calculate_team_adoption(cursor, product_id, team_id, mode, assessment_status)
-            if not adoption_data:
-                logger.info("No adoption data found")
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "*",
-                        "Access-Control-Allow-Methods": "*"
-                    },
-                    "body": json.dumps({
-                        "error": "No data found for the specified filters"
-                    })
-                }
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps(adoption_data)
-            }
-        else:
-            # Return error message for unknown paths
-            logger.info(f"Unknown path requested: {path}")
-            return {
-                "statusCode": 404,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Allow-Methods": "*"
-                },
-                "body": json.dumps({
+            logger.debug("Processing request with filters - %s", spec)
+
+            # Handle different endpoints
+            if path == 'team-overview/averages':
+                averages_data = calculate_team_averages(cursor, spec)
+                if not averages_data:
+                    logger.info("No averages data found")
+                    return error_response(404, "No data found for the specified filters")
+                return json_response(200, averages_data)
+            elif path == 'team-overview/accuracy':
+                accuracy_data = calculate_team_accuracy(cursor, spec)
+                if not accuracy_data:
+                    logger.info("No accuracy data found")
+                    return error_response(404, "No data found for the specified filters")
+                return json_response(200, accuracy_data)
+            elif path == 'team-overview/fluency':
+                fluency_data = calculate_team_fluency(cursor, spec)
+                if not fluency_data:
+                    logger.info("No fluency data found")
+                    return error_response(404, "No data found for the specified filters")
+                return json_response(200, fluency_data)
+            elif path == 'team-overview/simulation-count':
+                count_data = calculate_team_simulation_count(cursor, spec)
+                if not count_data:
+                    logger.info("No simulation count data found")
+                    return error_response(404, "No data found for the specified filters")
+                return json_response(200, count_data)
+            elif path == 'team-overview/comparison':
+                comparison_data = calculate_team_comparison(cursor, spec)
+                if not comparison_data:
+                    logger.info("No comparison data found")
+                    return error_response(404, "No data found for the specified filters")
+                return json_response(200, comparison_data)
+            elif path == 'team-overview/situation':
+                situation_data = calculate_team_situation(cursor, spec)
+                if not situation_data:
+                    logger.info("No situation data found")
+                    return error_response(404, "No data found for the specified filters")
+                return json_response(200, situation_data)
+            elif path == 'team-overview/trend':
+                try:
+                    bucket, start, end = parse_trend_params(query_params)
+                except ValueError as e:
+                    return error_response(400, str(e))
+                trend_data = calculate_team_trend(cursor, spec, bucket, start, end)
+                if not trend_data:
+                    logger.info("No trend data found")
+                    return error_response(404, "No data found for the specified filters")
+                return json_response(200, trend_data)
+            elif path == 'team-overview/adoption':
+                adoption_data = calculate_team_adoption(cursor, spec)
+                if not adoption_data:
+                    logger.info("No adoption data found")
+                    return error_response(404, "No data found for the specified filters")
+                return json_response(200, adoption_data)
+            elif path == 'team-overview/all':
+                try:
+                    bucket, start, end = parse_trend_params(query_params)
+                except ValueError as e:
+                    return error_response(400, str(e))
+                overview_data = calculate_team_overview(cursor, spec, bucket, start, end)
+                return json_response(200, overview_data)
+            else:
+                # Return error message for unknown paths
+                logger.info("Unknown path requested: %s", path)
+                return json_response(404, {
                     "message": "Route not found",
                     "path": path
                 })
-            }
             
     except Exception as e:
-        logger.error(f"Error occurred: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({
-                "error": "Database error occurred"
-            })
-        }
-    finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close()
+        logger.error("Error occurred: %s", e)
+        return error_response(500, "Database error occurred")
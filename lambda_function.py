@@ -1,36 +1,183 @@
-import json
-
-from handlers.benchmarks_handler import handle_benchmarks_request
-from handlers.presigned_url_handler import handle_presigned_url_request
-from handlers.recommendations_handler import handle_recommendations_request
-from handlers.simulation_overview_handler import handle_simulation_overview
-from handlers.simulation_runs_handler import handle_simulation_run
-from handlers.simulation_insights_handler import handle_simulation_insights
-from handlers.team_members_handler import handle_team_members_request
-from handlers.team_overview_handler import handle_team_overview_request
-from handlers.sample_data_handler import handle_sample_data_request
-from handlers.assessment_status_handler import handle_assessment_status
-from handlers.delete_assessment_handler import handle_delete_assessment
-from utils.logger import logger
+import importlib
+import logging
+import sys
+import time
 
+from utils.compression import compress_response, compress_stream
+from utils.logger import begin_request, lazy_json, logger
+from utils.metrics import METRICS
+from utils.responses import json_response
+
+# Handlers are referenced as "module:function" and imported on first use, so a
+# cold start only loads the modules its requests actually need (the presigned
+# URL handler, for one, builds a boto3 client at import time).
 ROUTE_HANDLERS = {
-    'GET:simulation-insights': handle_simulation_insights,
-    'GET:simulation-run': handle_simulation_run,
-    'GET:simulation-overview': handle_simulation_overview,
-    'GET:team-members': handle_team_members_request,
-    'GET:industry-benchmarks': handle_benchmarks_request,
-    'GET:team-overview': handle_team_overview_request,
-    'GET:insights-recommendations': handle_recommendations_request,
-    'GET:presignedPutUrl': handle_presigned_url_request,
-    'GET:call-sim-sample-data': handle_sample_data_request,
+    'GET:simulation-insights': 'handlers.simulation_insights_handler:handle_simulation_insights',
+    'GET:simulation-run': 'handlers.simulation_runs_handler:handle_simulation_run',
+    'GET:simulation-overview': 'handlers.simulation_overview_handler:handle_simulation_overview',
+    'GET:simulation-overview/adoption': 'handlers.simulation_overview_handler:handle_simulation_overview',
+    'GET:simulation-overview/specialties': 'handlers.simulation_overview_handler:handle_simulation_overview',
+    'GET:simulation-overview/accuracy-metrics': 'handlers.simulation_overview_handler:handle_simulation_overview',
+    'GET:simulation-overview/traits': 'handlers.simulation_overview_handler:handle_simulation_overview',
+    'GET:simulation-overview/disc': 'handlers.simulation_overview_handler:handle_simulation_overview',
+    'GET:simulation-overview/fluency': 'handlers.simulation_overview_handler:handle_simulation_overview',
+    'GET:simulation-overview/all': 'handlers.simulation_overview_handler:handle_simulation_overview',
+    'GET:team-members': 'handlers.team_members_handler:handle_team_members_request',
+    'GET:industry-benchmarks': 'handlers.benchmarks_handler:handle_benchmarks_request',
+    'GET:industry-benchmarks/detail': 'handlers.benchmarks_handler:handle_benchmarks_request',
+    'GET:industry-benchmarks/adoption': 'handlers.benchmarks_handler:handle_benchmarks_request',
+    'GET:industry-benchmarks/situation': 'handlers.benchmarks_handler:handle_benchmarks_request',
+    'GET:team-overview': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:team-overview/averages': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:team-overview/accuracy': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:team-overview/fluency': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:team-overview/simulation-count': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:team-overview/comparison': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:team-overview/situation': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:team-overview/trend': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:team-overview/adoption': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:team-overview/all': 'handlers.team_overview_handler:handle_team_overview_request',
+    'GET:insights-recommendations': 'handlers.recommendations_handler:handle_recommendations_request',
+    'GET:presignedPutUrl': 'handlers.presigned_url_handler:handle_presigned_url_request',
+    'GET:call-sim-sample-data': 'handlers.sample_data_handler:handle_sample_data_request',
 }
 
+ASSESSMENT_STATUS_HANDLER = 'handlers.assessment_status_handler:handle_assessment_status'
+DELETE_ASSESSMENT_HANDLER = 'handlers.delete_assessment_handler:handle_delete_assessment'
+ROLLUP_REFRESH_HANDLER = 'handlers.team_overview_rollup:handle_rollup_refresh'
+
+# GET responses carry an ETag derived from the data version and are answered
+# with 304 Not Modified when the client's copy is current; see
+# handlers/conditional.py. Handlers whose responses do not follow
+# call_sim_scoring are exempt: a presigned URL is fresh on every request, the
+# sample data route returns a random record, and team members and
+# recommendations never read the table, so a version read would be wasted.
+CONDITIONAL_GET = 'handlers.conditional:conditional_get'
+UNCONDITIONAL_HANDLERS = {
+    'handlers.presigned_url_handler:handle_presigned_url_request',
+    'handlers.sample_data_handler:handle_sample_data_request',
+    'handlers.team_members_handler:handle_team_members_request',
+    'handlers.recommendations_handler:handle_recommendations_request',
+}
+
+_loaded_handlers = {}
+
+def load_handler(target):
+    """
+    Imports and returns the handler function named by a "module:function" target
+    """
+    handler = _loaded_handlers.get(target)
+    if handler is None:
+        module_name, function_name = target.split(':')
+        handler = getattr(importlib.import_module(module_name), function_name)
+        _loaded_handlers[target] = handler
+    return handler
+
+def dispatch(target, event, context):
+    """
+    Runs the handler named by target, through conditional_get for GET requests
+    """
+    handler = load_handler(target)
+    if event.get('httpMethod', 'GET') != 'GET' or target in UNCONDITIONAL_HANDLERS:
+        return handler(event, context)
+    return load_handler(CONDITIONAL_GET)(event, lambda conditional_event: handler(conditional_event, context))
+
+def match_route(http_method, path):
+    """
+    Returns the ROUTE_HANDLERS key for a request. Exact routes win; otherwise
+    the longest registered route that is a whole-segment prefix of the path
+    (e.g. simulation-run for simulation-run/42). Returns None if nothing matches.
+    """
+    route = f'{http_method}:{path}'
+    while route not in ROUTE_HANDLERS:
+        separator = route.rfind('/')
+        if separator == -1:
+            return None
+        route = route[:separator]
+    return route
+
 def lambda_handler(event, context):
+    """
+    Buffered entry point for API Gateway proxy integrations. Streamed
+    (NDJSON) bodies are joined into a single string, and bodies are
+    compressed when the client accepts it (utils/compression.py).
+    """
+    METRICS.reset()
+    response = measured_request(event, context)
+    body = response.get('body')
+    if body is not None and not isinstance(body, str):
+        response = {**response, 'body': ''.join(body)}
+    METRICS.put('ResponseBytes', len((response.get('body') or '').encode('utf-8')))
+    response = compress_response(event, response)
+    METRICS.put('BytesSent', len(response.get('body') or ''))
+    METRICS.flush(response['statusCode'], context)
+    return response
+
+def streaming_lambda_handler(event, response_stream, context):
+    """
+    Entry point for runtimes with Lambda response streaming: writes the
+    status, headers and body chunks to response_stream as they are produced
+    """
+    from handlers.streaming import write_response
+    METRICS.reset()
+    response = compress_stream(event, measured_request(event, context))
+    bytes_sent = 0
+
+    def write(data):
+        nonlocal bytes_sent
+        bytes_sent += len(data)
+        response_stream.write(data)
+
+    write_response(response, write)
+    METRICS.put('BytesSent', bytes_sent)
+    METRICS.flush(response['statusCode'], context)
+
+def measured_request(event, context):
+    """
+    Routes a request, recording its duration and database time in METRICS
+    (utils/metrics.py). If it ran any queries, a Server-Timing summary of
+    them is added to the response and, on requests sampled for DEBUG logging
+    (utils/logger.py), the per-statement detail is logged (see
+    handlers/db_connection.py); requests that never imported db_connection
+    ran none. A streamed body's queries run as it is read, after this
+    returns, and are not included.
+    """
+    begin_request(event.get('path'), getattr(context, 'aws_request_id', None))
+    db_connection = sys.modules.get('handlers.db_connection')
+    if db_connection is not None:
+        db_connection.QUERY_STATS.reset()
+
+    started = time.perf_counter()
+    response = route_request(event, context)
+    METRICS.put('Duration', (time.perf_counter() - started) * 1000)
+
+    db_connection = sys.modules.get('handlers.db_connection')
+    if db_connection is None or not db_connection.QUERY_STATS.statements:
+        return response
+    stats = db_connection.QUERY_STATS
+    METRICS.put('DbDuration', stats.total_seconds() * 1000)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Query stats", extra={"fields": stats.summary()})
+    return {
+        **response,
+        "headers": {
+            **response.get('headers', {}),
+            "Server-Timing": stats.server_timing(),
+            "Timing-Allow-Origin": "*"
+        }
+    }
+
+def route_request(event, context):
+    # Scheduled EventBridge rule that rebuilds the team overview rollup
+    if event.get('source') == 'aws.events':
+        METRICS.route = 'aws.events:rollup-refresh'
+        return load_handler(ROLLUP_REFRESH_HANDLER)(event, context)
+
     path = event.get('path', '')
     http_method = event.get('httpMethod', 'GET')
 
-    logger.info(f"Received request for path: {path}, method: {http_method}")
-    logger.info(f"Full event: {json.dumps(event)}")
+    logger.info("Received request for path: %s, method: %s", path, http_method)
+    logger.debug("Full event: %s", lazy_json(event))
 
     path = path.lstrip('/')
     if path.startswith('callsim/'):
@@ -38,31 +185,24 @@ def lambda_handler(event, context):
         # Path format for handle_assessment_status: "callsim/<assessment-id>/status"
         path_parts = path.split('/')
         if len(path_parts) == 2 and path_parts[1] == 'status':
-            return handle_assessment_status(event, context)
+            METRICS.route = f'{http_method}:callsim/status'
+            return dispatch(ASSESSMENT_STATUS_HANDLER, event, context)
         # Path format for delete: "callsim/id/<id>"
         elif http_method == 'DELETE' and len(path_parts) == 2 and path_parts[0] == 'id':
-            return handle_delete_assessment(event, context)
+            METRICS.route = 'DELETE:callsim/id'
+            return load_handler(DELETE_ASSESSMENT_HANDLER)(event, context)
 
     modified_event = event.copy()
     modified_event['path'] = path
 
-    for route_prefix, handler in ROUTE_HANDLERS.items():
-        methodAndPath = f'{http_method}:{path}'
-        logger.info(f"[lambda_handler] +++++++ path: {path} http_method: {http_method} route_prefix: {route_prefix} methodAndPath: {methodAndPath}")
-        if methodAndPath.startswith(route_prefix):
-            return handler(modified_event, context)
+    route = match_route(http_method, path)
+    if route is not None:
+        METRICS.route = route
+        return dispatch(ROUTE_HANDLERS[route], modified_event, context)
 
-    logger.info(f"No route found for path: {path}, method: {http_method}")
-    return {
-        "statusCode": 404,
-        "headers": {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Allow-Methods": "*"
-        },
-        "body": json.dumps({
-            "message": "Route not found",
-            "path": path,
-            "method": http_method
-        })
-    } 
+    logger.info("No route found for path: %s, method: %s", path, http_method)
+    return json_response(404, {
+        "message": "Route not found",
+        "path": path,
+        "method": http_method
+    })
@@ -0,0 +1,22 @@
+"""
+Composite indexes backing keyset pagination of simulation-run listings,
+which order by (created_at, id) descending and are usually scoped to a user.
+"""
+
+TRANSACTIONAL = False
+
+UP = [
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_call_sim_scoring_user_created_id
+    ON call_sim_scoring (user_id, created_at DESC, id DESC)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_call_sim_scoring_created_id
+    ON call_sim_scoring (created_at DESC, id DESC)
+    """,
+]
+
+DOWN = [
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_call_sim_scoring_user_created_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_call_sim_scoring_created_id",
+]
@@ -0,0 +1,146 @@
+"""
+Per-team sufficient statistics for the industry benchmarks.
+
+team_benchmark_stats holds one row per team x product x adoption_continuum x
+situation x has_accuracy with the sums and non-null counts of each skill score,
+so "everyone except this team" is aggregated from a few hundred rows instead of
+the whole call_sim_scoring table. team_id has the INTEGER type of
+call_sim_scoring.team_id, as in the team overview aggregates. Triggers keep it
+in step with every insert, update and delete; rebuild_team_benchmark_stats()
+recomputes it from scratch (e.g. to clear floating point drift).
+"""
+
+SKILL_SCORES = [
+    ('intro', 'introduction'),
+    ('rapport', 'rapport'),
+    ('interest', 'creatingInterest'),
+    ('probing', 'probing'),
+    ('product', 'productKnowledge'),
+]
+
+_score_columns = "".join(
+    f"""
+        {name}_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        {name}_count BIGINT NOT NULL DEFAULT 0,"""
+    for name, _ in SKILL_SCORES
+)
+
+_score_variables = "".join(
+    f"""
+    {name} FLOAT := CAST(r.accuracy->'scores'->'{key}'->>'score' AS FLOAT);"""
+    for name, key in SKILL_SCORES
+)
+
+_score_names = [name for name, _ in SKILL_SCORES]
+
+UP = [
+    f"""
+    CREATE TABLE team_benchmark_stats (
+        group_key TEXT PRIMARY KEY,
+        team_id INTEGER NOT NULL,
+        product_id TEXT,
+        adoption_continuum TEXT,
+        situation TEXT,
+        has_accuracy BOOLEAN NOT NULL,
+        row_count BIGINT NOT NULL DEFAULT 0,{_score_columns}
+        composite_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        composite_count BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX idx_team_benchmark_stats_team ON team_benchmark_stats (team_id)",
+    f"""
+    CREATE FUNCTION apply_team_benchmark_stats(r call_sim_scoring, sign INTEGER) RETURNS void AS $$
+    DECLARE{_score_variables}
+    composite FLOAT := ({" + ".join(_score_names)}) / 5;
+    key TEXT := md5(ROW(r.team_id::text, r.product_id, r.adoption_continuum, r.situation, r.accuracy IS NOT NULL)::text);
+    BEGIN
+        IF r.team_id IS NULL THEN
+            RETURN;
+        END IF;
+
+        INSERT INTO team_benchmark_stats AS s (
+            group_key, team_id, product_id, adoption_continuum, situation, has_accuracy, row_count,
+            {", ".join(f"{name}_sum, {name}_count" for name in _score_names)},
+            composite_sum, composite_count
+        ) VALUES (
+            key, r.team_id, r.product_id, r.adoption_continuum, r.situation, r.accuracy IS NOT NULL, sign,
+            {", ".join(f"sign * COALESCE({name}, 0), sign * ({name} IS NOT NULL)::int" for name in _score_names)},
+            sign * COALESCE(composite, 0), sign * (composite IS NOT NULL)::int
+        )
+        ON CONFLICT (group_key) DO UPDATE SET
+            row_count = s.row_count + EXCLUDED.row_count,
+            {", ".join(f"{name}_sum = s.{name}_sum + EXCLUDED.{name}_sum, {name}_count = s.{name}_count + EXCLUDED.{name}_count" for name in _score_names)},
+            composite_sum = s.composite_sum + EXCLUDED.composite_sum,
+            composite_count = s.composite_count + EXCLUDED.composite_count;
+
+        -- Empty groups would otherwise count as teams with zero simulations
+        DELETE FROM team_benchmark_stats WHERE group_key = key AND row_count = 0;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION team_benchmark_stats_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM apply_team_benchmark_stats(OLD, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM apply_team_benchmark_stats(NEW, 1);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE FUNCTION rebuild_team_benchmark_stats() RETURNS void AS $$
+    BEGIN
+        LOCK TABLE call_sim_scoring IN SHARE MODE;
+        DELETE FROM team_benchmark_stats;
+        INSERT INTO team_benchmark_stats
+        SELECT
+            md5(ROW(team_id::text, product_id, adoption_continuum, situation, has_accuracy)::text),
+            team_id, product_id, adoption_continuum, situation, has_accuracy,
+            COUNT(*),
+            {", ".join(f"COALESCE(SUM({name}), 0), COUNT({name})" for name in _score_names)},
+            COALESCE(SUM(composite), 0), COUNT(composite)
+        FROM (
+            SELECT
+                *,
+                ({" + ".join(_score_names)}) / 5 as composite
+            FROM (
+                SELECT
+                    team_id, product_id, adoption_continuum, situation,
+                    accuracy IS NOT NULL as has_accuracy,
+                    {", ".join(f"CAST(accuracy->'scores'->'{key}'->>'score' AS FLOAT) as {name}" for name, key in SKILL_SCORES)}
+                FROM call_sim_scoring
+                WHERE team_id IS NOT NULL
+            ) scores
+        ) scored
+        GROUP BY team_id, product_id, adoption_continuum, situation, has_accuracy;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER team_benchmark_stats_insert_delete
+    AFTER INSERT OR DELETE ON call_sim_scoring
+    FOR EACH ROW EXECUTE FUNCTION team_benchmark_stats_trigger()
+    """,
+    """
+    CREATE TRIGGER team_benchmark_stats_update
+    AFTER UPDATE OF team_id, product_id, adoption_continuum, situation, accuracy ON call_sim_scoring
+    FOR EACH ROW
+    WHEN ((OLD.team_id, OLD.product_id, OLD.adoption_continuum, OLD.situation, OLD.accuracy)
+          IS DISTINCT FROM (NEW.team_id, NEW.product_id, NEW.adoption_continuum, NEW.situation, NEW.accuracy))
+    EXECUTE FUNCTION team_benchmark_stats_trigger()
+    """,
+    "SELECT rebuild_team_benchmark_stats()",
+]
+
+DOWN = [
+    "DROP TRIGGER IF EXISTS team_benchmark_stats_update ON call_sim_scoring",
+    "DROP TRIGGER IF EXISTS team_benchmark_stats_insert_delete ON call_sim_scoring",
+    "DROP FUNCTION IF EXISTS rebuild_team_benchmark_stats()",
+    "DROP FUNCTION IF EXISTS team_benchmark_stats_trigger()",
+    "DROP FUNCTION IF EXISTS apply_team_benchmark_stats(call_sim_scoring, INTEGER)",
+    "DROP TABLE IF EXISTS team_benchmark_stats",
+]
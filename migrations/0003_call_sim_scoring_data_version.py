@@ -0,0 +1,38 @@
+"""
+Data version for call_sim_scoring.
+
+Every committed insert, update or delete (and any truncate) advances
+call_sim_scoring_version_seq, so caches can tell whether the reporting data
+changed by reading a single sequence value. The row trigger is deferred to
+commit time so the version only moves once the change is about to be visible.
+"""
+
+UP = [
+    "CREATE SEQUENCE call_sim_scoring_version_seq",
+    """
+    CREATE FUNCTION bump_call_sim_scoring_version() RETURNS trigger AS $$
+    BEGIN
+        PERFORM nextval('call_sim_scoring_version_seq');
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE CONSTRAINT TRIGGER call_sim_scoring_version
+    AFTER INSERT OR UPDATE OR DELETE ON call_sim_scoring
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_call_sim_scoring_version()
+    """,
+    """
+    CREATE TRIGGER call_sim_scoring_version_truncate
+    AFTER TRUNCATE ON call_sim_scoring
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_call_sim_scoring_version()
+    """,
+]
+
+DOWN = [
+    "DROP TRIGGER IF EXISTS call_sim_scoring_version_truncate ON call_sim_scoring",
+    "DROP TRIGGER IF EXISTS call_sim_scoring_version ON call_sim_scoring",
+    "DROP FUNCTION IF EXISTS bump_call_sim_scoring_version()",
+    "DROP SEQUENCE IF EXISTS call_sim_scoring_version_seq",
+]
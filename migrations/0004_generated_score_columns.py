@@ -0,0 +1,53 @@
+"""
+Stored generated columns for the JSONB score paths the aggregate queries read,
+so they average narrow float columns instead of detoasting and parsing
+accuracy/fluency on every row.
+
+Adding stored generated columns rewrites call_sim_scoring under an ACCESS
+EXCLUSIVE lock; run it in a maintenance window on large tables.
+"""
+
+# (column, JSONB path) for every generated score column
+SCORE_COLUMNS = [
+    ('introduction_score', "accuracy->'scores'->'introduction'->'score'"),
+    ('rapport_score', "accuracy->'scores'->'rapport'->'score'"),
+    ('creating_interest_score', "accuracy->'scores'->'creatingInterest'->'score'"),
+    ('probing_score', "accuracy->'scores'->'probing'->'score'"),
+    ('product_knowledge_score', "accuracy->'scores'->'productKnowledge'->'score'"),
+    ('strategy_score', "accuracy->'scores'->'strategy'->'score'"),
+    ('closing_score', "accuracy->'scores'->'closing'->'score'"),
+    ('disc_score', "accuracy->'scores'->'disc'->'score'"),
+    ('traits_score', "accuracy->'scores'->'traits'->'score'"),
+    ('adoption_continuum_score', "accuracy->'scores'->'adoptionContinuum'->'score'"),
+    ('total_accuracy_score', "accuracy->'scores'->'total'->'score'"),
+    ('fluency_wpm', "fluency->'scores'->'wpm'"),
+    ('fluency_total', "fluency->'scores'->'total'"),
+    ('fluency_pauses', "fluency->'scores'->'pauses'"),
+    ('fluency_filler_words', "fluency->'scores'->'fillerWords'"),
+]
+
+UP = [
+    # Same result as casting the value to FLOAT for numbers and numeric strings,
+    # but yields NULL instead of failing the write for anything else
+    r"""
+    CREATE FUNCTION jsonb_score(value JSONB) RETURNS DOUBLE PRECISION AS $$
+        SELECT CASE
+            WHEN jsonb_typeof(value) = 'number' THEN (value #>> '{}')::DOUBLE PRECISION
+            WHEN jsonb_typeof(value) = 'string'
+                AND value #>> '{}' ~ '^\s*[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*$'
+                THEN (value #>> '{}')::DOUBLE PRECISION
+        END
+    $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """,
+    "ALTER TABLE call_sim_scoring " + ", ".join(
+        f"ADD COLUMN {column} DOUBLE PRECISION GENERATED ALWAYS AS (jsonb_score({path})) STORED"
+        for column, path in SCORE_COLUMNS
+    ),
+]
+
+DOWN = [
+    "ALTER TABLE call_sim_scoring " + ", ".join(
+        f"DROP COLUMN IF EXISTS {column}" for column, _ in SCORE_COLUMNS
+    ),
+    "DROP FUNCTION IF EXISTS jsonb_score(JSONB)",
+]
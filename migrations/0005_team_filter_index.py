@@ -0,0 +1,17 @@
+"""
+Composite index matching the team-scoped report filters (see
+handlers/filters.py), so team dashboards become index range scans.
+"""
+
+TRANSACTIONAL = False
+
+UP = [
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_call_sim_scoring_team_filters
+    ON call_sim_scoring (team_id, product_id, mode, assessment_status, created_at)
+    """,
+]
+
+DOWN = [
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_call_sim_scoring_team_filters",
+]
@@ -0,0 +1,175 @@
+"""
+Monthly rollup of the team overview metrics.
+
+team_overview_rollup holds one row per team x product x mode x
+assessment_status x month with the sum, non-null count and sum of squares of
+every score the team overview reports, so a team dashboard aggregates a few
+rows per month instead of every simulation the team ever ran. Triggers keep it
+in step with every insert, update and delete; rebuild_team_overview_rollup()
+recomputes it from scratch (python -m handlers.team_overview_rollup, or the
+scheduled refresh in lambda_function.py).
+
+Months are truncated in the session time zone, like the live queries do
+(UTC on RDS).
+"""
+
+# (rollup measure, call_sim_scoring column)
+SCORES = [
+    ('overall_score', 'overall_score'),
+    ('total_accuracy', 'total_accuracy_score'),
+    ('intro_score', 'introduction_score'),
+    ('rapport_score', 'rapport_score'),
+    ('interest_score', 'creating_interest_score'),
+    ('probing_score', 'probing_score'),
+    ('product_score', 'product_knowledge_score'),
+    ('strategy_score', 'strategy_score'),
+    ('closing_score', 'closing_score'),
+    ('disc_score', 'disc_score'),
+    ('traits_score', 'traits_score'),
+    ('adoption_score', 'adoption_continuum_score'),
+    ('wpm', 'fluency_wpm'),
+    ('fluency_total', 'fluency_total'),
+    ('pauses', 'fluency_pauses'),
+    ('filler_words', 'fluency_filler_words'),
+]
+
+# The composite skill score the trend and comparison sections average
+COMPOSITE_COLUMNS = [
+    'introduction_score', 'rapport_score', 'creating_interest_score', 'probing_score',
+    'product_knowledge_score', 'strategy_score', 'closing_score', 'disc_score',
+    'traits_score', 'adoption_continuum_score',
+]
+
+DIMENSIONS = ['team_id', 'product_id', 'mode', 'assessment_status']
+
+
+def _measures(prefix):
+    composite = "(" + " + ".join(f"{prefix}{column}" for column in COMPOSITE_COLUMNS) + ") / 10"
+    return [(name, f"{prefix}{column}") for name, column in SCORES] + [('composite', composite)]
+
+
+_measure_names = [name for name, _ in _measures('')]
+
+_measure_columns = "".join(
+    f"""
+        {name}_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        {name}_count BIGINT NOT NULL DEFAULT 0,
+        {name}_sumsq DOUBLE PRECISION NOT NULL DEFAULT 0,"""
+    for name in _measure_names
+)
+
+_measure_variables = "".join(
+    f"""
+    {name} FLOAT := {expression};"""
+    for name, expression in _measures('r.')
+)
+
+_delta_columns = ", ".join(f"{name}_sum, {name}_count, {name}_sumsq" for name in _measure_names)
+
+_key = "md5(ROW({dimensions}, {month})::text)"
+
+UP = [
+    f"""
+    CREATE TABLE team_overview_rollup (
+        group_key TEXT PRIMARY KEY,
+        team_id INTEGER,
+        product_id TEXT,
+        mode TEXT,
+        assessment_status TEXT,
+        month TIMESTAMPTZ,
+        row_count BIGINT NOT NULL DEFAULT 0,
+        accuracy_count BIGINT NOT NULL DEFAULT 0,
+        fluency_count BIGINT NOT NULL DEFAULT 0,{_measure_columns.rstrip(',')}
+    )
+    """,
+    f"CREATE INDEX idx_team_overview_rollup_filters ON team_overview_rollup ({', '.join(DIMENSIONS)}, month)",
+    f"""
+    CREATE FUNCTION apply_team_overview_rollup(r call_sim_scoring, sign INTEGER) RETURNS void AS $$
+    DECLARE{_measure_variables}
+    month TIMESTAMPTZ := DATE_TRUNC('month', r.created_at);
+    key TEXT := {_key.format(dimensions=', '.join(f'r.{d}' for d in DIMENSIONS), month='month')};
+    BEGIN
+        INSERT INTO team_overview_rollup AS s (
+            group_key, {', '.join(DIMENSIONS)}, month,
+            row_count, accuracy_count, fluency_count,
+            {_delta_columns}
+        ) VALUES (
+            key, {', '.join(f'r.{d}' for d in DIMENSIONS)}, month,
+            sign, sign * (r.accuracy IS NOT NULL)::int, sign * (r.fluency IS NOT NULL)::int,
+            {", ".join(f"sign * COALESCE({name}, 0), sign * ({name} IS NOT NULL)::int, sign * COALESCE({name} * {name}, 0)" for name in _measure_names)}
+        )
+        ON CONFLICT (group_key) DO UPDATE SET
+            row_count = s.row_count + EXCLUDED.row_count,
+            accuracy_count = s.accuracy_count + EXCLUDED.accuracy_count,
+            fluency_count = s.fluency_count + EXCLUDED.fluency_count,
+            {", ".join(f"{name}_{part} = s.{name}_{part} + EXCLUDED.{name}_{part}" for name in _measure_names for part in ('sum', 'count', 'sumsq'))};
+
+        DELETE FROM team_overview_rollup WHERE group_key = key AND row_count = 0;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION team_overview_rollup_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM apply_team_overview_rollup(OLD, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM apply_team_overview_rollup(NEW, 1);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE FUNCTION rebuild_team_overview_rollup() RETURNS void AS $$
+    BEGIN
+        LOCK TABLE call_sim_scoring IN SHARE MODE;
+        DELETE FROM team_overview_rollup;
+        INSERT INTO team_overview_rollup (
+            group_key, {', '.join(DIMENSIONS)}, month,
+            row_count, accuracy_count, fluency_count,
+            {_delta_columns}
+        )
+        SELECT
+            {_key.format(dimensions=', '.join(DIMENSIONS), month='month')},
+            {', '.join(DIMENSIONS)}, month,
+            COUNT(*), COUNT(*) FILTER (WHERE has_accuracy), COUNT(*) FILTER (WHERE has_fluency),
+            {", ".join(f"COALESCE(SUM({name}), 0), COUNT({name}), COALESCE(SUM({name} * {name}), 0)" for name in _measure_names)}
+        FROM (
+            SELECT
+                {', '.join(DIMENSIONS)},
+                DATE_TRUNC('month', created_at) as month,
+                accuracy IS NOT NULL as has_accuracy,
+                fluency IS NOT NULL as has_fluency,
+                {", ".join(f"{expression} as {name}" for name, expression in _measures(''))}
+            FROM call_sim_scoring
+        ) scored
+        GROUP BY {', '.join(DIMENSIONS)}, month;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER team_overview_rollup_insert_delete
+    AFTER INSERT OR DELETE ON call_sim_scoring
+    FOR EACH ROW EXECUTE FUNCTION team_overview_rollup_trigger()
+    """,
+    f"""
+    CREATE TRIGGER team_overview_rollup_update
+    AFTER UPDATE OF {', '.join(DIMENSIONS)}, created_at, overall_score, accuracy, fluency ON call_sim_scoring
+    FOR EACH ROW
+    WHEN ((OLD.{', OLD.'.join(DIMENSIONS)}, OLD.created_at, OLD.overall_score, OLD.accuracy, OLD.fluency)
+          IS DISTINCT FROM (NEW.{', NEW.'.join(DIMENSIONS)}, NEW.created_at, NEW.overall_score, NEW.accuracy, NEW.fluency))
+    EXECUTE FUNCTION team_overview_rollup_trigger()
+    """,
+    "SELECT rebuild_team_overview_rollup()",
+]
+
+DOWN = [
+    "DROP TRIGGER IF EXISTS team_overview_rollup_update ON call_sim_scoring",
+    "DROP TRIGGER IF EXISTS team_overview_rollup_insert_delete ON call_sim_scoring",
+    "DROP FUNCTION IF EXISTS rebuild_team_overview_rollup()",
+    "DROP FUNCTION IF EXISTS team_overview_rollup_trigger()",
+    "DROP FUNCTION IF EXISTS apply_team_overview_rollup(call_sim_scoring, INTEGER)",
+    "DROP TABLE IF EXISTS team_overview_rollup",
+]
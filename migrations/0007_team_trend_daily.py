@@ -0,0 +1,135 @@
+"""
+Daily composite score aggregates behind the team trend.
+
+team_trend_daily holds one row per team x product x mode x assessment_status x
+day with the sum, non-null count and sum of squares of the composite skill
+score over simulations that have an accuracy assessment. Trends of any bucket
+(day, week, month, quarter) and date range roll up from it, so a weekly trend
+over several years reads a few rows per day instead of every simulation.
+Triggers keep it in step with every insert, update and delete;
+rebuild_team_trend_daily() recomputes it from scratch.
+
+Live reads of partial days use the created_at btree from migration 0009.
+"""
+
+COMPOSITE_COLUMNS = [
+    'introduction_score', 'rapport_score', 'creating_interest_score', 'probing_score',
+    'product_knowledge_score', 'strategy_score', 'closing_score', 'disc_score',
+    'traits_score', 'adoption_continuum_score',
+]
+
+DIMENSIONS = ['team_id', 'product_id', 'mode', 'assessment_status']
+
+
+def _composite(prefix):
+    return "(" + " + ".join(f"{prefix}{column}" for column in COMPOSITE_COLUMNS) + ") / 10"
+
+
+UP = [
+    """
+    CREATE TABLE team_trend_daily (
+        group_key TEXT PRIMARY KEY,
+        team_id INTEGER,
+        product_id TEXT,
+        mode TEXT,
+        assessment_status TEXT,
+        day TIMESTAMPTZ NOT NULL,
+        accuracy_count BIGINT NOT NULL DEFAULT 0,
+        composite_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        composite_count BIGINT NOT NULL DEFAULT 0,
+        composite_sumsq DOUBLE PRECISION NOT NULL DEFAULT 0
+    )
+    """,
+    f"CREATE INDEX idx_team_trend_daily_filters ON team_trend_daily ({', '.join(DIMENSIONS)}, day)",
+    "CREATE INDEX idx_team_trend_daily_day ON team_trend_daily (day)",
+    f"""
+    CREATE FUNCTION apply_team_trend_daily(r call_sim_scoring, sign INTEGER) RETURNS void AS $$
+    DECLARE
+    composite FLOAT := {_composite('r.')};
+    day TIMESTAMPTZ := DATE_TRUNC('day', r.created_at);
+    key TEXT := md5(ROW({', '.join(f'r.{d}' for d in DIMENSIONS)}, day)::text);
+    BEGIN
+        IF r.accuracy IS NULL OR r.created_at IS NULL THEN
+            RETURN;
+        END IF;
+
+        INSERT INTO team_trend_daily AS s (
+            group_key, {', '.join(DIMENSIONS)}, day,
+            accuracy_count, composite_sum, composite_count, composite_sumsq
+        ) VALUES (
+            key, {', '.join(f'r.{d}' for d in DIMENSIONS)}, day,
+            sign, sign * COALESCE(composite, 0), sign * (composite IS NOT NULL)::int, sign * COALESCE(composite * composite, 0)
+        )
+        ON CONFLICT (group_key) DO UPDATE SET
+            accuracy_count = s.accuracy_count + EXCLUDED.accuracy_count,
+            composite_sum = s.composite_sum + EXCLUDED.composite_sum,
+            composite_count = s.composite_count + EXCLUDED.composite_count,
+            composite_sumsq = s.composite_sumsq + EXCLUDED.composite_sumsq;
+
+        DELETE FROM team_trend_daily WHERE group_key = key AND accuracy_count = 0;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION team_trend_daily_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM apply_team_trend_daily(OLD, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM apply_team_trend_daily(NEW, 1);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE FUNCTION rebuild_team_trend_daily() RETURNS void AS $$
+    BEGIN
+        LOCK TABLE call_sim_scoring IN SHARE MODE;
+        DELETE FROM team_trend_daily;
+        INSERT INTO team_trend_daily (
+            group_key, {', '.join(DIMENSIONS)}, day,
+            accuracy_count, composite_sum, composite_count, composite_sumsq
+        )
+        SELECT
+            md5(ROW({', '.join(DIMENSIONS)}, day)::text),
+            {', '.join(DIMENSIONS)}, day,
+            COUNT(*), COALESCE(SUM(composite), 0), COUNT(composite), COALESCE(SUM(composite * composite), 0)
+        FROM (
+            SELECT
+                {', '.join(DIMENSIONS)},
+                DATE_TRUNC('day', created_at) as day,
+                {_composite('')} as composite
+            FROM call_sim_scoring
+            WHERE accuracy IS NOT NULL
+            AND created_at IS NOT NULL
+        ) scored
+        GROUP BY {', '.join(DIMENSIONS)}, day;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER team_trend_daily_insert_delete
+    AFTER INSERT OR DELETE ON call_sim_scoring
+    FOR EACH ROW EXECUTE FUNCTION team_trend_daily_trigger()
+    """,
+    f"""
+    CREATE TRIGGER team_trend_daily_update
+    AFTER UPDATE OF {', '.join(DIMENSIONS)}, created_at, accuracy ON call_sim_scoring
+    FOR EACH ROW
+    WHEN ((OLD.{', OLD.'.join(DIMENSIONS)}, OLD.created_at, OLD.accuracy)
+          IS DISTINCT FROM (NEW.{', NEW.'.join(DIMENSIONS)}, NEW.created_at, NEW.accuracy))
+    EXECUTE FUNCTION team_trend_daily_trigger()
+    """,
+    "SELECT rebuild_team_trend_daily()",
+]
+
+DOWN = [
+    "DROP TRIGGER IF EXISTS team_trend_daily_update ON call_sim_scoring",
+    "DROP TRIGGER IF EXISTS team_trend_daily_insert_delete ON call_sim_scoring",
+    "DROP FUNCTION IF EXISTS rebuild_team_trend_daily()",
+    "DROP FUNCTION IF EXISTS team_trend_daily_trigger()",
+    "DROP FUNCTION IF EXISTS apply_team_trend_daily(call_sim_scoring, INTEGER)",
+    "DROP TABLE IF EXISTS team_trend_daily",
+]
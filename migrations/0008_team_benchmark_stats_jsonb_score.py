@@ -0,0 +1,108 @@
+"""
+Parse the skill scores in the team benchmark stats trigger and rebuild with
+jsonb_score() (migration 0004) instead of CAST(... AS FLOAT).
+
+The cast raised on any non-numeric score such as "n/a", which made the row
+trigger fail the INSERT or UPDATE on call_sim_scoring itself. jsonb_score()
+gives the same value for numbers and numeric strings and NULL otherwise, so
+such a score is left out of the sums and counts like a missing one.
+"""
+
+SKILL_SCORES = [
+    ('intro', 'introduction'),
+    ('rapport', 'rapport'),
+    ('interest', 'creatingInterest'),
+    ('probing', 'probing'),
+    ('product', 'productKnowledge'),
+]
+
+_score_names = [name for name, _ in SKILL_SCORES]
+
+
+def _apply_function(score):
+    variables = "".join(
+        f"""
+    {name} FLOAT := {score('r.accuracy', key)};"""
+        for name, key in SKILL_SCORES
+    )
+    return f"""
+    CREATE OR REPLACE FUNCTION apply_team_benchmark_stats(r call_sim_scoring, sign INTEGER) RETURNS void AS $$
+    DECLARE{variables}
+    composite FLOAT := ({" + ".join(_score_names)}) / 5;
+    key TEXT := md5(ROW(r.team_id::text, r.product_id, r.adoption_continuum, r.situation, r.accuracy IS NOT NULL)::text);
+    BEGIN
+        IF r.team_id IS NULL THEN
+            RETURN;
+        END IF;
+
+        INSERT INTO team_benchmark_stats AS s (
+            group_key, team_id, product_id, adoption_continuum, situation, has_accuracy, row_count,
+            {", ".join(f"{name}_sum, {name}_count" for name in _score_names)},
+            composite_sum, composite_count
+        ) VALUES (
+            key, r.team_id, r.product_id, r.adoption_continuum, r.situation, r.accuracy IS NOT NULL, sign,
+            {", ".join(f"sign * COALESCE({name}, 0), sign * ({name} IS NOT NULL)::int" for name in _score_names)},
+            sign * COALESCE(composite, 0), sign * (composite IS NOT NULL)::int
+        )
+        ON CONFLICT (group_key) DO UPDATE SET
+            row_count = s.row_count + EXCLUDED.row_count,
+            {", ".join(f"{name}_sum = s.{name}_sum + EXCLUDED.{name}_sum, {name}_count = s.{name}_count + EXCLUDED.{name}_count" for name in _score_names)},
+            composite_sum = s.composite_sum + EXCLUDED.composite_sum,
+            composite_count = s.composite_count + EXCLUDED.composite_count;
+
+        -- Empty groups would otherwise count as teams with zero simulations
+        DELETE FROM team_benchmark_stats WHERE group_key = key AND row_count = 0;
+    END;
+    $$ LANGUAGE plpgsql
+    """
+
+
+def _rebuild_function(score):
+    return f"""
+    CREATE OR REPLACE FUNCTION rebuild_team_benchmark_stats() RETURNS void AS $$
+    BEGIN
+        LOCK TABLE call_sim_scoring IN SHARE MODE;
+        DELETE FROM team_benchmark_stats;
+        INSERT INTO team_benchmark_stats
+        SELECT
+            md5(ROW(team_id::text, product_id, adoption_continuum, situation, has_accuracy)::text),
+            team_id, product_id, adoption_continuum, situation, has_accuracy,
+            COUNT(*),
+            {", ".join(f"COALESCE(SUM({name}), 0), COUNT({name})" for name in _score_names)},
+            COALESCE(SUM(composite), 0), COUNT(composite)
+        FROM (
+            SELECT
+                *,
+                ({" + ".join(_score_names)}) / 5 as composite
+            FROM (
+                SELECT
+                    team_id, product_id, adoption_continuum, situation,
+                    accuracy IS NOT NULL as has_accuracy,
+                    {", ".join(f"{score('accuracy', key)} as {name}" for name, key in SKILL_SCORES)}
+                FROM call_sim_scoring
+                WHERE team_id IS NOT NULL
+            ) scores
+        ) scored
+        GROUP BY team_id, product_id, adoption_continuum, situation, has_accuracy;
+    END;
+    $$ LANGUAGE plpgsql
+    """
+
+
+def _jsonb_score(column, key):
+    return f"jsonb_score({column}->'scores'->'{key}'->'score')"
+
+
+def _cast_score(column, key):
+    return f"CAST({column}->'scores'->'{key}'->>'score' AS FLOAT)"
+
+
+UP = [
+    _apply_function(_jsonb_score),
+    _rebuild_function(_jsonb_score),
+]
+
+DOWN = [
+    _apply_function(_cast_score),
+    _rebuild_function(_cast_score),
+]
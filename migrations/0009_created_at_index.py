@@ -0,0 +1,19 @@
+"""
+Plain btree on created_at for the live reads that filter on a created_at
+range across teams, such as the partial first day of a team trend
+(migrations/0007_team_trend_daily.py). The keyset indexes order by
+COALESCE(created_at, '-infinity') and cannot serve a bare created_at range.
+"""
+
+TRANSACTIONAL = False
+
+UP = [
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_call_sim_scoring_created_at
+    ON call_sim_scoring (created_at)
+    """,
+]
+
+DOWN = [
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_call_sim_scoring_created_at",
+]
@@ -0,0 +1,69 @@
+"""
+Move the call_sim_scoring data version from a sequence bumped by a deferred
+row trigger to a one-row table bumped by statement triggers.
+
+The row trigger called nextval() once per changed row, so a bulk write of
+10k rows advanced the sequence 10k times, and since sequences are not
+transactional the new version was visible before the transaction committed:
+a report read in between paired the new version with the old rows, and was
+cached or answered 304 under it. call_sim_scoring_data_version is updated
+once per statement and, being an ordinary row, its new value becomes visible
+in the same commit as the change itself.
+
+Writers to call_sim_scoring now hold the version row's lock from the end of
+each statement until they commit, so a concurrent writer waits at the end of
+its statement for the first one to commit or roll back. A statement that
+changes no rows still advances the version, which only costs the caches a
+miss.
+"""
+
+UP = [
+    """
+    CREATE TABLE call_sim_scoring_data_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL
+    )
+    """,
+    # Carry on from the sequence so no version is handed out twice
+    """
+    INSERT INTO call_sim_scoring_data_version (version)
+    SELECT CASE WHEN is_called THEN last_value ELSE 0 END + 1
+    FROM call_sim_scoring_version_seq
+    """,
+    "DROP TRIGGER IF EXISTS call_sim_scoring_version ON call_sim_scoring",
+    """
+    CREATE OR REPLACE FUNCTION bump_call_sim_scoring_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE call_sim_scoring_data_version SET version = version + 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER call_sim_scoring_version
+    AFTER INSERT OR UPDATE OR DELETE ON call_sim_scoring
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_call_sim_scoring_version()
+    """,
+    "DROP SEQUENCE call_sim_scoring_version_seq",
+]
+
+DOWN = [
+    "CREATE SEQUENCE call_sim_scoring_version_seq",
+    "SELECT setval('call_sim_scoring_version_seq', version) FROM call_sim_scoring_data_version",
+    "DROP TRIGGER IF EXISTS call_sim_scoring_version ON call_sim_scoring",
+    """
+    CREATE OR REPLACE FUNCTION bump_call_sim_scoring_version() RETURNS trigger AS $$
+    BEGIN
+        PERFORM nextval('call_sim_scoring_version_seq');
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE CONSTRAINT TRIGGER call_sim_scoring_version
+    AFTER INSERT OR UPDATE OR DELETE ON call_sim_scoring
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_call_sim_scoring_version()
+    """,
+    "DROP TABLE IF EXISTS call_sim_scoring_data_version",
+]
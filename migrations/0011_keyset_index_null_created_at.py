@@ -0,0 +1,35 @@
+"""
+Rebuild the keyset pagination indexes from migration 0001 on the sort key
+the simulation-run listing uses, COALESCE(created_at, '-infinity'), so runs
+without a created_at sort last and the listing can still page through them.
+The indexes on the bare column cannot serve that ORDER BY and are dropped
+once their replacements are built.
+"""
+
+TRANSACTIONAL = False
+
+UP = [
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_call_sim_scoring_user_sort_key_id
+    ON call_sim_scoring (user_id, (COALESCE(created_at, '-infinity'::timestamptz)) DESC, id DESC)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_call_sim_scoring_sort_key_id
+    ON call_sim_scoring ((COALESCE(created_at, '-infinity'::timestamptz)) DESC, id DESC)
+    """,
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_call_sim_scoring_user_created_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_call_sim_scoring_created_id",
+]
+
+DOWN = [
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_call_sim_scoring_user_created_id
+    ON call_sim_scoring (user_id, created_at DESC, id DESC)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_call_sim_scoring_created_id
+    ON call_sim_scoring (created_at DESC, id DESC)
+    """,
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_call_sim_scoring_user_sort_key_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_call_sim_scoring_sort_key_id",
+]
@@ -0,0 +1,121 @@
+"""
+Versioned schema migrations for the reporting tables.
+
+Each migration is a module named NNNN_description.py exposing UP (and
+optionally DOWN) as a list of SQL statements. Migrations that must run
+outside a transaction, such as CREATE INDEX CONCURRENTLY, set
+TRANSACTIONAL = False. Applied versions are recorded in schema_migrations.
+"""
+import importlib
+import os
+import re
+
+from utils.logger import logger
+
+MIGRATION_MODULE_PATTERN = re.compile(r'^(\d{4})_\w+\.py$')
+
+
+def discover_migrations():
+    """
+    Return (version, module name) for every migration, ordered by version
+    """
+    directory = os.path.dirname(__file__)
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_MODULE_PATTERN.match(filename)
+        if match:
+            migrations.append((match.group(1), filename[:-3]))
+    return migrations
+
+
+def load_migration(module_name):
+    return importlib.import_module(f"{__name__}.{module_name}")
+
+
+def ensure_migrations_table(connection):
+    cursor = connection.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+    connection.commit()
+
+
+def applied_versions(connection):
+    cursor = connection.cursor()
+    cursor.execute("SELECT version FROM schema_migrations")
+    versions = {row[0] for row in cursor.fetchall()}
+    connection.commit()
+    return versions
+
+
+def apply_migration(connection, version, module_name):
+    """
+    Run a single migration and record it in schema_migrations
+    """
+    migration = load_migration(module_name)
+    transactional = getattr(migration, 'TRANSACTIONAL', True)
+
+    connection.autocommit = not transactional
+    try:
+        cursor = connection.cursor()
+        for statement in migration.UP:
+            cursor.execute(statement)
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+            [version, module_name]
+        )
+        if transactional:
+            connection.commit()
+    except Exception:
+        if transactional:
+            connection.rollback()
+        raise
+    finally:
+        connection.autocommit = False
+
+
+def revert_migration(connection, version, module_name):
+    """
+    Run a migration's DOWN statements and forget it was applied
+    """
+    migration = load_migration(module_name)
+    transactional = getattr(migration, 'TRANSACTIONAL', True)
+
+    connection.autocommit = not transactional
+    try:
+        cursor = connection.cursor()
+        for statement in getattr(migration, 'DOWN', []):
+            cursor.execute(statement)
+        cursor.execute("DELETE FROM schema_migrations WHERE version = %s", [version])
+        if transactional:
+            connection.commit()
+    except Exception:
+        if transactional:
+            connection.rollback()
+        raise
+    finally:
+        connection.autocommit = False
+
+
+def migrate(connection, target=None):
+    """
+    Apply every pending migration up to and including target (all by default).
+    Returns the names of the migrations that were applied.
+    """
+    ensure_migrations_table(connection)
+    done = applied_versions(connection)
+
+    applied = []
+    for version, module_name in discover_migrations():
+        if target is not None and version > target:
+            break
+        if version in done:
+            continue
+        logger.info("Applying migration %s", module_name)
+        apply_migration(connection, version, module_name)
+        applied.append(module_name)
+    return applied
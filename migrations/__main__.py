@@ -0,0 +1,59 @@
+"""
+Apply or revert schema migrations using the DB_* environment variables.
+
+    python -m migrations                 apply every pending migration
+    python -m migrations --target 0002   apply pending migrations up to 0002
+    python -m migrations --list          show applied and pending migrations
+    python -m migrations --revert 0002   revert a single applied migration
+"""
+import argparse
+import sys
+
+from handlers.db_connection import get_db_connection
+
+from . import (
+    applied_versions,
+    discover_migrations,
+    ensure_migrations_table,
+    migrate,
+    revert_migration,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m migrations')
+    parser.add_argument('--target', help='last migration version to apply')
+    parser.add_argument('--list', action='store_true', help='list migrations and exit')
+    parser.add_argument('--revert', metavar='VERSION', help='revert an applied migration')
+    args = parser.parse_args(argv)
+
+    connection = get_db_connection()
+    if not connection:
+        return 1
+
+    try:
+        if args.list:
+            ensure_migrations_table(connection)
+            done = applied_versions(connection)
+            for version, module_name in discover_migrations():
+                status = 'applied' if version in done else 'pending'
+                print(f"{status:8} {module_name}")
+        elif args.revert:
+            ensure_migrations_table(connection)
+            if args.revert not in applied_versions(connection):
+                print(f"Migration {args.revert} is not applied")
+                return 1
+            module_name = dict(discover_migrations())[args.revert]
+            print(f"Reverting migration {module_name}")
+            revert_migration(connection, args.revert, module_name)
+        else:
+            applied = migrate(connection, args.target)
+            if not applied:
+                print("No pending migrations")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+pg8000 = pytest.importorskip("pg8000")
+
+"""
+Runs against a migrated database: set DB_HOST, DB_NAME, DB_USER and DB_PASSWORD.
+Every test rolls back what it writes.
+"""
+
+
+@pytest.fixture()
+def connection():
+    if not os.environ.get("DB_HOST"):
+        pytest.skip("DB_HOST is not set")
+
+    connection = pg8000.connect(
+        host=os.environ.get("DB_HOST"),
+        database=os.environ.get("DB_NAME"),
+        user=os.environ.get("DB_USER"),
+        password=os.environ.get("DB_PASSWORD")
+    )
+    yield connection
+    connection.rollback()
+    connection.close()
+
+
+def team_stats(cursor, team_id):
+    cursor.execute(
+        "SELECT row_count, intro_sum, intro_count, rapport_sum, rapport_count "
+        "FROM team_benchmark_stats WHERE team_id = %s",
+        (team_id,)
+    )
+    return [list(row) for row in cursor.fetchall()]
+
+
+def test_non_numeric_score_does_not_fail_the_write(connection):
+    """ A score the trigger cannot parse is counted as missing instead of failing the INSERT """
+    cursor = connection.cursor()
+    cursor.execute("SELECT COALESCE(MAX(team_id), 0) + 1 FROM call_sim_scoring")
+    team_id = cursor.fetchone()[0]
+    accuracy = {"scores": {"introduction": {"score": "n/a"}, "rapport": {"score": "80"}}}
+
+    cursor.execute(
+        "INSERT INTO call_sim_scoring (simulation_id, user_id, team_id, accuracy) "
+        "VALUES ('test-simulation', 'test-user', %s, CAST(%s AS jsonb)) RETURNING id",
+        (team_id, json.dumps(accuracy))
+    )
+    row_id = cursor.fetchone()[0]
+
+    assert team_stats(cursor, team_id) == [[1, 0.0, 0, 80.0, 1]]
+
+    cursor.execute(
+        "UPDATE call_sim_scoring SET accuracy = jsonb_set(accuracy, '{scores,rapport,score}', '\"n/a\"') "
+        "WHERE id = %s",
+        (row_id,)
+    )
+
+    assert team_stats(cursor, team_id) == [[1, 0.0, 0, 0.0, 0]]
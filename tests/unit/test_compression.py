@@ -0,0 +1,144 @@
+import base64
+import gzip
+
+import pytest
+
+from utils import compression
+from utils.metrics import METRICS
+
+
+@pytest.fixture()
+def enabled(monkeypatch):
+    monkeypatch.setattr(compression, "RESPONSE_COMPRESSION", True)
+    METRICS.reset()
+
+
+@pytest.fixture()
+def with_brotli(enabled, monkeypatch):
+    """ Negotiates as if brotli were installed, whether or not it is """
+    monkeypatch.setattr(compression, "supported_encodings", lambda: ('br', 'gzip'))
+
+
+@pytest.fixture()
+def gzip_only(enabled, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('br', 'br'),
+    ('gzip, deflate, br', 'br'),
+    ('GZIP', 'gzip'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('gzip;q=0.8, br;q=0.8', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('br;q=0, gzip;q=0', None),
+    ('gzip;q=0', None),
+    ('*', 'br'),
+    ('*;q=0.5, br;q=0', 'gzip'),
+    ('gzip;q=0.001', 'gzip'),
+    ('gzip;q=abc', None),
+    ('deflate, compress', None),
+])
+def test_accepted_encoding(with_brotli, accept_encoding, expected):
+    headers = {} if accept_encoding is None else {'Accept-Encoding': accept_encoding}
+    assert compression.accepted_encoding(headers) == expected
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ('gzip, br', 'gzip'),
+    ('br', None),
+    ('*', 'gzip'),
+])
+def test_accepted_encoding_without_brotli(gzip_only, accept_encoding, expected):
+    assert compression.accepted_encoding({'accept-encoding': accept_encoding}) == expected
+
+
+def test_accepted_encoding_disabled(monkeypatch):
+    monkeypatch.setattr(compression, "RESPONSE_COMPRESSION", False)
+    assert compression.accepted_encoding({'Accept-Encoding': 'gzip'}) is None
+
+
+def response(body):
+    return {"statusCode": 200, "headers": {"Content-Type": "application/json"}, "body": body}
+
+
+@pytest.mark.parametrize("size, compressed", [
+    (0, False),
+    (compression.RESPONSE_COMPRESSION_MIN_BYTES - 1, False),
+    (compression.RESPONSE_COMPRESSION_MIN_BYTES, True),
+    (compression.RESPONSE_COMPRESSION_MIN_BYTES * 10, True),
+])
+def test_compress_response_threshold(gzip_only, size, compressed):
+    body = 'x' * size
+    event = {"path": "/simulation-run", "headers": {"Accept-Encoding": "gzip"}}
+
+    result = compression.compress_response(event, response(body))
+
+    assert result.get("isBase64Encoded", False) == compressed
+    assert ("Content-Encoding" in result["headers"]) == compressed
+    assert result["headers"]["Vary"] == "Accept-Encoding"
+    if compressed:
+        data = base64.b64decode(result["body"])
+        assert result["headers"]["Content-Encoding"] == "gzip"
+        assert gzip.decompress(data).decode('utf-8') == body
+        assert METRICS.values["BytesSaved"] == size - len(data)
+    else:
+        assert result["body"] == body
+        assert "BytesSaved" not in METRICS.values
+
+
+@pytest.mark.parametrize("headers, vary", [
+    ({"Accept-Encoding": "gzip"}, "Accept-Encoding"),
+    ({"Accept-Encoding": "identity"}, "Accept-Encoding"),
+    ({}, "Accept-Encoding"),
+])
+def test_vary_on_every_response(gzip_only, headers, vary):
+    event = {"path": "/simulation-run", "headers": headers}
+
+    for body in ('', 'x', 'x' * 4096):
+        assert compression.compress_response(event, response(body))["headers"]["Vary"] == vary
+
+
+@pytest.mark.parametrize("existing, vary", [
+    ("Origin", "Origin, Accept-Encoding"),
+    ("Origin, accept-encoding", "Origin, accept-encoding"),
+])
+def test_vary_keeps_existing_values(gzip_only, existing, vary):
+    event = {"path": "/simulation-run", "headers": {}}
+    result = compression.compress_response(event, {**response('x'), "headers": {"Vary": existing}})
+
+    assert result["headers"]["Vary"] == vary
+
+
+def test_no_vary_when_disabled(monkeypatch):
+    monkeypatch.setattr(compression, "RESPONSE_COMPRESSION", False)
+    event = {"path": "/simulation-run", "headers": {"Accept-Encoding": "gzip"}}
+
+    assert "Vary" not in compression.compress_response(event, response('x' * 4096))["headers"]
+
+
+def test_compress_stream(gzip_only):
+    chunks = ['{"id":1}\n' * 100, '{"id":2}\n' * 100]
+    event = {"path": "/simulation-run", "headers": {"Accept-Encoding": "gzip"}}
+
+    result = compression.compress_stream(event, {**response(None), "body": iter(chunks)})
+    data = b''.join(result["body"])
+
+    assert result["headers"]["Content-Encoding"] == "gzip"
+    assert result["headers"]["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(data).decode('utf-8') == ''.join(chunks)
+    assert METRICS.values["BytesSaved"] == len(''.join(chunks)) - len(data)
+
+
+def test_compress_response_leaves_encoded_bodies(gzip_only):
+    event = {"path": "/presignedPutUrl", "headers": {"Accept-Encoding": "gzip"}}
+    already = {**response('x' * 4096), "isBase64Encoded": True}
+
+    result = compression.compress_response(event, already)
+
+    assert result["body"] == already["body"]
+    assert "Content-Encoding" not in result["headers"]
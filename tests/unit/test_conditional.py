@@ -0,0 +1,105 @@
+import pytest
+
+from handlers import conditional
+from utils.responses import json_response
+
+
+@pytest.fixture()
+def versions(monkeypatch):
+    """ Data versions current_data_version returns, one per call """
+    values = []
+
+    def current_data_version(refresh=False):
+        return values.pop(0)
+
+    monkeypatch.setattr(conditional, "current_data_version", current_data_version)
+    return values
+
+
+@pytest.fixture()
+def acquisitions(monkeypatch):
+    """ Connections handlers acquired, as connections_acquired counts them """
+    acquired = [0]
+    monkeypatch.setattr(conditional, "connections_acquired", lambda: acquired[0])
+    return acquired
+
+
+def report(event):
+    return json_response(200, {"path": event["path"]})
+
+
+@pytest.mark.parametrize("before, after, tagged", [
+    (7, 7, True),
+    (7, 8, False),
+    (7, None, False),
+])
+def test_tags_only_if_version_unchanged(versions, acquisitions, before, after, tagged):
+    versions.extend([before, after])
+    event = {"path": "/industry-benchmarks", "queryStringParameters": {"team": "1"}}
+
+    def queried_report(event):
+        acquisitions[0] += 1
+        return report(event)
+
+    response = conditional.conditional_get(event, queried_report)
+
+    assert response["statusCode"] == 200
+    assert ("ETag" in response["headers"]) == tagged
+    if tagged:
+        assert response["headers"]["ETag"] == conditional.request_etag(event, before)
+    assert versions == []
+
+
+def test_cached_report_is_tagged_without_a_version_read(versions, acquisitions):
+    versions.append(7)
+    event = {"path": "/industry-benchmarks", "queryStringParameters": {"team": "1"}}
+
+    response = conditional.conditional_get(event, report)
+
+    assert response["headers"]["ETag"] == conditional.request_etag(event, 7)
+
+
+ETAG = 'W/"0123abcd"'
+
+
+@pytest.mark.parametrize("headers, matches", [
+    (None, False),
+    ({}, False),
+    ({'If-None-Match': ''}, False),
+    ({'If-None-Match': 'W/"0123abcd"'}, True),
+    ({'If-None-Match': '"0123abcd"'}, True),
+    ({'if-none-match': 'W/"0123abcd"'}, True),
+    ({'If-None-Match': '*'}, True),
+    ({'If-None-Match': 'W/"ffff", W/"0123abcd"'}, True),
+    ({'If-None-Match': '"ffff","0123abcd"'}, True),
+    ({'If-None-Match': 'W/"ffff"'}, False),
+    ({'If-None-Match': '0123abcd'}, False),
+    ({'If-None-Match': 'W/"0123abcd-gzip"'}, False),
+])
+def test_etag_matches(headers, matches):
+    assert conditional.etag_matches({"headers": headers}, ETAG) == matches
+
+
+def test_request_etag_scope():
+    event = {"path": "team-overview/trend", "queryStringParameters": {"team": "1", "bucket": "week"}}
+    reordered = {"path": "team-overview/trend", "queryStringParameters": {"bucket": "week", "team": "1"}}
+    other_query = {"path": "team-overview/trend", "queryStringParameters": {"team": "2", "bucket": "week"}}
+
+    etag = conditional.request_etag(event, 7)
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert conditional.request_etag(reordered, 7) == etag
+    assert conditional.request_etag(event, 8) != etag
+    assert conditional.request_etag(other_query, 7) != etag
+
+
+def test_not_modified(versions):
+    versions.append(7)
+    event = {"path": "/industry-benchmarks", "queryStringParameters": None}
+    event["headers"] = {"If-None-Match": conditional.request_etag(event, 7)}
+
+    response = conditional.conditional_get(event, report)
+
+    assert response["statusCode"] == 304
+    assert response["body"] == ""
+    assert response["headers"]["ETag"] == event["headers"]["If-None-Match"]
@@ -0,0 +1,100 @@
+import pytest
+
+from handlers.filters import InvalidFilter, QuerySpec, parse_team_id
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ('', None),
+    ('all', None),
+    ('42', 42),
+    (' 42 ', 42),
+    ('007', 7),
+    (42, 42),
+])
+def test_parse_team_id(value, expected):
+    assert parse_team_id(value) == expected
+
+
+@pytest.mark.parametrize("value", ['-1', '4.2', '1e3', 'abc', 'ALL', '42; DROP TABLE call_sim_scoring'])
+def test_parse_team_id_rejects(value):
+    with pytest.raises(InvalidFilter):
+        parse_team_id(value)
+
+
+@pytest.mark.parametrize("query_params, params", [
+    ({'team': '42'}, [42]),
+    ({'team': 'all'}, []),
+    ({}, []),
+])
+def test_team_filter_binds_an_int(query_params, params):
+    assert QuerySpec.from_query_params(query_params, 'team_id').params == params
+
+
+def test_team_filter_rejects_invalid_team():
+    with pytest.raises(InvalidFilter):
+        QuerySpec.from_query_params({'team': 'abc'}, 'team_id')
+
+
+TEMPLATE = "SELECT COUNT(*) FROM call_sim_scoring WHERE {filters}"
+
+
+@pytest.mark.parametrize("filters, sql, params", [
+    ({}, "WHERE TRUE", []),
+    ({'team_id': '7'}, "WHERE team_id = %s", [7]),
+    ({'product_id': 'all', 'mode': ''}, "WHERE TRUE", []),
+    ({'specialty': 'Cardiology'}, "WHERE LOWER(specialty) = %s", ['cardiology']),
+    # Predicates follow FILTERS order, whatever order the filters are given in
+    (
+        {'assessment_status': 'completed', 'product_id': 'p1', 'team_id': 3},
+        "WHERE team_id = %s AND product_id = %s AND assessment_status = %s",
+        [3, 'p1', 'completed']
+    ),
+])
+def test_compile(filters, sql, params):
+    spec = QuerySpec(**filters)
+
+    assert spec.compile(TEMPLATE) == TEMPLATE.replace("WHERE {filters}", sql)
+    assert spec.params == params
+
+
+def test_compile_is_cached_per_shape():
+    first = QuerySpec(team_id=1, product_id='p1').compile(TEMPLATE)
+    second = QuerySpec(team_id=2, product_id='p2').compile(TEMPLATE)
+
+    assert first is second
+
+
+@pytest.mark.parametrize("method, names, expected", [
+    ('only', ('team_id',), QuerySpec(team_id=1)),
+    ('only', ('team_id', 'mode'), QuerySpec(team_id=1, mode='practice')),
+    ('only', ('user_id',), QuerySpec()),
+    ('without', ('product_id',), QuerySpec(team_id=1, mode='practice')),
+    ('without', ('team_id', 'product_id', 'mode'), QuerySpec()),
+    ('without', ('user_id',), QuerySpec(team_id=1, product_id='p1', mode='practice')),
+])
+def test_only_and_without(method, names, expected):
+    spec = QuerySpec(team_id=1, product_id='p1', mode='practice')
+
+    narrowed = getattr(spec, method)(*names)
+
+    assert narrowed == expected
+    assert narrowed.key == expected.key
+    assert spec.shape == ('team_id', 'product_id', 'mode')
+
+
+@pytest.mark.parametrize("first, second, equal", [
+    (QuerySpec(team_id='1'), QuerySpec(team_id=1), True),
+    (QuerySpec(product_id='all'), QuerySpec(), True),
+    (QuerySpec(specialty='ENT'), QuerySpec(specialty='ent'), True),
+    (QuerySpec(team_id=1), QuerySpec(team_id=2), False),
+    (QuerySpec(team_id=1), QuerySpec(user_id=1), False),
+])
+def test_key(first, second, equal):
+    assert (first.key == second.key) == equal
+    assert (first == second) == equal
+
+
+def test_unknown_filter():
+    with pytest.raises(TypeError):
+        QuerySpec(teamId=1)
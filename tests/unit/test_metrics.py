@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+import lambda_function
+from utils import metrics
+from utils.responses import json_response
+
+STUB_HANDLER = "tests.unit.test_metrics:stub_handler"
+
+
+def stub_handler(event, context):
+    """ Answers with the status code asked for in the query string """
+    status_code = int((event.get("queryStringParameters") or {}).get("status", "200"))
+    return json_response(status_code, {"path": event["path"]})
+
+
+class Context:
+    aws_request_id = "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+
+
+@pytest.fixture()
+def stub_route(monkeypatch):
+    monkeypatch.setitem(lambda_function.ROUTE_HANDLERS, "GET:stub-report", STUB_HANDLER)
+    monkeypatch.setattr(lambda_function, "UNCONDITIONAL_HANDLERS", {STUB_HANDLER})
+    monkeypatch.setattr(metrics, "EMF_METRICS", True)
+    monkeypatch.setattr(metrics.METRICS, "cold_start", True)
+
+
+def invoke(capsys, path, query_params=None):
+    """ Runs lambda_handler and returns the response and the EMF document it printed """
+    capsys.readouterr()
+    event = {"httpMethod": "GET", "path": path, "queryStringParameters": query_params, "headers": {}}
+    response = lambda_function.lambda_handler(event, Context())
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    return response, json.loads(lines[0])
+
+
+def test_emf_document(stub_route, capsys):
+    response, document = invoke(capsys, "/stub-report/42")
+
+    assert response["statusCode"] == 200
+    directive = document["_aws"]["CloudWatchMetrics"]
+    assert isinstance(document["_aws"]["Timestamp"], int)
+    assert directive == [{
+        "Namespace": metrics.METRICS_NAMESPACE,
+        "Dimensions": [["Route"]],
+        "Metrics": [{"Name": name, "Unit": metrics.METRIC_UNITS[name]} for name in
+                    ("Duration", "ResponseBytes", "BytesSent", "ColdStart", "Errors")]
+    }]
+    assert document["Route"] == "GET:stub-report"
+    assert document["StatusCode"] == 200
+    assert document["RequestId"] == Context.aws_request_id
+    assert document["Duration"] >= 0
+    assert document["ResponseBytes"] == len(response["body"].encode("utf-8"))
+    assert document["ColdStart"] == 1
+    assert document["Errors"] == 0
+
+
+@pytest.mark.parametrize("path, query_params, route, status_code, errors", [
+    ("/stub-report", None, "GET:stub-report", 200, 0),
+    ("/stub-report", {"status": "404"}, "GET:stub-report", 404, 0),
+    ("/stub-report", {"status": "500"}, "GET:stub-report", 500, 1),
+    ("/no-such-route", None, "unmatched", 404, 0),
+])
+def test_route_and_errors(stub_route, capsys, path, query_params, route, status_code, errors):
+    invoke(capsys, path, query_params)
+    _, document = invoke(capsys, path, query_params)
+
+    assert document["Route"] == route
+    assert document["StatusCode"] == status_code
+    assert document["Errors"] == errors
+    assert document["ColdStart"] == 0
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from handlers.simulation_runs_handler import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    parse_page_size,
+    simulation_run_query,
+)
+
+
+@pytest.mark.parametrize("created_at, run_id", [
+    (datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc), 42),
+    (datetime(2024, 5, 1, 12, 30, 0, 123456, tzinfo=timezone(timedelta(hours=-5))), 1),
+    (datetime(2024, 5, 1), 7),
+    (None, 42),
+    (None, 1),
+])
+def test_cursor_round_trip(created_at, run_id):
+    cursor = encode_cursor(created_at, run_id)
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (created_at, run_id)
+
+
+@pytest.mark.parametrize("cursor", [
+    '',
+    'not a cursor',
+    encode_cursor(None, 1)[:-2],
+    # Valid base64 of JSON that is not a (created_at, id) pair
+    'WzFd',
+    'WyJ5ZXN0ZXJkYXkiLDFd',
+    'W251bGwsImFiYyJd',
+])
+def test_decode_cursor_rejects(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_cursor_after_null_created_at():
+    """ Runs without a created_at sort last, so the cursor still resumes after one """
+    query, params = simulation_run_query(None, {}, decode_cursor(encode_cursor(None, 9)), 10)
+
+    assert "(COALESCE(created_at, '-infinity'::timestamptz), id) < (COALESCE(CAST(%s AS timestamptz), '-infinity'), %s)" in query
+    assert query.endswith(" ORDER BY COALESCE(created_at, '-infinity'::timestamptz) DESC, id DESC LIMIT %s")
+    assert params == [None, 9, 10]
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, DEFAULT_PAGE_SIZE),
+    ('', DEFAULT_PAGE_SIZE),
+    ('1', 1),
+    ('25', 25),
+    (str(MAX_PAGE_SIZE), MAX_PAGE_SIZE),
+])
+def test_parse_page_size(value, expected):
+    assert parse_page_size(value) == expected
+
+
+@pytest.mark.parametrize("value", ['0', str(MAX_PAGE_SIZE + 1), '-1', '2.5', 'ten', ' 5'])
+def test_parse_page_size_rejects(value):
+    with pytest.raises(ValueError):
+        parse_page_size(value)
@@ -0,0 +1,30 @@
+from datetime import date
+
+import pytest
+
+from handlers.team_overview_handler import parse_trend_params
+
+
+@pytest.mark.parametrize("query_params, expected", [
+    ({}, ('month', None, None)),
+    ({'bucket': 'week'}, ('week', None, None)),
+    ({'bucket': ''}, ('month', None, None)),
+    ({'from': '2024-01-01'}, ('month', date(2024, 1, 1), None)),
+    ({'to': '2024-01-31'}, ('month', None, date(2024, 2, 1))),
+    ({'from': '2024-01-31', 'to': '2024-01-31'}, ('month', date(2024, 1, 31), date(2024, 2, 1))),
+    ({'bucket': 'quarter', 'from': '2023-01-01', 'to': '2023-12-31'}, ('quarter', date(2023, 1, 1), date(2024, 1, 1))),
+])
+def test_parse_trend_params(query_params, expected):
+    assert parse_trend_params(query_params) == expected
+
+
+@pytest.mark.parametrize("query_params", [
+    {'bucket': 'year'},
+    {'from': '2024-13-01'},
+    {'to': 'yesterday'},
+    {'from': '2024-02-01', 'to': '2024-01-31'},
+    {'to': '9999-12-31'},
+])
+def test_parse_trend_params_rejects(query_params):
+    with pytest.raises(ValueError):
+        parse_trend_params(query_params)
@@ -0,0 +1,158 @@
+import base64
+import gzip
+import os
+import zlib
+
+from utils.metrics import METRICS
+
+try:
+    import brotli
+except ImportError:
+    # brotli is optional; without it responses are only ever gzipped
+    brotli = None
+
+# Bodies smaller than this are sent as they are; below roughly a kilobyte the
+# headers outweigh what compression saves
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+RESPONSE_GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '6'))
+RESPONSE_BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '5'))
+# Set to 1 to compress responses. Off by default: a REST API proxy integration
+# only decodes base64 bodies for binaryMediaTypes it is configured with, so
+# enable this once the API has "*/*" (or the response content types) there;
+# otherwise clients get base64 text labelled as gzip.
+RESPONSE_COMPRESSION = os.environ.get('RESPONSE_COMPRESSION', '0') == '1'
+
+
+def supported_encodings():
+    """
+    Content codings this instance can produce, most preferred first
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def accepted_encoding(headers):
+    """
+    Picks the content coding for a response from the request's
+    Accept-Encoding header, or returns None to send it uncompressed.
+    """
+    header = next((value for name, value in (headers or {}).items() if name.lower() == 'accept-encoding'), None)
+    if not header or not RESPONSE_COMPRESSION:
+        return None
+
+    weights = {}
+    for item in header.split(','):
+        coding, _, parameters = item.strip().partition(';')
+        weight = 1.0
+        parameter, _, value = parameters.strip().partition('=')
+        if parameter.strip() == 'q':
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    # Highest q-value wins; max() keeps the first, more preferred, of a tie
+    def weight(coding):
+        return weights.get(coding, weights.get('*', 0.0))
+
+    coding = max(supported_encodings(), key=weight)
+    return coding if weight(coding) > 0 else None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+def vary_on_encoding(response):
+    """
+    Adds Accept-Encoding to the response's Vary header while compression is
+    enabled, whether or not this response was compressed: a shared cache
+    must not hand an uncompressed copy to a client that asked for gzip, or
+    a compressed one to a client that cannot decode it.
+    """
+    if not RESPONSE_COMPRESSION:
+        return response
+    headers = response.get('headers', {})
+    vary = headers.get('Vary')
+    if vary is None:
+        vary = 'Accept-Encoding'
+    elif 'accept-encoding' not in (name.strip().lower() for name in vary.split(',')):
+        vary = f"{vary}, Accept-Encoding"
+    return {**response, "headers": {**headers, "Vary": vary}}
+
+
+def compress_response(event, response):
+    """
+    Compresses a buffered response body the client accepts in a compressed
+    coding, returning it base64-encoded for API Gateway. Small, empty and
+    already encoded bodies are sent unchanged.
+    """
+    response = vary_on_encoding(response)
+    body = response.get('body')
+    if not body or response.get('isBase64Encoded') or 'Content-Encoding' in response.get('headers', {}):
+        return response
+
+    encoding = accepted_encoding(event.get('headers'))
+    data = body.encode('utf-8')
+    if encoding is None or len(data) < RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+
+    compressed = compress(data, encoding)
+    METRICS.put('BytesSaved', len(data) - len(compressed))
+    return {
+        **response,
+        "headers": {
+            **response.get('headers', {}),
+            "Content-Encoding": encoding
+        },
+        "body": base64.b64encode(compressed).decode('ascii'),
+        "isBase64Encoded": True
+    }
+
+
+def compress_chunks(chunks, encoding):
+    """
+    Compresses a streamed body chunk by chunk, flushing after each so the
+    client can decode every chunk as soon as it arrives
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=RESPONSE_BROTLI_QUALITY)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+        process, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+    bytes_in = bytes_out = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+        compressed = process(data) + flush()
+        bytes_in += len(data)
+        bytes_out += len(compressed)
+        yield compressed
+    compressed = finish()
+    bytes_out += len(compressed)
+    yield compressed
+    METRICS.put('BytesSaved', bytes_in - bytes_out)
+
+
+def compress_stream(event, response):
+    """
+    Streaming counterpart of compress_response: the body becomes an iterator
+    of compressed byte chunks. Streamed bodies are compressed regardless of
+    size, since their size is not known up front.
+    """
+    response = vary_on_encoding(response)
+    body = response.get('body')
+    encoding = accepted_encoding(event.get('headers'))
+    if not body or encoding is None or 'Content-Encoding' in response.get('headers', {}):
+        return response
+    return {
+        **response,
+        "headers": {
+            **response.get('headers', {}),
+            "Content-Encoding": encoding
+        },
+        "body": compress_chunks([body] if isinstance(body, str) else body, encoding)
+    }
@@ -1,6 +1,122 @@
 import logging
 import os
+import random
+import sys
+import time
+
+from utils.responses import encode_json
 
 log_level = os.environ.get('LOG_LEVEL', 'INFO')
-logger = logging.getLogger()
+# json writes one JSON object per line; text leaves the handlers' format alone
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+# Log messages, and the encoded extra fields, are cut to this many characters
+LOG_MAX_MESSAGE_CHARS = int(os.environ.get('LOG_MAX_MESSAGE_CHARS', '2048'))
+# Share of requests logged at DEBUG: LOG_SAMPLE_RATE for every path, or per
+# path prefix with LOG_SAMPLE_RATES, e.g. "team-overview=0.01,simulation-run=0.05"
+# (the longest matching prefix wins)
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '0'))
+
+
+def parse_sample_rates(value):
+    rates = {}
+    for item in value.split(','):
+        prefix, separator, rate = item.partition('=')
+        if separator:
+            rates[prefix.strip().lstrip('/')] = float(rate)
+    return rates
+
+
+LOG_SAMPLE_RATES = parse_sample_rates(os.environ.get('LOG_SAMPLE_RATES', ''))
+
+# Library loggers (botocore, urllib3, pg8000) propagate to the root logger,
+# which stays at LOG_LEVEL; sampling only lowers the application's logger
+logging.getLogger().setLevel(log_level)
+logger = logging.getLogger('cogni')
 logger.setLevel(log_level)
+
+# Added to every JSON log line of the current request
+_request = {"path": None, "requestId": None, "sampled": False}
+
+
+class Lazy:
+    """
+    Log argument computed only if the record is actually emitted, e.g.
+    logger.debug("Full event: %s", Lazy(encode_json, event))
+    """
+
+    __slots__ = ('function', 'args')
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+    def __str__(self):
+        return str(self.function(*self.args))
+
+
+def lazy_json(value):
+    return Lazy(encode_json, value)
+
+
+def truncate(text, limit=None):
+    limit = LOG_MAX_MESSAGE_CHARS if limit is None else limit
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more characters]"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record, with the request context. Structured data
+    passed as extra={"fields": {...}} is included under "fields".
+    """
+
+    def format(self, record):
+        document = {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(record.getMessage()),
+            **_request
+        }
+        fields = getattr(record, 'fields', None)
+        if fields is not None:
+            encoded = encode_json(fields)
+            document["fields"] = fields if len(encoded) <= LOG_MAX_MESSAGE_CHARS else truncate(encoded)
+        if record.exc_info:
+            document["exception"] = truncate(self.formatException(record.exc_info))
+        return encode_json(document)
+
+
+def sample_rate(path):
+    matches = [prefix for prefix in LOG_SAMPLE_RATES if path.startswith(prefix)]
+    return LOG_SAMPLE_RATES[max(matches, key=len)] if matches else LOG_SAMPLE_RATE
+
+
+def begin_request(path, request_id=None):
+    """
+    Sets the request context for log lines and decides whether this request
+    is sampled for DEBUG logging
+    """
+    path = (path or '').lstrip('/')
+    sampled = random.random() < sample_rate(path)
+    _request.update(path=path, requestId=request_id, sampled=sampled)
+    logger.setLevel(logging.DEBUG if sampled else log_level)
+
+
+def configure_logging():
+    """
+    Formats the root logger's output, which the application's records
+    propagate to, as JSON. Lambda's own JSON log format
+    (AWS_LAMBDA_LOG_FORMAT=JSON) is left alone, as it already is.
+    """
+    if LOG_FORMAT != 'json' or os.environ.get('AWS_LAMBDA_LOG_FORMAT') == 'JSON':
+        return
+    root = logging.getLogger()
+    if not root.handlers:
+        root.addHandler(logging.StreamHandler(sys.stderr))
+    for handler in root.handlers:
+        handler.setFormatter(JsonFormatter())
+
+
+configure_logging()
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+
+from utils.responses import encode_json
+
+# CloudWatch Embedded Metric Format: one JSON log line per invocation, which
+# CloudWatch Logs turns into metrics without an agent or an API call
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'CogniReports')
+# Set to 0 to stop emitting metrics
+EMF_METRICS = os.environ.get('EMF_METRICS', '1') != '0'
+
+METRIC_UNITS = {
+    "Duration": "Milliseconds",
+    "DbDuration": "Milliseconds",
+    "ResponseBytes": "Bytes",
+    "BytesSent": "Bytes",
+    "BytesSaved": "Bytes",
+    "ColdStart": "Count",
+    "Errors": "Count"
+}
+
+# Metrics are aggregated per route only; the status code and request ID are
+# properties, searchable in Logs Insights without multiplying metric count
+DIMENSIONS = [["Route"]]
+
+
+class InvocationMetrics:
+    """
+    Measurements for the current invocation, written out by flush()
+    """
+
+    def __init__(self):
+        self.cold_start = True
+        self.reset()
+
+    def reset(self):
+        self.route = None
+        self.values = {}
+        self.started = time.perf_counter()
+
+    def put(self, name, value):
+        self.values[name] = value
+
+    def document(self, status_code, request_id=None):
+        """
+        The EMF log record for this invocation
+        """
+        values = {
+            **self.values,
+            "ColdStart": 1 if self.cold_start else 0,
+            "Errors": 1 if status_code >= 500 else 0
+        }
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": METRICS_NAMESPACE,
+                    "Dimensions": DIMENSIONS,
+                    "Metrics": [{"Name": name, "Unit": METRIC_UNITS[name]} for name in values]
+                }]
+            },
+            "Route": self.route or 'unmatched',
+            "StatusCode": status_code,
+            "RequestId": request_id,
+            **values
+        }
+
+    def flush(self, status_code, context=None, write=None):
+        """
+        Writes the invocation's EMF record to stdout, as a single line
+        """
+        if EMF_METRICS:
+            document = self.document(status_code, getattr(context, 'aws_request_id', None))
+            (write or sys.stdout.write)(encode_json(document) + "\n")
+        self.cold_start = False
+
+
+METRICS = InvocationMetrics()
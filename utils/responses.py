@@ -0,0 +1,77 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; the stdlib encoder below is the fallback
+    orjson = None
+
+# Header templates shared by every response. They are read-only; responses
+# get their own copy, which later layers (ETag, compression) extend.
+CORS_HEADERS = MappingProxyType({
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "*",
+    "Access-Control-Allow-Methods": "*"
+})
+
+JSON_HEADERS = MappingProxyType({
+    **CORS_HEADERS,
+    "Content-Type": "application/json"
+})
+
+
+def encode_default(value):
+    """
+    Encodes the non-JSON types reports return: datetimes and dates as ISO
+    8601 strings and Decimals (NUMERIC columns) as floats
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value)} is not JSON serializable")
+
+
+_stdlib_encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=encode_default)
+
+
+def encode_json(value):
+    """
+    Compact JSON text for value, through orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=encode_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return _stdlib_encoder.encode(value)
+
+
+def json_response(status_code, body, headers=JSON_HEADERS):
+    """
+    API Gateway proxy response with body encoded as JSON
+    """
+    return {
+        "statusCode": status_code,
+        "headers": dict(headers),
+        "body": encode_json(body)
+    }
+
+
+def error_response(status_code, message):
+    """
+    JSON error response: {"error": message}
+    """
+    return json_response(status_code, {"error": message})
+
+
+def text_response(status_code, body, headers=CORS_HEADERS):
+    """
+    API Gateway proxy response with an already encoded body (a string, or an
+    iterator of chunks for a streamed response)
+    """
+    return {
+        "statusCode": status_code,
+        "headers": dict(headers),
+        "body": body
+    }